@@ -1,38 +1,50 @@
 ﻿from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse  # <- dieser Import fehlt
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import HTMLResponse, Response, StreamingResponse  # <- dieser Import fehlt
 from fastapi.templating import Jinja2Templates
 
+import os
 import json
-import time
 import asyncio
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.executor import blocking_executor, loop_monitor
+from app.core.pagination import keyset_page, parse_fields, load_columns, page_response, page_responses
+from app.core.http_cache import json_with_etag
 from app.models.order import Order, WatchedItem, MyListing, AppSettings
 from app.models.schemas import (
-    OrderCreate, OrderUpdate, OrderResponse,
+    OrderCreate, OrderUpdate, OrderResponse, OrderListItem,
     WatchedItemCreate, WatchedItemUpdate, WatchedItemResponse,
-    MyListingResponse, SettingsUpdate,
-    StatsResponse, TrackingUpdate, NotificationResponse
+    MyListingResponse, SettingsUpdate, PriceHistoryEntry, PriceHistoryBucket,
+    StatsResponse, JobResponse, SearchResult, NotificationResponse
 )
 from app.services.scraper import KleinanzeigenScraper
 from app.api.tracking_service import TrackingService
-from app.services.watcher import PriceWatcher
+from app.services.watcher import get_check_stats
 from app.services.listings_scraper import MyListingsScraper
 from app.services.notification_service import NotificationService
-from app.services.background_tasks import BackgroundTaskManager
+from app.services.background_tasks import background_task_manager
+from app.services.seller_cache import seller_cache
+from app.services.tracking_cache import tracking_cache
+from app.services.price_history import PriceHistoryService
+from app.services.job_queue import job_queue, JobContext
+from app.services.event_bus import event_bus
+from app.services.search import SearchService, SEARCH_SOURCES
+from app.services.stats_service import stats_service
+from app.services.image_store import image_store
 
 router = APIRouter(prefix="/api/v1")
 scraper = KleinanzeigenScraper()
 tracking_service = TrackingService()
-price_watcher = PriceWatcher()
 listings_scraper = MyListingsScraper()
 notification_service = NotificationService()
-background_tasks = BackgroundTaskManager()
+price_history_service = PriceHistoryService()
+search_service = SearchService()
 
 #pl custom
 templates = Jinja2Templates(directory="templates")  # Pfad zu deinen HTML-Templates
@@ -43,61 +55,131 @@ def bot_ui(request: Request):
 
 
 # Orders endpoints (unchanged)
+async def download_order_images(order_id: int, image_urls: List[str], ad_id: str):
+    """Download the gallery of an already saved order and attach the local files"""
+    local_images = await scraper.download_images(image_urls, ad_id)
+
+    def attach_images():
+        db = SessionLocal()
+        try:
+            order = db.query(Order).filter(Order.id == order_id).first()
+            if not order:
+                # Order was deleted while the images were downloading
+                image_store.release(db, local_images)
+                return
+
+            order.local_images = json.dumps(local_images)
+            db.commit()
+        finally:
+            db.close()
+
+    await blocking_executor.run(attach_images)
+
+
 @router.post("/orders", response_model=OrderResponse)
-async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
+async def create_order(order_data: OrderCreate, background_tasks_dep: BackgroundTasks):
     """Create a new order from a Kleinanzeigen URL"""
+    defer_images = settings.IMAGE_DOWNLOAD_DEFERRED
     try:
-        listing_data = scraper.scrape_listing(str(order_data.url))
+        listing_data = await scraper.scrape_listing(str(order_data.url), download_images=not defer_images)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to scrape listing: {str(e)}")
 
-    existing = db.query(Order).filter(Order.ad_id == listing_data['ad_id']).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Order already exists")
+    def save_order(db: Session):
+        existing = db.query(Order).filter(Order.ad_id == listing_data['ad_id']).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="Order already exists")
+
+        db_order = Order(**listing_data)
+        db.add(db_order)
+        db.commit()
+        db.refresh(db_order)
+        return db_order
+
+    db_order = await blocking_executor.run_in_session(save_order)
+    stats_service.invalidate()
 
-    db_order = Order(**listing_data)
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    # Fetch the gallery after the response has been sent
+    if defer_images:
+        background_tasks_dep.add_task(
+            download_order_images,
+            db_order.id,
+            json.loads(listing_data['image_urls']),
+            listing_data['ad_id']
+        )
 
     return db_order
 
 
-@router.get("/orders", response_model=List[OrderResponse])
+def attach_tracking_summaries(orders: List[Order]) -> List[Order]:
+    """Add the small part of the tracking result that order lists show, without the event history"""
+    for order in orders:
+        tracking = {}
+        if order.tracking_details:
+            try:
+                tracking = json.loads(order.tracking_details)
+            except ValueError:
+                pass
+        order.tracking = {
+            key: tracking[key] for key in ('carrier', 'progress', 'status', 'error') if key in tracking
+        } or None
+    return orders
+
+
+@router.get("/orders", response_class=Response, responses=page_responses(OrderResponse, OrderListItem))
 async def get_orders(
+        request: Request,
         search: Optional[str] = "",
         status: Optional[str] = "",
         color: Optional[str] = "",
-        limit: int = 100,
-        db: Session = Depends(get_db)
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: Optional[str] = None,
+        view: str = Query("full", pattern="^(full|compact)$"),
+        fields: Optional[str] = None
 ):
-    """Get all orders with optional filtering"""
-    query = db.query(Order)
-
-    if search:
-        query = query.filter(Order.title.contains(search))
-    if status:
-        query = query.filter(Order.status == status)
-    if color:
-        query = query.filter(Order.color == color)
-
-    orders = query.order_by(Order.created_at.desc()).limit(limit).all()
-
-    for order in orders:
-        if not order.tracking_details and order.dhl_details:
-            order.tracking_details = order.dhl_details
-            order.carrier = 'dhl'
-
-    return orders
+    """
+    Get orders with optional filtering, newest first
+    Pass the X-Next-Cursor response header as cursor to get the next page
+    view=compact returns OrderListItem rows, fields=a,b,c only the listed fields
+    """
+    schema = OrderListItem if view == 'compact' else OrderResponse
+    names = parse_fields(fields, OrderResponse, OrderListItem) or list(schema.model_fields)
+    # The tracking fields fall back to the legacy dhl_details column
+    needs_tracking = 'tracking_details' in names or 'tracking' in names
+    columns = names + (['tracking_details', 'dhl_details', 'carrier'] if needs_tracking else [])
+
+    def load_page(db: Session):
+        query = load_columns(db.query(Order), Order, columns)
+        if search:
+            matching_ids = search_service.matching_ids(search, 'order') if search_service.is_available(db) else None
+            if matching_ids is not None:
+                query = query.filter(Order.id.in_(matching_ids))
+            else:
+                query = query.filter(Order.title.contains(search))
+        if status:
+            query = query.filter(Order.status == status)
+        if color:
+            query = query.filter(Order.color == color)
+
+        orders, next_cursor = keyset_page(query, Order, cursor, limit)
+        if needs_tracking:
+            for order in orders:
+                if not order.tracking_details and order.dhl_details:
+                    order.tracking_details = order.dhl_details
+                    order.carrier = 'dhl'
+            attach_tracking_summaries(orders)
+        return page_response(request, orders, schema, next_cursor, fields=names if fields else None)
+
+    return await blocking_executor.run_in_session(load_page)
 
 
 @router.get("/orders/tracking", response_model=List[OrderResponse])
-async def get_tracking_orders(db: Session = Depends(get_db)):
+async def get_tracking_orders():
     """Get orders with active tracking"""
-    orders = db.query(Order).filter(
+    orders = await blocking_executor.run_in_session(lambda db: db.query(Order).filter(
         Order.tracking_number.isnot(None),
         Order.status != 'Delivered'
-    ).all()
+    ).all())
 
     for order in orders:
         if not order.tracking_details and order.dhl_details:
@@ -108,9 +190,9 @@ async def get_tracking_orders(db: Session = Depends(get_db)):
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int):
     """Get a specific order by ID"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await blocking_executor.run_in_session(lambda db: db.query(Order).filter(Order.id == order_id).first())
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
@@ -124,38 +206,57 @@ async def get_order(order_id: int, db: Session = Depends(get_db)):
 @router.put("/orders/{order_id}", response_model=OrderResponse)
 async def update_order(
         order_id: int,
-        order_update: OrderUpdate,
-        db: Session = Depends(get_db)
+        order_update: OrderUpdate
 ):
     """Update an existing order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await blocking_executor.run_in_session(lambda db: db.query(Order).filter(Order.id == order_id).first())
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
     update_data = order_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        if hasattr(order, field):
-            setattr(order, field, value)
 
-    order.updated_at = datetime.now()
+    # The cached status of a replaced tracking number must not suppress polling if it is entered again
+    if 'tracking_number' in update_data and order.tracking_number and update_data['tracking_number'] != order.tracking_number:
+        tracking_cache.invalidate(order.tracking_number)
 
+    tracking_data = None
     if 'tracking_number' in update_data and update_data['tracking_number']:
         carrier = update_data.get('carrier', 'auto')
-        tracking_data = tracking_service.track_package(update_data['tracking_number'], carrier)
+        tracking_data = await blocking_executor.run(
+            tracking_service.track_package, update_data['tracking_number'], carrier
+        )
+
+    def save_order(db: Session):
+        order = db.query(Order).filter(Order.id == order_id).first()
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        for field, value in update_data.items():
+            if hasattr(order, field):
+                setattr(order, field, value)
 
-        order.carrier = tracking_data.get('carrier', '').lower() if 'carrier' in tracking_data else None
-        order.tracking_details = json.dumps(tracking_data)
-        order.dhl_details = json.dumps(tracking_data)
-        order.dhl_status = tracking_data.get('status', '')
-        order.dhl_last_update = datetime.now()
+        order.updated_at = datetime.now()
 
-        if 'error' not in tracking_data:
-            order.status = 'Shipped'
-            if tracking_data.get('progress', 0) == 100:
-                order.status = 'Delivered'
+        if tracking_data is not None:
+            order.carrier = tracking_data.get('carrier', '').lower() if 'carrier' in tracking_data else None
+            order.tracking_details = json.dumps(tracking_data)
+            order.dhl_details = json.dumps(tracking_data)
+            order.dhl_status = tracking_data.get('status', '')
+            order.dhl_last_update = datetime.now()
+
+            if 'error' not in tracking_data:
+                order.status = 'Shipped'
+                if tracking_data.get('progress', 0) == 100:
+                    order.status = 'Delivered'
+
+        db.commit()
+        db.refresh(order)
+        return order
 
-    db.commit()
-    db.refresh(order)
+    order = await blocking_executor.run_in_session(save_order)
+    stats_service.invalidate()
+    if tracking_data is not None:
+        tracking_service.publish_updates([order])
 
     if not order.tracking_details and order.dhl_details:
         order.tracking_details = order.dhl_details
@@ -164,224 +265,464 @@ async def update_order(
 
 
 @router.post("/orders/{order_id}/tracking")
-async def update_tracking(order_id: int, db: Session = Depends(get_db)):
+async def update_tracking(order_id: int):
     """Update tracking for a specific order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await blocking_executor.run_in_session(lambda db: db.query(Order).filter(Order.id == order_id).first())
     if not order or not order.tracking_number:
         raise HTTPException(status_code=404, detail="No tracking number found")
 
     carrier = getattr(order, 'carrier', None) or 'auto'
-    tracking_data = tracking_service.track_package(order.tracking_number, carrier)
+    tracking_data = await blocking_executor.run(tracking_service.track_package, order.tracking_number, carrier)
 
-    if hasattr(order, 'carrier'):
-        order.carrier = tracking_data.get('carrier', '').lower() if 'carrier' in tracking_data else carrier
+    def save_tracking(db: Session):
+        order = db.query(Order).filter(Order.id == order_id).first()
+        if not order:
+            raise HTTPException(status_code=404, detail="No tracking number found")
 
-    order.tracking_details = json.dumps(tracking_data)
-    order.dhl_details = json.dumps(tracking_data)
-    order.dhl_status = tracking_data.get('status', '')
-    order.dhl_last_update = datetime.now()
-
-    if tracking_data.get('progress', 0) == 100:
-        order.status = 'Delivered'
-    elif 'error' not in tracking_data and order.status == 'Ordered':
-        order.status = 'Shipped'
+        changed = tracking_service.apply_to_order(order, tracking_data, carrier)
+        db.commit()
+        if changed:
+            tracking_service.publish_updates([order])
 
-    db.commit()
+    await blocking_executor.run_in_session(save_tracking)
     return tracking_data
 
 
-@router.post("/tracking/update-all", response_model=TrackingUpdate)
-async def update_all_tracking(db: Session = Depends(get_db)):
-    """Update tracking for all active shipments"""
-    orders = db.query(Order).filter(
+async def run_tracking_update(job: JobContext):
+    """Job handler: update tracking for all active shipments"""
+    shipments = await blocking_executor.run_in_session(lambda db: db.query(
+        Order.id, Order.tracking_number, Order.carrier
+    ).filter(
         Order.tracking_number.isnot(None),
         Order.status != 'Delivered'
-    ).all()
+    ).all())
+    job.report(0, len(shipments))
 
-    updated_count = 0
+    carriers = {order_id: carrier or 'auto' for order_id, _, carrier in shipments}
+    results = await tracking_service.track_many(
+        [(tracking_number, carriers[order_id]) for order_id, tracking_number, _ in shipments]
+    )
 
-    for order in orders:
-        try:
-            carrier = getattr(order, 'carrier', None) or 'auto'
-            tracking_data = tracking_service.track_package(order.tracking_number, carrier)
+    def apply_results(db: Session):
+        updated_count = 0
+        changed_orders = []
 
-            if hasattr(order, 'carrier'):
-                order.carrier = tracking_data.get('carrier', '').lower() if 'carrier' in tracking_data else carrier
+        # Missing results were skipped because the last status is still fresh
+        order_ids = [order_id for order_id, tracking_number, _ in shipments if tracking_number in results]
+        for order in db.query(Order).filter(Order.id.in_(order_ids)).all():
+            try:
+                tracking_data = results[order.tracking_number]
+                if tracking_service.apply_to_order(order, tracking_data, carriers[order.id]):
+                    changed_orders.append(order)
 
-            order.tracking_details = json.dumps(tracking_data)
-            order.dhl_details = json.dumps(tracking_data)
-            order.dhl_status = tracking_data.get('status', '')
-            order.dhl_last_update = datetime.now()
+                if 'error' not in tracking_data and tracking_data.get('history'):
+                    updated_count += 1
+            except Exception:
+                continue
 
-            if 'error' not in tracking_data and tracking_data.get('history'):
-                updated_count += 1
+        db.commit()
+        tracking_service.publish_updates(changed_orders)
+        return updated_count
 
-            if tracking_data.get('progress', 0) == 100:
-                order.status = 'Delivered'
-            elif 'error' not in tracking_data and order.status == 'Ordered':
-                order.status = 'Shipped'
+    updated_count = await blocking_executor.run_in_session(apply_results)
+    job.report(len(shipments))
+    return {"updated": updated_count}
 
-            time.sleep(1)
-        except Exception:
-            continue
 
-    db.commit()
-    return {"updated": updated_count}
+@router.post("/tracking/update-all", response_model=JobResponse, status_code=202)
+async def update_all_tracking():
+    """Queue a tracking update for all active shipments"""
+    return await job_queue.submit('update_all_tracking')
 
 
 @router.delete("/orders/{order_id}")
-async def delete_order(order_id: int, db: Session = Depends(get_db)):
+async def delete_order(order_id: int):
     """Delete an order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    def remove_order(db: Session):
+        order = db.query(Order).filter(Order.id == order_id).first()
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        if order.local_images:
+            # Images are shared between orders of the same gallery, only unreferenced ones go
+            image_store.release(db, json.loads(order.local_images), exclude_order_id=order.id)
 
-    if order.local_images:
-        import os
-        from app.core.config import settings
-        for img in json.loads(order.local_images):
-            img_path = os.path.join(settings.IMAGE_STORAGE_PATH, img)
-            if os.path.exists(img_path):
-                os.remove(img_path)
+        db.delete(order)
+        db.commit()
 
-    db.delete(order)
-    db.commit()
+    await blocking_executor.run_in_session(remove_order)
+    stats_service.invalidate()
     return {"message": "Order deleted"}
 
 
 # Watched items endpoints
+def attach_price_summaries(items: List[WatchedItem], db: Session) -> List[WatchedItem]:
+    """Add lowest/highest price, number of changes and recent prices from the price history"""
+    item_ids = [item.id for item in items]
+    summaries = price_history_service.get_summaries(db, item_ids)
+    recent_prices = price_history_service.get_recent_prices(db, item_ids)
+    for item in items:
+        summary = summaries.get(item.id, {})
+        item.lowest_price = summary.get('lowest_price', item.initial_price)
+        item.highest_price = summary.get('highest_price', item.initial_price)
+        item.price_changes = summary.get('price_changes', 0)
+        item.recent_prices = recent_prices.get(item.id, [])
+    return items
+
+
 @router.post("/watched-items", response_model=WatchedItemResponse)
-async def create_watched_item(item_data: WatchedItemCreate, db: Session = Depends(get_db)):
+async def create_watched_item(item_data: WatchedItemCreate):
     """Create a new watched item"""
     try:
-        listing_data = scraper.scrape_listing(str(item_data.url))
+        listing_data = await scraper.scrape_listing(str(item_data.url), download_images=False)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to scrape listing: {str(e)}")
 
-    existing = db.query(WatchedItem).filter(WatchedItem.ad_id == listing_data['ad_id']).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Item already being watched")
-
-    watched_item = WatchedItem(
-        ad_id=listing_data['ad_id'],
-        title=listing_data['title'],
-        url=str(item_data.url),
-        current_price=listing_data['price'],
-        initial_price=listing_data['price'],
-        last_price=listing_data['price'],
-        price_history=json.dumps([{
-            'price': listing_data['price'],
-            'date': datetime.now().isoformat()
-        }])
-    )
+    def save_item(db: Session):
+        existing = db.query(WatchedItem).filter(WatchedItem.ad_id == listing_data['ad_id']).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="Item already being watched")
+
+        watched_item = WatchedItem(
+            ad_id=listing_data['ad_id'],
+            title=listing_data['title'],
+            url=str(item_data.url),
+            current_price=listing_data['price'],
+            initial_price=listing_data['price'],
+            last_price=listing_data['price']
+        )
+
+        db.add(watched_item)
+        db.flush()
+        price_history_service.record(db, watched_item.id, listing_data['price'])
+        db.commit()
+        db.refresh(watched_item)
+        return attach_price_summaries([watched_item], db)[0], db.query(WatchedItem).count()
 
-    db.add(watched_item)
-    db.commit()
-    db.refresh(watched_item)
+    watched_item, item_count = await blocking_executor.run_in_session(save_item)
 
     # Restart background tasks if this is the first watched item
-    if db.query(WatchedItem).count() == 1:
-        await background_tasks.start_price_monitoring()
+    if item_count == 1:
+        await background_task_manager.start_price_monitoring()
 
     return watched_item
 
 
-@router.get("/watched-items", response_model=List[WatchedItemResponse])
-async def get_watched_items(db: Session = Depends(get_db)):
-    """Get all watched items"""
-    return db.query(WatchedItem).order_by(WatchedItem.created_at.desc()).all()
+@router.get("/watched-items", response_class=Response, responses=page_responses(WatchedItemResponse))
+async def get_watched_items(
+        request: Request,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+):
+    """Get watched items newest first, paged with the X-Next-Cursor header, fields=a,b,c to project"""
+    names = parse_fields(fields, WatchedItemResponse) or list(WatchedItemResponse.model_fields)
+    summary_fields = {'lowest_price', 'highest_price', 'price_changes', 'recent_prices'}
+    needs_summaries = bool(summary_fields & set(names))
+    columns = names + (['initial_price'] if needs_summaries else [])
+
+    def load_page(db: Session):
+        query = load_columns(db.query(WatchedItem), WatchedItem, columns)
+        items, next_cursor = keyset_page(query, WatchedItem, cursor, limit)
+        if needs_summaries:
+            attach_price_summaries(items, db)
+        return page_response(request, items, WatchedItemResponse, next_cursor, fields=names if fields else None)
+
+    return await blocking_executor.run_in_session(load_page)
+
+
+@router.get("/watched-items/{item_id}/price-history", response_model=List[PriceHistoryEntry])
+async def get_price_history(
+        item_id: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 500,
+        offset: int = 0
+):
+    """Get price observations of a watched item, oldest first"""
+    def load_history(db: Session):
+        if not db.query(WatchedItem.id).filter(WatchedItem.id == item_id).first():
+            raise HTTPException(status_code=404, detail="Watched item not found")
+
+        entries = price_history_service.get_history(db, item_id, since, until, min(limit, 5000), offset)
+        return [{'price': entry.price, 'date': entry.observed_at} for entry in entries]
+
+    return await blocking_executor.run_in_session(load_history)
+
+
+@router.get("/watched-items/{item_id}/price-history/downsampled", response_model=List[PriceHistoryBucket])
+async def get_downsampled_price_history(
+        item_id: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        buckets: int = 100
+):
+    """Get the price history of a watched item reduced to at most `buckets` points"""
+    def load_history(db: Session):
+        if not db.query(WatchedItem.id).filter(WatchedItem.id == item_id).first():
+            raise HTTPException(status_code=404, detail="Watched item not found")
+
+        return price_history_service.get_downsampled(db, item_id, since, until, max(1, min(buckets, 1000)))
+
+    return await blocking_executor.run_in_session(load_history)
 
 
 @router.put("/watched-items/{item_id}", response_model=WatchedItemResponse)
-async def update_watched_item(item_id: int, item_update: WatchedItemUpdate, db: Session = Depends(get_db)):
+async def update_watched_item(item_id: int, item_update: WatchedItemUpdate):
     """Update watched item settings"""
-    item = db.query(WatchedItem).filter(WatchedItem.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Watched item not found")
-
     update_data = item_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(item, field, value)
+    override = update_data.get('check_interval_override')
+    if override is not None and override < 1:
+        raise HTTPException(status_code=400, detail="Check interval must be at least 1 minute")
 
-    item.updated_at = datetime.now()
-    db.commit()
-    db.refresh(item)
+    def save_item(db: Session):
+        item = db.query(WatchedItem).filter(WatchedItem.id == item_id).first()
+        if not item:
+            raise HTTPException(status_code=404, detail="Watched item not found")
 
-    return item
+        for field, value in update_data.items():
+            setattr(item, field, value)
+
+        # Reschedule right away when the fixed interval is set or cleared
+        if 'check_interval_override' in update_data:
+            interval = background_task_manager.price_scheduler.current_interval(item)
+            item.next_check_at = (item.last_checked or datetime.now()) + timedelta(minutes=interval)
+
+        item.updated_at = datetime.now()
+        db.commit()
+        db.refresh(item)
+        return attach_price_summaries([item], db)[0]
+
+    return await blocking_executor.run_in_session(save_item)
 
 
 @router.delete("/watched-items/{item_id}")
-async def delete_watched_item(item_id: int, db: Session = Depends(get_db)):
+async def delete_watched_item(item_id: int):
     """Delete watched item"""
-    item = db.query(WatchedItem).filter(WatchedItem.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Watched item not found")
+    def remove_item(db: Session):
+        item = db.query(WatchedItem).filter(WatchedItem.id == item_id).first()
+        if not item:
+            raise HTTPException(status_code=404, detail="Watched item not found")
 
-    db.delete(item)
-    db.commit()
+        price_history_service.delete_history(db, item.id)
+        db.delete(item)
+        db.commit()
+        return db.query(WatchedItem).count()
+
+    remaining = await blocking_executor.run_in_session(remove_item)
 
     # Stop background tasks if no more watched items
-    if db.query(WatchedItem).count() == 0:
-        await background_tasks.stop_price_monitoring()
+    if remaining == 0:
+        await background_task_manager.stop_price_monitoring()
 
     return {"message": "Watched item deleted"}
 
 
-@router.post("/watched-items/check-all")
-async def check_all_prices(db: Session = Depends(get_db)):
-    """Check all watched items for price changes"""
-    items = db.query(WatchedItem).filter(WatchedItem.notifications_enabled == True).all()
-    updates = []
+def get_enabled_item_ids() -> List[int]:
+    db = SessionLocal()
+    try:
+        return [item_id for item_id, in db.query(WatchedItem.id).filter(WatchedItem.notifications_enabled == True).all()]
+    finally:
+        db.close()
 
-    for item in items:
-        try:
-            result = price_watcher.check_price_change(item, db)
-            if result:
-                updates.append(result)
-            time.sleep(2)
-        except Exception:
-            continue
 
-    return {"checked": len(items), "updates": updates}
+async def run_price_check(job: JobContext):
+    """Job handler: check all watched items for price changes"""
+    item_ids = await blocking_executor.run(get_enabled_item_ids)
+    job.report(0, len(item_ids))
+
+    # The scheduler checks items in the thread pool, rate limited instead of sleeping between items
+    updates = await background_task_manager.price_scheduler.run_sweep(item_ids, on_progress=job.report)
+
+    return {"checked": len(item_ids), "updates": updates}
+
+
+@router.post("/watched-items/check-all", response_model=JobResponse, status_code=202)
+async def check_all_prices():
+    """Queue a price check of all watched items"""
+    return await job_queue.submit('check_all_prices')
+
+
+@router.get("/watched-items/check-stats")
+async def get_price_check_stats():
+    """How often price checks were answered without parsing the page"""
+    stats = get_check_stats()
+    skipped = stats['not_modified'] + stats['unchanged']
+    return {
+        **stats,
+        "short_circuit_rate": round(skipped / stats['requests'], 3) if stats['requests'] else 0.0
+    }
 
 
 # My listings endpoints (unchanged)
-@router.get("/my-listings", response_model=List[MyListingResponse])
-async def get_my_listings(db: Session = Depends(get_db)):
-    """Get all my listings"""
-    return db.query(MyListing).order_by(MyListing.created_at.desc()).all()
+@router.get("/my-listings", response_class=Response, responses=page_responses(MyListingResponse))
+async def get_my_listings(
+        request: Request,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+):
+    """Get my listings newest first, paged with the X-Next-Cursor header, fields=a,b,c to project"""
+    names = parse_fields(fields, MyListingResponse) or list(MyListingResponse.model_fields)
 
+    def load_page(db: Session):
+        query = load_columns(db.query(MyListing), MyListing, names)
+        listings, next_cursor = keyset_page(query, MyListing, cursor, limit)
+        return page_response(request, listings, MyListingResponse, next_cursor, fields=names if fields else None)
 
-@router.post("/my-listings/sync")
-async def sync_my_listings(db: Session = Depends(get_db)):
-    """Sync my listings from Kleinanzeigen"""
-    try:
-        listings = listings_scraper.scrape_my_listings()
+    return await blocking_executor.run_in_session(load_page)
 
-        db.query(MyListing).delete()
 
-        for listing_data in listings:
-            listing = MyListing(**listing_data)
-            db.add(listing)
+async def run_listings_sync(job: JobContext):
+    """Job handler: sync my listings from Kleinanzeigen"""
+    listings = await blocking_executor.run(listings_scraper.scrape_my_listings)
+    job.report(0, len(listings))
+
+    def replace_listings():
+        db = SessionLocal()
+        try:
+            db.query(MyListing).delete()
+
+            for listing_data in listings:
+                listing = MyListing(**listing_data)
+                db.add(listing)
+
+            db.commit()
+        finally:
+            db.close()
+
+    await blocking_executor.run(replace_listings)
+    job.report(len(listings))
+    return {"synced": len(listings)}
+
+
+@router.post("/my-listings/sync", response_model=JobResponse, status_code=202)
+async def sync_my_listings():
+    """Queue a sync of my listings from Kleinanzeigen"""
+    return await job_queue.submit('sync_my_listings')
+
+
+job_queue.register('check_all_prices', run_price_check)
+job_queue.register('update_all_tracking', run_tracking_update)
+job_queue.register('sync_my_listings', run_listings_sync)
+
+
+# Job endpoints
+@router.get("/jobs", response_model=List[JobResponse])
+async def get_jobs(limit: int = 50):
+    """Most recent jobs, newest first"""
+    return await job_queue.list_jobs(max(1, min(limit, 500)))
 
-        db.commit()
-        return {"synced": len(listings)}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to sync listings: {str(e)}")
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int):
+    """Status and progress of a job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: int):
+    """Result of a finished job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] in ('queued', 'running'):
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if job['status'] != 'done':
+        raise HTTPException(status_code=500, detail=job['error'] or f"Job {job['status']}")
+    return job['result']
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: int):
+    """Cancel a queued or running job"""
+    job = await job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+# Search endpoint
+@router.get("/search", response_model=List[SearchResult])
+async def search(q: str, kinds: Optional[str] = None, limit: int = 20, offset: int = 0):
+    """Ranked full-text search over orders, watched items and my listings (kinds: comma separated)"""
+    kind_list = [kind.strip() for kind in kinds.split(',') if kind.strip()] if kinds else None
+    if kind_list:
+        unknown = [kind for kind in kind_list if kind not in SEARCH_SOURCES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)}")
+
+    def run_search(db: Session):
+        if not search_service.is_available(db):
+            raise HTTPException(status_code=501, detail="Full-text search needs SQLite with FTS5")
+        return search_service.search(db, q, kind_list, max(1, min(limit, 100)), max(offset, 0))
+
+    return await blocking_executor.run_in_session(run_search)
+
+
+# Live events
+@router.get("/events")
+async def stream_events(request: Request):
+    """Server-sent events for notifications, price changes, tracking updates and job progress"""
+    last_event_id = request.headers.get('last-event-id', '')
+    queue = event_bus.subscribe(int(last_event_id) if last_event_id.isdigit() else None)
+
+    async def generate():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT)
+                    yield event_bus.format_sse(event)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Runtime metrics
+@router.get("/metrics/event-loop")
+async def get_event_loop_metrics():
+    """How long the event loop was blocked and how busy the blocking thread pool is"""
+    return {
+        "event_loop": loop_monitor.get_stats(),
+        "blocking_pool": blocking_executor.get_stats()
+    }
+
+
+# Seller cache endpoints
+@router.delete("/seller-cache")
+async def invalidate_seller_cache(profile_url: Optional[str] = None):
+    """Invalidate one cached seller profile, or all of them if no URL is given"""
+    removed = await seller_cache.invalidate(profile_url)
+    return {"removed": removed}
 
 
 # Settings endpoints with new auto-check settings
 @router.get("/settings")
-async def get_settings(db: Session = Depends(get_db)):
+async def get_settings(request: Request):
     """Get application settings"""
-    settings = {}
+    def load_settings(db: Session):
+        settings = {}
+        for setting in db.query(AppSettings).all():
+            try:
+                settings[setting.key] = json.loads(setting.value)
+            except:
+                settings[setting.key] = setting.value
+        return settings
 
-    db_settings = db.query(AppSettings).all()
-    for setting in db_settings:
-        try:
-            settings[setting.key] = json.loads(setting.value)
-        except:
-            settings[setting.key] = setting.value
+    settings = await blocking_executor.run_in_session(load_settings)
 
     # Default settings
     if 'colors' not in settings:
@@ -413,32 +754,34 @@ async def get_settings(db: Session = Depends(get_db)):
     if 'auto_tracking_interval' not in settings:
         settings['auto_tracking_interval'] = 30  # minutes
 
-    return settings
+    return json_with_etag(request, settings)
 
 
 @router.put("/settings")
-async def update_settings(settings_update: SettingsUpdate, background_tasks_dep: BackgroundTasks,
-                          db: Session = Depends(get_db)):
+async def update_settings(settings_update: SettingsUpdate, background_tasks_dep: BackgroundTasks):
     """Update application settings"""
     update_data = settings_update.dict(exclude_unset=True)
 
-    for key, value in update_data.items():
-        setting = db.query(AppSettings).filter(AppSettings.key == key).first()
+    def save_settings(db: Session):
+        for key, value in update_data.items():
+            setting = db.query(AppSettings).filter(AppSettings.key == key).first()
+
+            if setting:
+                setting.value = json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+                setting.updated_at = datetime.now()
+            else:
+                setting = AppSettings(
+                    key=key,
+                    value=json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+                )
+                db.add(setting)
 
-        if setting:
-            setting.value = json.dumps(value) if isinstance(value, (list, dict)) else str(value)
-            setting.updated_at = datetime.now()
-        else:
-            setting = AppSettings(
-                key=key,
-                value=json.dumps(value) if isinstance(value, (list, dict)) else str(value)
-            )
-            db.add(setting)
+        db.commit()
 
-    db.commit()
+    await blocking_executor.run_in_session(save_settings)
 
     # Restart background tasks with new settings
-    background_tasks_dep.add_task(background_tasks.restart_with_new_settings, update_data)
+    background_tasks_dep.add_task(background_task_manager.restart_with_new_settings, update_data)
 
     return {"message": "Settings updated"}
 
@@ -447,79 +790,52 @@ async def update_settings(settings_update: SettingsUpdate, background_tasks_dep:
 @router.post("/background-tasks/start")
 async def start_background_tasks():
     """Start background monitoring tasks"""
-    await background_tasks.start_all_tasks()
+    await background_task_manager.start_all_tasks()
     return {"message": "Background tasks started"}
 
 
 @router.post("/background-tasks/stop")
 async def stop_background_tasks():
     """Stop background monitoring tasks"""
-    await background_tasks.stop_all_tasks()
+    await background_task_manager.stop_all_tasks()
     return {"message": "Background tasks stopped"}
 
 
 @router.get("/background-tasks/status")
 async def get_background_tasks_status():
     """Get status of background tasks"""
-    return {
-        "price_monitoring_active": background_tasks.price_task_active,
-        "tracking_monitoring_active": background_tasks.tracking_task_active,
-        "last_price_check": background_tasks.last_price_check.isoformat() if background_tasks.last_price_check else None,
-        "last_tracking_check": background_tasks.last_tracking_check.isoformat() if background_tasks.last_tracking_check else None
-    }
+    return background_task_manager.get_status()
 
 
 # Notifications endpoints (unchanged)
 @router.get("/notifications")
-async def get_notifications(db: Session = Depends(get_db)):
+async def get_notifications():
     """Get all notifications"""
-    return notification_service.get_unread_notifications(db)
+    return await blocking_executor.run_in_session(notification_service.get_unread_notifications)
 
 
 @router.post("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
+async def mark_notification_read(notification_id: int):
     """Mark notification as read"""
-    return notification_service.mark_as_read(notification_id, db)
+    return await blocking_executor.run_in_session(lambda db: notification_service.mark_as_read(notification_id, db))
 
 
 @router.delete("/notifications")
-async def clear_all_notifications(db: Session = Depends(get_db)):
+async def clear_all_notifications():
     """Clear all notifications"""
-    return notification_service.clear_all_notifications(db)
+    return await blocking_executor.run_in_session(notification_service.clear_all_notifications)
 
 
 # Stats endpoints (unchanged)
 @router.get("/stats", response_model=StatsResponse)
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(request: Request):
     """Get dashboard statistics"""
-    total = db.query(Order).count()
-    transit = db.query(Order).filter(Order.status == 'Shipped').count()
-    value = db.query(func.sum(Order.price)).scalar() or 0
-    new_sellers = db.query(Order).filter(Order.seller_is_new == True).count()
-
-    return {
-        "total": total,
-        "transit": transit,
-        "value": f"{value:.2f}",
-        "new_sellers": new_sellers
-    }
+    snapshot = await blocking_executor.run_in_session(stats_service.get_snapshot)
+    return json_with_etag(request, {key: snapshot[key] for key in ('total', 'transit', 'value', 'new_sellers')})
 
 
 @router.get("/stats/detail")
-async def get_detailed_stats(db: Session = Depends(get_db)):
+async def get_detailed_stats(request: Request):
     """Get detailed statistics"""
-    by_status = {}
-    for status in ['Ordered', 'Shipped', 'Delivered']:
-        count = db.query(Order).filter(Order.status == status).count()
-        if count > 0:
-            by_status[status] = count
-
-    top_categories = db.query(
-        Order.category,
-        func.count(Order.id).label('count')
-    ).group_by(Order.category).order_by(func.count(Order.id).desc()).limit(5).all()
-
-    return {
-        "by_status": by_status,
-        "top_categories": [{"category": cat[0], "count": cat[1]} for cat in top_categories]
-    }
\ No newline at end of file
+    snapshot = await blocking_executor.run_in_session(stats_service.get_snapshot)
+    return json_with_etag(request, {key: snapshot[key] for key in ('by_status', 'top_categories')})
\ No newline at end of file
@@ -1,9 +1,32 @@
 # Unified tracking service for DHL and Hermes
+import asyncio
 import requests
 import json
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from app.core.config import settings
+from app.core.http_client import HttpClient
+from app.services.tracking_cache import tracking_cache
+from app.services.event_bus import event_bus
+
+DHL_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json"
+}
+
+HERMES_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json, text/plain, */*",
+    "Origin": "https://www.myhermes.de",
+    "Referer": "https://www.myhermes.de/",
+    "X-Language": "de"
+}
+
+HERMES_API_URL = "https://api.my-deliveries.de/tnt/parcelservice/parceldetails/{tracking_number}"
+
+# One pooled client per carrier endpoint, the per-host limit is the carrier concurrency
+dhl_client = HttpClient(headers=DHL_HEADERS, max_connections_per_host=settings.DHL_CONCURRENCY)
+hermes_client = HttpClient(headers=HERMES_HEADERS, max_connections_per_host=settings.HERMES_CONCURRENCY)
 
 
 class TrackingService:
@@ -18,9 +41,9 @@ class TrackingService:
             carrier = self.detect_carrier(tracking_number)
 
         if carrier == 'dhl':
-            return self.track_dhl(tracking_number)
+            tracking_data = self.track_dhl(tracking_number)
         elif carrier == 'hermes':
-            return self.track_hermes(tracking_number)
+            tracking_data = self.track_hermes(tracking_number)
         else:
             return {
                 'status': 'Unknown carrier',
@@ -28,6 +51,9 @@ class TrackingService:
                 'carrier': 'unknown'
             }
 
+        tracking_cache.put(carrier, tracking_number, tracking_data)
+        return tracking_data
+
     def detect_carrier(self, tracking_number: str) -> str:
         """Detect carrier based on tracking number format"""
         # DHL: typically 10-39 digits
@@ -48,148 +74,265 @@ class TrackingService:
     def track_dhl(self, tracking_number: str) -> Dict[str, Any]:
         """Track DHL package"""
         try:
-            url = "https://www.dhl.de/int-verfolgen/data/search"
             params = {
                 "piececode": tracking_number,
                 "inputSearch": "true",
                 "language": "de"
             }
-            headers = {
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "application/json"
-            }
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = requests.get(settings.DHL_API_URL, params=params, headers=DHL_HEADERS, timeout=10)
             response.raise_for_status()
-            data = response.json()
-
-            for shipment in data.get("sendungen", []):
-                if shipment.get("hasCompleteDetails"):
-                    details = shipment.get("sendungsdetails", {})
-                    history = details.get("sendungsverlauf", {})
-                    current_status = history.get("aktuellerStatus", "Status unknown")
-                    events = history.get("events", [])
-
-                    # Calculate progress
-                    progress = self._calculate_dhl_progress(current_status)
-
-                    # Format events
-                    formatted_events = []
-                    for event in events[:8]:
-                        event_date = event.get("datum", "")
-                        if event_date:
-                            try:
-                                dt = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
-                                formatted_date = dt.strftime('%d.%m.%Y, %H:%M')
-                            except:
-                                formatted_date = event_date
-                        else:
-                            formatted_date = "Unknown"
-
-                        formatted_events.append({
-                            'time': formatted_date,
-                            'text': event.get("status", "")
-                        })
-
-                    return {
-                        'carrier': 'DHL',
-                        'status': current_status,
-                        'progress': progress,
-                        'history': formatted_events,
-                        'last_update': datetime.now().isoformat(),
-                        'url': f"https://www.dhl.de/de/privatkunden/pakete-empfangen/verfolgen.html?piececode={tracking_number}"
-                    }
-
-            return {
-                'carrier': 'DHL',
-                'status': 'Package not found',
-                'progress': 0,
-                'history': [],
-                'error': 'No tracking data available'
-            }
+            return self._parse_dhl_response(response.json(), [tracking_number])[tracking_number]
 
         except Exception as e:
-            return {
-                'carrier': 'DHL',
-                'status': 'Tracking error',
-                'progress': 0,
-                'history': [],
-                'error': str(e)
-            }
+            return self._dhl_error(str(e))
 
     def track_hermes(self, tracking_number: str) -> Dict[str, Any]:
         """Track Hermes package"""
         try:
-            url = f"https://api.my-deliveries.de/tnt/parcelservice/parceldetails/{tracking_number}"
-            headers = {
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "application/json, text/plain, */*",
-                "Origin": "https://www.myhermes.de",
-                "Referer": "https://www.myhermes.de/",
-                "X-Language": "de"
-            }
-
-            response = requests.get(url, headers=headers, timeout=10)
+            url = HERMES_API_URL.format(tracking_number=tracking_number)
+            response = requests.get(url, headers=HERMES_HEADERS, timeout=10)
             response.raise_for_status()
 
             if "application/json" not in response.headers.get("Content-Type", ""):
                 raise ValueError("Invalid response from Hermes API")
 
-            data = response.json()
-
-            current_status = data.get("status", {}).get("text", {}).get("longText", "Unknown")
-            short_status = data.get("status", {}).get("text", {}).get("shortText", "")
-
-            # Calculate progress
-            progress = self._calculate_hermes_progress(current_status, short_status)
-
-            # Format history
-            formatted_events = []
-            for event in data.get("parcelHistory", []):
-                timestamp = event.get("timestamp")
-                if timestamp:
-                    try:
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        formatted_date = dt.strftime('%d.%m.%Y, %H:%M')
-                    except:
-                        formatted_date = timestamp
-                else:
-                    formatted_date = "Pending"
-
-                status_text = event.get("statusHistoryText") or event.get("status", "")
-                # Convert internal status codes to readable text
-                status_map = {
-                    "SENDUNG_IN_ZIELREGION_ANGEKOMMEN": "Package arrived in destination region",
-                    "ZUSTELLTOUR": "Out for delivery",
-                    "ZUGESTELLT": "Delivered"
+            return self._parse_hermes_response(response.json(), tracking_number)
+
+        except Exception as e:
+            return self._hermes_error(str(e))
+
+    async def track_many(self, shipments: List[Tuple[str, str]], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Track many packages concurrently, keyed by tracking number
+        shipments are (tracking_number, carrier) pairs, carrier may be 'auto'
+        DHL numbers are sent in batches, every carrier has its own connection pool and concurrency limit
+        With use_cache, shipments whose last result is still fresh (or terminal) are skipped
+        and missing from the result
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        carriers: Dict[str, str] = {}
+        dhl_numbers: List[str] = []
+        hermes_numbers: List[str] = []
+
+        for tracking_number, carrier in shipments:
+            if not carrier or carrier == 'auto':
+                carrier = self.detect_carrier(tracking_number)
+            carriers[tracking_number] = carrier
+
+            if use_cache and tracking_cache.is_fresh(carrier, tracking_number):
+                continue
+
+            if carrier == 'dhl':
+                dhl_numbers.append(tracking_number)
+            elif carrier == 'hermes':
+                hermes_numbers.append(tracking_number)
+            else:
+                results[tracking_number] = {
+                    'status': 'Unknown carrier',
+                    'error': 'Could not determine carrier',
+                    'carrier': 'unknown'
                 }
-                status_text = status_map.get(status_text, status_text)
 
-                if status_text:  # Only add if there's actual status text
-                    formatted_events.append({
-                        'time': formatted_date,
-                        'text': status_text
-                    })
+        batch_size = max(1, settings.DHL_BATCH_SIZE)
+        tasks = [
+            self.track_dhl_batch(dhl_numbers[i:i + batch_size])
+            for i in range(0, len(dhl_numbers), batch_size)
+        ]
+        tasks += [self._track_hermes_async(tracking_number) for tracking_number in hermes_numbers]
 
-            return {
-                'carrier': 'Hermes',
-                'status': current_status,
-                'short_status': short_status,
-                'destination': data.get("metaInformation", {}).get("destination", ""),
-                'progress': progress,
-                'history': formatted_events,
-                'last_update': datetime.now().isoformat(),
-                'url': f"https://www.myhermes.de/empfangen/sendungsverfolgung/sendungsinformation#{tracking_number}"
+        for batch_result in await asyncio.gather(*tasks):
+            results.update(batch_result)
+
+        for tracking_number, tracking_data in results.items():
+            tracking_cache.put(carriers.get(tracking_number, 'unknown'), tracking_number, tracking_data)
+        return results
+
+    async def track_dhl_batch(self, tracking_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Track several DHL packages with a single search request"""
+        try:
+            params = {
+                "piececode": ",".join(tracking_numbers),
+                "inputSearch": "true",
+                "language": "de"
             }
 
+            response = await dhl_client.get(settings.DHL_API_URL, params=params, timeout=10)
+            response.raise_for_status()
+            return self._parse_dhl_response(response.json(), tracking_numbers)
+
         except Exception as e:
-            return {
-                'carrier': 'Hermes',
-                'status': 'Tracking error',
-                'progress': 0,
-                'history': [],
-                'error': str(e)
+            return {tracking_number: self._dhl_error(str(e)) for tracking_number in tracking_numbers}
+
+    async def _track_hermes_async(self, tracking_number: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            response = await hermes_client.get(HERMES_API_URL.format(tracking_number=tracking_number), timeout=10)
+            response.raise_for_status()
+
+            if "application/json" not in response.headers.get("Content-Type", ""):
+                raise ValueError("Invalid response from Hermes API")
+
+            return {tracking_number: self._parse_hermes_response(response.json(), tracking_number)}
+
+        except Exception as e:
+            return {tracking_number: self._hermes_error(str(e))}
+
+    def apply_to_order(self, order, tracking_data: Dict[str, Any], carrier: str) -> bool:
+        """Store tracking data on an order and advance its status, returns True if the status changed"""
+        previous = (order.status, order.dhl_status)
+        if hasattr(order, 'carrier'):
+            order.carrier = tracking_data.get('carrier', '').lower() if 'carrier' in tracking_data else carrier
+
+        order.tracking_details = json.dumps(tracking_data)
+        order.dhl_details = json.dumps(tracking_data)
+        order.dhl_status = tracking_data.get('status', '')
+        order.dhl_last_update = datetime.now()
+
+        if tracking_data.get('progress', 0) == 100:
+            order.status = 'Delivered'
+        elif 'error' not in tracking_data and order.status == 'Ordered':
+            order.status = 'Shipped'
+
+        return (order.status, order.dhl_status) != previous
+
+    def update_events(self, orders) -> List[Dict[str, Any]]:
+        """Event payloads for changed orders, read them in the session the orders belong to"""
+        return [{
+            'order_id': order.id,
+            'title': order.title,
+            'status': order.status,
+            'tracking_status': order.dhl_status
+        } for order in orders]
+
+    def publish_updates(self, orders):
+        """Push changed orders to open dashboards (call after the changes are committed)"""
+        for event in self.update_events(orders):
+            event_bus.publish('tracking_update', event)
+
+    def _parse_dhl_response(self, data: Dict[str, Any], tracking_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Map the shipments of a DHL search response to the requested tracking numbers"""
+        results = {}
+        shipments = [shipment for shipment in data.get("sendungen", []) if shipment.get("hasCompleteDetails")]
+
+        for shipment in shipments:
+            searched = shipment.get("sendungsinfo", {}).get("gesuchteSendungsnummer") or shipment.get("id")
+            if searched in tracking_numbers and searched not in results:
+                results[searched] = self._parse_dhl_shipment(shipment, searched)
+
+        # Single lookups may come back without the searched number
+        if len(tracking_numbers) == 1 and not results and shipments:
+            results[tracking_numbers[0]] = self._parse_dhl_shipment(shipments[0], tracking_numbers[0])
+
+        for tracking_number in tracking_numbers:
+            if tracking_number not in results:
+                results[tracking_number] = {
+                    'carrier': 'DHL',
+                    'status': 'Package not found',
+                    'progress': 0,
+                    'history': [],
+                    'error': 'No tracking data available'
+                }
+        return results
+
+    def _parse_dhl_shipment(self, shipment: Dict[str, Any], tracking_number: str) -> Dict[str, Any]:
+        details = shipment.get("sendungsdetails", {})
+        history = details.get("sendungsverlauf", {})
+        current_status = history.get("aktuellerStatus", "Status unknown")
+        events = history.get("events", [])
+
+        # Calculate progress
+        progress = self._calculate_dhl_progress(current_status)
+
+        # Format events
+        formatted_events = []
+        for event in events[:8]:
+            event_date = event.get("datum", "")
+            if event_date:
+                try:
+                    dt = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
+                    formatted_date = dt.strftime('%d.%m.%Y, %H:%M')
+                except:
+                    formatted_date = event_date
+            else:
+                formatted_date = "Unknown"
+
+            formatted_events.append({
+                'time': formatted_date,
+                'text': event.get("status", "")
+            })
+
+        return {
+            'carrier': 'DHL',
+            'status': current_status,
+            'progress': progress,
+            'history': formatted_events,
+            'last_update': datetime.now().isoformat(),
+            'url': f"https://www.dhl.de/de/privatkunden/pakete-empfangen/verfolgen.html?piececode={tracking_number}"
+        }
+
+    def _dhl_error(self, error: str) -> Dict[str, Any]:
+        return {
+            'carrier': 'DHL',
+            'status': 'Tracking error',
+            'progress': 0,
+            'history': [],
+            'error': error
+        }
+
+    def _parse_hermes_response(self, data: Dict[str, Any], tracking_number: str) -> Dict[str, Any]:
+        current_status = data.get("status", {}).get("text", {}).get("longText", "Unknown")
+        short_status = data.get("status", {}).get("text", {}).get("shortText", "")
+
+        # Calculate progress
+        progress = self._calculate_hermes_progress(current_status, short_status)
+
+        # Format history
+        formatted_events = []
+        for event in data.get("parcelHistory", []):
+            timestamp = event.get("timestamp")
+            if timestamp:
+                try:
+                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                    formatted_date = dt.strftime('%d.%m.%Y, %H:%M')
+                except:
+                    formatted_date = timestamp
+            else:
+                formatted_date = "Pending"
+
+            status_text = event.get("statusHistoryText") or event.get("status", "")
+            # Convert internal status codes to readable text
+            status_map = {
+                "SENDUNG_IN_ZIELREGION_ANGEKOMMEN": "Package arrived in destination region",
+                "ZUSTELLTOUR": "Out for delivery",
+                "ZUGESTELLT": "Delivered"
             }
+            status_text = status_map.get(status_text, status_text)
+
+            if status_text:  # Only add if there's actual status text
+                formatted_events.append({
+                    'time': formatted_date,
+                    'text': status_text
+                })
+
+        return {
+            'carrier': 'Hermes',
+            'status': current_status,
+            'short_status': short_status,
+            'destination': data.get("metaInformation", {}).get("destination", ""),
+            'progress': progress,
+            'history': formatted_events,
+            'last_update': datetime.now().isoformat(),
+            'url': f"https://www.myhermes.de/empfangen/sendungsverfolgung/sendungsinformation#{tracking_number}"
+        }
+
+    def _hermes_error(self, error: str) -> Dict[str, Any]:
+        return {
+            'carrier': 'Hermes',
+            'status': 'Tracking error',
+            'progress': 0,
+            'history': [],
+            'error': error
+        }
 
     def _calculate_dhl_progress(self, status: str) -> int:
         """Calculate progress for DHL shipments"""
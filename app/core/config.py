@@ -5,7 +5,19 @@ from typing import Optional
 class Settings:
     """Application settings"""
     # Database
-    DATABASE_URL: str = "sqlite:///kleinmanager.db"
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///kleinmanager.db")  # postgresql://... needs psycopg2
+    DB_POOL_SIZE: int = 8  # Connections kept open, matches the blocking thread pool
+    DB_MAX_OVERFLOW: int = 4  # Extra connections under load
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 30 * 60  # Seconds, PostgreSQL only
+
+    # SQLite pragmas, applied to every connection
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers don't block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL, far fewer fsyncs than FULL
+    SQLITE_BUSY_TIMEOUT: int = 5000  # Milliseconds to wait for a lock before "database is locked"
+    SQLITE_CACHE_SIZE: int = -64000  # Negative values are KiB (64 MB page cache)
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # Bytes of the file mapped into memory
+    SQLITE_TEMP_STORE: str = "MEMORY"
     
     # Paths
     IMAGE_STORAGE_PATH: str = "images"
@@ -17,7 +29,17 @@ class Settings:
     
     # DHL Tracking
     DHL_API_URL: str = "https://www.dhl.de/int-verfolgen/data/search"
-    DHL_TRACKING_DELAY: int = 1  # Seconds between requests
+    DHL_BATCH_SIZE: int = 10  # Piececodes per search request
+    DHL_CONCURRENCY: int = 4  # Parallel requests to the DHL endpoint
+    HERMES_CONCURRENCY: int = 4  # Parallel requests to the Hermes endpoint
+
+    # Tracking cache (seconds until a shipment is polled again)
+    TRACKING_TTL_OUT_FOR_DELIVERY: int = 10 * 60
+    TRACKING_TTL_IN_TRANSIT: int = 30 * 60
+    TRACKING_TTL_ANNOUNCED: int = 6 * 60 * 60
+    TRACKING_TTL_DEFAULT: int = 60 * 60
+    TRACKING_ERROR_BACKOFF: int = 15 * 60  # Doubles with every consecutive error
+    TRACKING_ERROR_BACKOFF_MAX: int = 24 * 60 * 60
     
     # Application
     APP_NAME: str = "KleinManager"
@@ -26,6 +48,65 @@ class Settings:
     
     # Scraping
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    HTML_PARSER: str = "auto"  # auto, selectolax, lxml or bs4
+
+    # HTTP client
+    HTTP2_ENABLED: bool = True
+    HTTP_TIMEOUT: float = 15.0  # Seconds for read/write/pool
+    HTTP_CONNECT_TIMEOUT: float = 5.0  # Seconds
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 6
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds
+
+    # Image downloads
+    IMAGE_DOWNLOAD_CONCURRENCY: int = 4
+    IMAGE_DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # Bytes
+    IMAGE_DOWNLOAD_DEFERRED: bool = True  # Download after the order is saved
+    IMAGE_THUMBNAIL_WIDTHS: tuple = (160, 320, 640)  # Pixels
+    IMAGE_THUMBNAIL_FORMATS: tuple = ("avif", "webp")  # In order of preference, skipped if Pillow lacks them
+    IMAGE_THUMBNAIL_QUALITY: int = 70
+
+    # Price checks
+    PRICE_CHECK_RATE: float = 1.0  # Requests per second across all workers
+    PRICE_CHECK_CONCURRENCY: int = 4  # Parallel workers
+    PRICE_CHECK_JITTER: float = 1.0  # Max random delay per item in seconds
+    PRICE_CHECK_MIN_INTERVAL: int = 15  # Minutes, for items that change often
+    PRICE_CHECK_MAX_INTERVAL: int = 24 * 60  # Minutes, for items that never change
+    PRICE_CHECK_INTERVAL_FACTOR: float = 1.5  # Interval shrinks/grows by this factor per check
+    PRICE_CHECK_POLL_INTERVAL: int = 60  # Max seconds between looks at the due queue
+
+    # Blocking work
+    BLOCKING_POOL_SIZE: int = 8  # Threads for scraping, tracking and database calls
+    LOOP_MONITOR_INTERVAL: float = 0.5  # Seconds between event loop probes
+    LOOP_BLOCK_THRESHOLD: float = 0.1  # Seconds of lag that count as a blocked loop
+
+    # Job queue
+    JOB_WORKERS: int = 2  # Jobs of different kinds that run at the same time
+    JOB_RETENTION_DAYS: int = 7  # Finished jobs are deleted after this many days
+
+    # Live events (server-sent events)
+    EVENTS_HEARTBEAT: int = 15  # Seconds between keep-alive comments
+    EVENTS_QUEUE_SIZE: int = 100  # Buffered events per client before old ones are dropped
+    EVENTS_HISTORY_SIZE: int = 200  # Events kept for clients that reconnect
+
+    # List endpoints
+    PAGE_SIZE_DEFAULT: int = 100  # Rows per page when no limit is given
+    PAGE_SIZE_MAX: int = 500
+
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes, smaller responses are sent as they are
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5  # 0-11, higher is smaller but slower
+
+    # Dashboard statistics
+    STATS_MATERIALIZED: bool = True  # Read trigger-maintained counters instead of aggregating (SQLite)
+    STATS_CACHE_TTL: float = 5.0  # Seconds a statistics snapshot is reused
+
+    # Seller cache
+    SELLER_CACHE_TTL: int = 30 * 24 * 60 * 60  # Seconds
+    SELLER_CACHE_INCOMPLETE_TTL: int = 60 * 60  # Seconds, profiles whose registration date wasn't found
+    SELLER_CACHE_MAX_ENTRIES: int = 1024
 
 settings = Settings()
 
@@ -0,0 +1,148 @@
+# app/core/executor.py
+# Runs blocking work (requests, SQLAlchemy, file system) off the event loop and measures loop stalls
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, TypeVar
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+T = TypeVar('T')
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pool for synchronous scraping, tracking and database work
+    Async handlers await run() instead of calling blocking code on the event loop
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.BLOCKING_POOL_SIZE
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Timings are updated from the worker threads
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'in_flight': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0
+        }
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blocking")
+        return self._pool
+
+    def _timed(self, func: Callable[..., T]) -> T:
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.stats['total_seconds'] += elapsed
+                self.stats['max_seconds'] = max(self.stats['max_seconds'], elapsed)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run func(*args, **kwargs) in the pool and wait for the result"""
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            self.stats['calls'] += 1
+            self.stats['in_flight'] += 1
+        try:
+            return await loop.run_in_executor(self.pool, self._timed, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._stats_lock:
+                self.stats['in_flight'] -= 1
+
+    async def run_in_session(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run func(db, *args, **kwargs) in the pool with a database session of its own
+        The session is opened and closed in the worker thread and never used on the event loop,
+        objects returned by func are detached, so refresh them after a commit
+        """
+        return await self.run(self._in_session, func, *args, **kwargs)
+
+    @staticmethod
+    def _in_session(func: Callable[..., T], *args, **kwargs) -> T:
+        db = SessionLocal()
+        try:
+            return func(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            'max_workers': self.max_workers,
+            'avg_seconds': stats['total_seconds'] / stats['calls'] if stats['calls'] else 0.0
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class EventLoopMonitor:
+    """
+    Measures how long the event loop is blocked
+    A probe sleeps for a fixed interval, any extra delay on wake-up is time the loop spent on other work
+    """
+
+    def __init__(self, interval: Optional[float] = None, threshold: Optional[float] = None):
+        self.interval = interval or settings.LOOP_MONITOR_INTERVAL
+        self.threshold = threshold or settings.LOOP_BLOCK_THRESHOLD
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'samples': 0,
+            'blocked_count': 0,
+            'blocked_seconds': 0.0,
+            'max_lag_seconds': 0.0,
+            'last_lag_seconds': 0.0
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._probe())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _probe(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+
+            self.stats['samples'] += 1
+            self.stats['last_lag_seconds'] = lag
+            self.stats['max_lag_seconds'] = max(self.stats['max_lag_seconds'], lag)
+            if lag >= self.threshold:
+                self.stats['blocked_count'] += 1
+                self.stats['blocked_seconds'] += lag
+                print(f"⚠️ Event loop was blocked for {lag * 1000:.0f} ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'running': self._task is not None and not self._task.done(),
+            'interval_seconds': self.interval,
+            'threshold_seconds': self.threshold
+        }
+
+
+# Global instances
+blocking_executor = BlockingExecutor()
+loop_monitor = EventLoopMonitor()
@@ -0,0 +1,189 @@
+# HTTP caching: ETags for read-mostly API responses, content-hashed static asset URLs
+# and ranged file responses
+import hashlib
+import json
+import os
+from email.utils import formatdate
+from typing import Any, Dict, Optional, Tuple
+
+import aiofiles
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if If-None-Match names this ETag, weak or strong"""
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def json_with_etag(request: Request, data: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """JSON response with an ETag, 304 if the client already has this version"""
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class StaticAssets:
+    """
+    Versioned URLs for files under /static: /static/js/app.js?v=<content hash>
+    A changed file gets a new URL, so browsers may cache every version forever
+    """
+
+    def __init__(self, directory: str, url_prefix: str = "/static"):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self._hashes: Dict[str, Tuple[float, str]] = {}
+
+    def content_hash(self, path: str) -> Optional[str]:
+        full_path = os.path.join(self.directory, path)
+        try:
+            mtime = os.path.getmtime(full_path)
+        except OSError:
+            return None
+
+        cached = self._hashes.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(full_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        self._hashes[path] = (mtime, digest)
+        return digest
+
+    def url(self, path: str) -> str:
+        path = path.lstrip("/")
+        digest = self.content_hash(path)
+        return f"{self.url_prefix}/{path}?v={digest}" if digest else f"{self.url_prefix}/{path}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks versioned URLs as immutable, unversioned ones are revalidated by ETag"""
+
+    def __init__(self, *args, assets: StaticAssets, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304):
+            return response
+
+        version = Request(scope).query_params.get("v")
+        if version and version == self.assets.content_hash(path):
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) of a single "bytes=" range, end inclusive
+    None means serve the whole file, a start past the end raises ValueError (416)
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None  # Multipart ranges are not worth it for images, send everything
+    first, _, last = ranges.strip().partition("-")
+    if not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None  # Malformed, ignore the header
+
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - int(last), 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class RangedFileResponse(Response):
+    """
+    File response with byte ranges, streamed from disk
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers it,
+    otherwise reads the file in chunks
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, status_code: int, headers: Dict[str, str], media_type: str):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.length = end - start + 1 if end >= start else 0
+        self.headers["content-length"] = str(self.length)
+
+    async def __call__(self, scope: Scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_response(request: Request, path: str, media_type: str, etag: str, cache_control: str,
+                  extra_headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve a file with ETag revalidation and Range requests"""
+    stat = os.stat(path)
+    headers = {
+        **(extra_headers or {}),
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            return RangedFileResponse(path, start, end, 206, headers, media_type)
+
+    return RangedFileResponse(path, 0, stat.st_size - 1, 200, headers, media_type)
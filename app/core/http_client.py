@@ -0,0 +1,69 @@
+# Shared async HTTP client for all outgoing requests
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+
+class HttpClient:
+    """Pooled HTTP/2-capable client with keep-alive and per-host connection limits"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, max_connections_per_host: Optional[int] = None):
+        self.headers = headers or {'User-Agent': settings.USER_AGENT}
+        self.max_connections_per_host = max_connections_per_host or settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Underlying httpx client, created lazily on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=settings.HTTP2_ENABLED,
+                headers=self.headers,
+                follow_redirects=True,
+                timeout=httpx.Timeout(
+                    settings.HTTP_TIMEOUT,
+                    connect=settings.HTTP_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+                )
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent requests to a single host"""
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_limits[host]
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Send a GET request through the shared connection pool"""
+        async with self._host_limit(url):
+            return await self.client.get(url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Stream a response body instead of loading it into memory"""
+        async with self._host_limit(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_limits.clear()
+
+
+# Global instance
+http_client = HttpClient()
@@ -0,0 +1,112 @@
+# app/core/migrations.py
+# Versioned schema migrations, applied once per database at startup
+import os
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.core.database import engine, Base, add_missing_columns
+
+# Bookkeeping table, kept out of Base so create_all() of the models never touches it
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, default=datetime.now)
+)
+
+
+def _create_model_indexes(conn: Connection, *table_names: str):
+    """Create the indexes declared on the models that a database created by an older version lacks"""
+    for table_name in table_names:
+        for index in Base.metadata.tables[table_name].indexes:
+            index.create(bind=conn, checkfirst=True)
+    if conn.dialect.name == "sqlite":
+        # Give the query planner statistics for the new indexes
+        conn.execute(text("ANALYZE"))
+
+
+def _hot_query_indexes(conn: Connection):
+    _create_model_indexes(conn, "orders", "watched_items", "notifications")
+
+
+def _price_history_blobs(conn: Connection):
+    from app.services.price_history import migrate_price_history_blobs
+    migrate_price_history_blobs(conn)
+
+
+def _full_text_search(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        print("ℹ️ Full-text search needs SQLite FTS5, search falls back to LIKE")
+        return
+    from app.services.search import create_search_index
+    create_search_index(conn)
+
+
+def _order_stats(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        return
+    from app.services.stats_service import create_stats_table
+    create_stats_table(conn)
+
+
+def _content_addressed_images(conn: Connection):
+    from sqlalchemy.orm import Session
+    from app.services.image_store import image_store, import_legacy_images
+    result = import_legacy_images(Session(bind=conn))
+    if result['moved']:
+        print(f"🖼️ Moved {result['moved']} images into the image store ({result['deduplicated']} duplicates)")
+
+    def remove_legacy_files():
+        for name in result['legacy_names']:
+            if os.path.exists(image_store.path(name)):
+                os.remove(image_store.path(name))
+    return remove_legacy_files
+
+
+# A step may return a callable that runs after its transaction committed, for changes outside the database
+MigrationStep = Callable[[Connection], Optional[Callable[[], None]]]
+
+# (version, name, step) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, MigrationStep]] = [
+    (1, "hot_query_indexes", _hot_query_indexes),
+    (2, "price_history_blobs", _price_history_blobs),
+    (3, "full_text_search", _full_text_search),
+    (4, "order_stats", _order_stats),
+    (5, "content_addressed_images", _content_addressed_images),
+]
+
+
+def applied_versions(db_engine: Engine) -> List[int]:
+    with db_engine.connect() as conn:
+        return [row[0] for row in conn.execute(select(schema_migrations.c.version))]
+
+
+def run_migrations(db_engine: Optional[Engine] = None):
+    """
+    Bring the database schema up to date
+    Missing tables and columns are created first, then every migration that was not applied yet
+    runs in its own transaction and is recorded in schema_migrations
+    """
+    db_engine = db_engine or engine
+
+    # Register all models before creating tables
+    import app.models.order  # noqa: F401
+    import app.services.notification_service  # noqa: F401
+
+    Base.metadata.create_all(bind=db_engine)
+    migration_metadata.create_all(bind=db_engine)
+    add_missing_columns(db_engine)
+
+    done = set(applied_versions(db_engine))
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        with db_engine.begin() as conn:
+            after_commit = step(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=name, applied_at=datetime.now()))
+        if after_commit:
+            after_commit()
+        print(f"🗄️ Applied migration {version}: {name}")
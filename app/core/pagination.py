@@ -0,0 +1,101 @@
+# Keyset pagination and field projection for the list endpoints
+import base64
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, load_only
+
+from app.core.http_cache import json_with_etag
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing after the row with this (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(query: Query, model, cursor: Optional[str], limit: int) -> Tuple[list, Optional[str]]:
+    """
+    One page of a query, newest first
+    Seeks past the cursor on (created_at, id) instead of using OFFSET, so every page
+    costs the same index range scan no matter how deep the client pages
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            (model.created_at == created_at) & (model.id < row_id)
+        ))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def parse_fields(fields: Optional[str], *schemas: Type[BaseModel]) -> Optional[List[str]]:
+    """Field names from ?fields=a,b,c, validated against the response schemas"""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    known = set().union(*(schema.model_fields for schema in schemas))
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def load_columns(query: Query, model, names: Iterable[str]) -> Query:
+    """Only load these columns (plus the keyset columns) from the table"""
+    columns = set(names) & set(model.__table__.columns.keys())
+    columns |= {"id", "created_at"}
+    return query.options(load_only(*[getattr(model, name) for name in sorted(columns)]))
+
+
+def page_response(request: Request, items: list, schema: Type[BaseModel], next_cursor: Optional[str],
+                  fields: Optional[List[str]] = None) -> Response:
+    """Serialize a page with the schema, or only the requested fields of it, with an ETag"""
+    if fields:
+        content: Any = [{name: getattr(item, name, None) for name in fields} for item in items]
+    else:
+        content = [schema.model_validate(item).model_dump() for item in items]
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return json_with_etag(request, content, headers)
+
+
+def page_responses(*schemas: Type[BaseModel]) -> Dict[int, Dict[str, Any]]:
+    """
+    OpenAPI description for endpoints returning page_response()
+    The endpoints return a Response themselves, so the shapes are documented here instead of in response_model
+    """
+    return {
+        200: {
+            "model": List[Union[schemas]],
+            "description": "One page of items, with fields=a,b,c only the listed keys of each item",
+            "headers": {
+                NEXT_CURSOR_HEADER: {
+                    "description": "Cursor of the next page, missing on the last page",
+                    "schema": {"type": "string"}
+                },
+                "ETag": {"description": "Version of this page", "schema": {"type": "string"}}
+            }
+        },
+        304: {"description": "The page has not changed since the ETag sent in If-None-Match"}
+    }
@@ -1,11 +1,21 @@
 ﻿# app/models/order.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index, text
 from datetime import datetime
 from app.core.database import Base
 
 class Order(Base):
     """Order model representing a Kleinanzeigen purchase"""
     __tablename__ = "orders"
+    __table_args__ = (
+        Index('ix_orders_created_at', 'created_at'),
+        Index('ix_orders_status_created', 'status', 'created_at'),
+        Index('ix_orders_color_created', 'color', 'created_at'),
+        # Partial index for the tracking loop, only orders with a tracking number
+        Index('ix_orders_active_tracking', 'status',
+              sqlite_where=text('tracking_number IS NOT NULL'),
+              postgresql_where=text('tracking_number IS NOT NULL')),
+        Index('ix_orders_seller_is_new', 'seller_is_new'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ad_id = Column(String, unique=True, index=True)
@@ -36,6 +46,10 @@ class Order(Base):
 class WatchedItem(Base):
     """Watched item model for price monitoring"""
     __tablename__ = "watched_items"
+    __table_args__ = (
+        Index('ix_watched_items_created_at', 'created_at'),
+        Index('ix_watched_items_notifications_next_check', 'notifications_enabled', 'next_check_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ad_id = Column(String, unique=True, index=True)
@@ -44,12 +58,30 @@ class WatchedItem(Base):
     current_price = Column(Float, default=0.0)
     initial_price = Column(Float, default=0.0)
     last_price = Column(Float, default=0.0)
-    price_history = Column(Text)  # JSON string
+    price_history = Column(Text)  # Legacy JSON string, migrated to the price_history table
     notifications_enabled = Column(Boolean, default=True)
+    etag = Column(String)  # Validators for conditional requests
+    last_modified = Column(String)
+    content_hash = Column(String)  # Hash of the price region of the last fetched page
+    check_interval = Column(Integer)  # Minutes, adapted to how often the price changes
+    check_interval_override = Column(Integer)  # Minutes, fixed interval set by the user
+    next_check_at = Column(DateTime, index=True)
     last_checked = Column(DateTime, default=datetime.now)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+class PriceHistory(Base):
+    """Price observation of a watched item"""
+    __tablename__ = "price_history"
+    __table_args__ = (
+        Index('ix_price_history_item_observed', 'item_id', 'observed_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey('watched_items.id', ondelete='CASCADE'), nullable=False)
+    price = Column(Float, nullable=False)
+    observed_at = Column(DateTime, default=datetime.now, nullable=False)
+
 class MyListing(Base):
     """My listings from Kleinanzeigen"""
     __tablename__ = "my_listings"
@@ -68,6 +100,35 @@ class MyListing(Base):
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+class SellerProfile(Base):
+    """Cached seller profile data scraped from /s-bestandsliste pages"""
+    __tablename__ = "seller_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_url = Column(String, unique=True, index=True, nullable=False)
+    name = Column(String)
+    since = Column(String)
+    is_new = Column(Boolean, default=False)
+    fetched_at = Column(DateTime, default=datetime.now)
+
+class Job(Base):
+    """Long-running bulk operation executed by the job queue"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index('ix_jobs_kind_status', 'kind', 'status'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # check_all_prices, update_all_tracking, sync_my_listings
+    status = Column(String, default="queued", index=True)  # queued, running, done, failed, cancelled
+    progress = Column(Integer, default=0)
+    total = Column(Integer, default=0)
+    result = Column(Text)  # JSON string
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
 class AppSettings(Base):
     """Application settings"""
     __tablename__ = "app_settings"
@@ -46,6 +46,31 @@ class OrderResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class OrderListItem(BaseModel):
+    """Compact schema for order lists, without description, image URLs and tracking history"""
+    id: int
+    ad_id: Optional[str]
+    title: str
+    price: float
+    category: Optional[str]
+    location: Optional[str]
+    seller_name: Optional[str]
+    seller_since: Optional[str]
+    seller_is_new: bool
+    article_url: Optional[str]
+    local_images: Optional[str]
+    tracking_number: Optional[str]
+    carrier: Optional[str]
+    tracking: Optional[Dict[str, Any]] = None  # carrier, progress, status and error of the last tracking result
+    status: str
+    color: Optional[str]
+    notes: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class WatchedItemCreate(BaseModel):
     """Schema for creating a watched item"""
     url: HttpUrl
@@ -53,6 +78,7 @@ class WatchedItemCreate(BaseModel):
 class WatchedItemUpdate(BaseModel):
     """Schema for updating a watched item"""
     notifications_enabled: Optional[bool] = None
+    check_interval_override: Optional[int] = None  # minutes, null = adaptive
 
 class WatchedItemResponse(BaseModel):
     """Schema for watched item response"""
@@ -63,8 +89,14 @@ class WatchedItemResponse(BaseModel):
     current_price: float
     initial_price: float
     last_price: float
-    price_history: Optional[str]
+    lowest_price: Optional[float] = None
+    highest_price: Optional[float] = None
+    price_changes: int = 0
+    recent_prices: List[float] = []
     notifications_enabled: bool
+    check_interval: Optional[int] = None
+    check_interval_override: Optional[int] = None
+    next_check_at: Optional[datetime] = None
     last_checked: datetime
     created_at: datetime
     updated_at: datetime
@@ -72,6 +104,19 @@ class WatchedItemResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PriceHistoryEntry(BaseModel):
+    """Schema for a single price observation"""
+    price: float
+    date: datetime
+
+class PriceHistoryBucket(BaseModel):
+    """Schema for a downsampled price history bucket"""
+    date: datetime
+    price: float
+    min_price: float
+    max_price: float
+    count: int
+
 class MyListingResponse(BaseModel):
     """Schema for my listing response"""
     id: int
@@ -113,6 +158,28 @@ class TrackingUpdate(BaseModel):
     """Schema for tracking update response"""
     updated: int
 
+class JobResponse(BaseModel):
+    """Schema for a bulk job and its progress"""
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    deduplicated: bool = False  # True if an already queued/running job was returned
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class SearchResult(BaseModel):
+    """Schema for a full-text search hit, title and snippet contain <mark> highlights"""
+    kind: str  # order, watched_item or listing
+    id: int
+    title: str
+    snippet: str
+    score: float
+
 class NotificationResponse(BaseModel):
     """Schema for notification response"""
     id: int
@@ -3,10 +3,14 @@ import json
 from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.executor import blocking_executor
 from app.models.order import WatchedItem, Order, AppSettings
 from app.services.watcher import PriceWatcher
+from app.services.price_scheduler import PriceCheckScheduler
 from app.api.tracking_service import TrackingService
+from app.services.event_bus import event_bus
 
 
 class BackgroundTaskManager:
@@ -19,6 +23,7 @@ class BackgroundTaskManager:
         self.last_tracking_check: Optional[datetime] = None
 
         self.price_watcher = PriceWatcher()
+        self.price_scheduler = PriceCheckScheduler(self.price_watcher)
         self.tracking_service = TrackingService()
 
         # Default intervals (in minutes)
@@ -27,6 +32,14 @@ class BackgroundTaskManager:
         self.auto_price_enabled = True
         self.auto_tracking_enabled = True
 
+    def get_status(self) -> dict:
+        return {
+            "price_monitoring_active": self.price_task_active,
+            "tracking_monitoring_active": self.tracking_task_active,
+            "last_price_check": self.last_price_check.isoformat() if self.last_price_check else None,
+            "last_tracking_check": self.last_tracking_check.isoformat() if self.last_tracking_check else None
+        }
+
     async def start_all_tasks(self):
         """Start all background monitoring tasks"""
         await self.load_settings()
@@ -38,8 +51,7 @@ class BackgroundTaskManager:
         await self.stop_price_monitoring()
         await self.stop_tracking_monitoring()
 
-    async def load_settings(self):
-        """Load settings from database"""
+    def _read_settings(self) -> dict:
         db = SessionLocal()
         try:
             settings = {}
@@ -49,14 +61,20 @@ class BackgroundTaskManager:
                     settings[setting.key] = json.loads(setting.value)
                 except:
                     settings[setting.key] = setting.value
-
-            self.auto_price_enabled = settings.get('auto_check_enabled', True)
-            self.price_check_interval = settings.get('auto_check_interval', 60)
-            self.auto_tracking_enabled = settings.get('auto_tracking_enabled', True)
-            self.tracking_check_interval = settings.get('auto_tracking_interval', 30)
+            return settings
         finally:
             db.close()
 
+    async def load_settings(self):
+        """Load settings from database"""
+        settings = await blocking_executor.run(self._read_settings)
+
+        self.auto_price_enabled = settings.get('auto_check_enabled', True)
+        self.price_check_interval = settings.get('auto_check_interval', 60)
+        self.price_scheduler.default_interval = self.price_check_interval
+        self.auto_tracking_enabled = settings.get('auto_tracking_enabled', True)
+        self.tracking_check_interval = settings.get('auto_tracking_interval', 30)
+
     async def start_price_monitoring(self):
         """Start automatic price monitoring"""
         if self.price_task and not self.price_task.done():
@@ -98,6 +116,7 @@ class BackgroundTaskManager:
             self.auto_price_enabled = new_settings['auto_check_enabled']
         if 'auto_check_interval' in new_settings:
             self.price_check_interval = new_settings['auto_check_interval']
+            self.price_scheduler.default_interval = self.price_check_interval
         if 'auto_tracking_enabled' in new_settings:
             self.auto_tracking_enabled = new_settings['auto_tracking_enabled']
         if 'auto_tracking_interval' in new_settings:
@@ -109,42 +128,30 @@ class BackgroundTaskManager:
         await self.start_all_tasks()
 
     async def _price_monitoring_loop(self):
-        """Background loop for price monitoring"""
+        """Background loop for price monitoring, checks each item when it is due"""
         while self.auto_price_enabled:
             try:
-                db = SessionLocal()
-                try:
-                    # Get all watched items with notifications enabled
-                    items = db.query(WatchedItem).filter(
-                        WatchedItem.notifications_enabled == True
-                    ).all()
-
-                    if items:
-                        print(f"💰 Checking prices for {len(items)} items...")
-                        updates_count = 0
+                # Rebuild the due queue so new items and interval overrides are picked up
+                await blocking_executor.run(self.price_scheduler.load_queue)
+                item_ids = self.price_scheduler.pop_due(datetime.now())
 
-                        for item in items:
-                            try:
-                                result = self.price_watcher.check_price_change(item, db)
-                                if result:
-                                    updates_count += 1
-                                    print(f"📈 Price change detected: {item.title}")
+                if item_ids:
+                    print(f"💰 Checking prices for {len(item_ids)} items...")
+                    updates = await self.price_scheduler.run_sweep(item_ids)
 
-                                # Small delay between checks to be nice to the server
-                                await asyncio.sleep(2)
+                    for update in updates:
+                        print(f"📈 Price change detected: {update['title']}")
 
-                            except Exception as e:
-                                print(f"❌ Error checking price for {item.title}: {e}")
-                                continue
+                    self.last_price_check = datetime.now()
+                    event_bus.publish('background_status', self.get_status())
+                    print(f"✅ Price check completed. {len(updates)} changes detected.")
 
-                        self.last_price_check = datetime.now()
-                        print(f"✅ Price check completed. {updates_count} changes detected.")
-
-                finally:
-                    db.close()
-
-                # Wait for next check
-                await asyncio.sleep(self.price_check_interval * 60)
+                # Wait until the next item is due
+                wait = settings.PRICE_CHECK_POLL_INTERVAL
+                next_due = self.price_scheduler.next_due_at()
+                if next_due:
+                    wait = min(wait, (next_due - datetime.now()).total_seconds())
+                await asyncio.sleep(max(wait, 1))
 
             except asyncio.CancelledError:
                 print("🛑 Price monitoring task cancelled")
@@ -153,59 +160,60 @@ class BackgroundTaskManager:
                 print(f"❌ Error in price monitoring loop: {e}")
                 await asyncio.sleep(60)  # Wait 1 minute before retrying
 
+    def _apply_tracking_results(self, db: Session, shipments, carriers, results):
+        """Store tracking results on their orders, returns the update count and the events of changed orders"""
+        updates_count = 0
+        changed_orders = []
+        titles = {order_id: title for order_id, _, _, _, title in shipments}
+
+        # Missing results were skipped because the last status is still fresh
+        order_ids = [order_id for order_id, tracking_number, _, _, _ in shipments if tracking_number in results]
+        for order in db.query(Order).filter(Order.id.in_(order_ids)).all():
+            try:
+                tracking_data = results[order.tracking_number]
+                if self.tracking_service.apply_to_order(order, tracking_data, carriers[order.id]):
+                    changed_orders.append(order)
+
+                if 'error' not in tracking_data and tracking_data.get('history'):
+                    updates_count += 1
+            except Exception as e:
+                print(f"❌ Error checking tracking for {titles[order.id]}: {e}")
+                continue
+
+        db.commit()
+        return updates_count, self.tracking_service.update_events(changed_orders)
+
     async def _tracking_monitoring_loop(self):
         """Background loop for tracking monitoring"""
         while self.auto_tracking_enabled:
             try:
-                db = SessionLocal()
-                try:
-                    # Get all orders with active tracking
-                    orders = db.query(Order).filter(
-                        Order.tracking_number.isnot(None),
-                        Order.status != 'Delivered'
-                    ).all()
-
-                    if orders:
-                        print(f"🚚 Checking tracking for {len(orders)} orders...")
-                        updates_count = 0
-
-                        for order in orders:
-                            try:
-                                carrier = getattr(order, 'carrier', None) or 'auto'
-                                tracking_data = self.tracking_service.track_package(order.tracking_number, carrier)
-
-                                if hasattr(order, 'carrier'):
-                                    order.carrier = tracking_data.get('carrier',
-                                                                      '').lower() if 'carrier' in tracking_data else carrier
-
-                                order.tracking_details = json.dumps(tracking_data)
-                                order.dhl_details = json.dumps(tracking_data)
-                                order.dhl_status = tracking_data.get('status', '')
-                                order.dhl_last_update = datetime.now()
-
-                                if 'error' not in tracking_data and tracking_data.get('history'):
-                                    updates_count += 1
-
-                                if tracking_data.get('progress', 0) == 100:
-                                    if order.status != 'Delivered':
-                                        print(f"📦 Package delivered: {order.title}")
-                                    order.status = 'Delivered'
-                                elif 'error' not in tracking_data and order.status == 'Ordered':
-                                    order.status = 'Shipped'
-
-                                # Small delay between checks
-                                await asyncio.sleep(1)
-
-                            except Exception as e:
-                                print(f"❌ Error checking tracking for {order.title}: {e}")
-                                continue
-
-                        db.commit()
-                        self.last_tracking_check = datetime.now()
-                        print(f"✅ Tracking check completed. {updates_count} updates processed.")
-
-                finally:
-                    db.close()
+                # Get all orders with active tracking
+                shipments = await blocking_executor.run_in_session(lambda db: db.query(
+                    Order.id, Order.tracking_number, Order.carrier, Order.status, Order.title
+                ).filter(
+                    Order.tracking_number.isnot(None),
+                    Order.status != 'Delivered'
+                ).all())
+
+                if shipments:
+                    print(f"🚚 Checking tracking for {len(shipments)} orders...")
+                    carriers = {order_id: carrier or 'auto' for order_id, _, carrier, _, _ in shipments}
+                    results = await self.tracking_service.track_many(
+                        [(tracking_number, carriers[order_id]) for order_id, tracking_number, _, _, _ in shipments]
+                    )
+
+                    updates_count, events = await blocking_executor.run_in_session(
+                        self._apply_tracking_results, shipments, carriers, results
+                    )
+                    for event in events:
+                        event_bus.publish('tracking_update', event)
+                        # Only undelivered orders were checked, so a delivered status is new
+                        if event['status'] == 'Delivered':
+                            print(f"📦 Package delivered: {event['title']}")
+
+                    self.last_tracking_check = datetime.now()
+                    event_bus.publish('background_status', self.get_status())
+                    print(f"✅ Tracking check completed. {updates_count} updates processed.")
 
                 # Wait for next check
                 await asyncio.sleep(self.tracking_check_interval * 60)
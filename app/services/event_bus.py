@@ -0,0 +1,94 @@
+# app/services/event_bus.py
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, Set
+from app.core.config import settings
+
+
+class EventBus:
+    """
+    In-process pub/sub for live updates pushed to the frontend
+    publish() can be called from the event loop or from worker threads, every subscriber
+    gets its own bounded queue so a slow client never blocks publishers
+    The last few events are kept so reconnecting clients can catch up via Last-Event-ID
+    """
+
+    def __init__(self, history_size: Optional[int] = None, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self._history: deque = deque(maxlen=history_size or settings.EVENTS_HISTORY_SIZE)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Remember the loop that subscribers live on (called at startup)"""
+        self._loop = loop
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> asyncio.Queue:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id is not None:
+            with self._lock:
+                missed = [event for event in self._history if event['id'] > last_event_id]
+            for event in missed[-self.queue_size:]:
+                queue.put_nowait(event)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Send an event to all subscribers, safe to call from any thread"""
+        with self._lock:
+            event = {
+                'id': next(self._ids),
+                'type': event_type,
+                'data': data,
+                'time': datetime.now().isoformat()
+            }
+            self._history.append(event)
+
+        if self._loop is None or self._loop.is_closed():
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._deliver(event)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Drop the oldest event rather than the newest for slow clients
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+
+    @staticmethod
+    def format_sse(event: Dict[str, Any]) -> str:
+        """Encode an event in the text/event-stream format"""
+        payload = json.dumps(event['data'], default=str)
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+# Global instance
+event_bus = EventBus()
@@ -0,0 +1,266 @@
+# app/services/extraction.py
+# HTML extraction for Kleinanzeigen pages with pluggable parser backends
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Tuple
+from bs4 import BeautifulSoup
+from app.core.config import settings
+
+try:
+    from selectolax.parser import HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+logger = logging.getLogger(__name__)
+
+
+def make_soup(html) -> BeautifulSoup:
+    """BeautifulSoup document using the fastest installed tree builder"""
+    return BeautifulSoup(html, 'lxml' if HAS_LXML else 'html.parser')
+
+
+PRICE_REGION_RE = re.compile(rb'<h2[^>]*id="viewad-price"[^>]*>.*?</h2>', re.DOTALL)
+
+
+def find_price_region(html: bytes) -> Optional[bytes]:
+    """Raw bytes of the #viewad-price element, located without parsing the page"""
+    match = PRICE_REGION_RE.search(html)
+    return match.group(0) if match else None
+
+
+def parse_price(text: Optional[str]) -> float:
+    """Parse the first number of a price label like '1.250 € VB'"""
+    if text:
+        price_match = re.search(r'(\d+(?:[.,]\d+)?)', text)
+        if price_match:
+            return float(price_match.group(1).replace(',', '.'))
+    return 0.0
+
+
+class ListingParser(ABC):
+    """
+    Base class for listing page parsers
+    Subclasses implement the backend-specific lookups, the field logic is shared
+    """
+    name = "base"
+
+    @abstractmethod
+    def load(self, html):
+        """Parse the HTML into the backend's document type"""
+
+    @abstractmethod
+    def text_by_id(self, doc, tag: str, element_id: str) -> Optional[str]:
+        """Stripped text of <tag id=element_id>, None if missing"""
+
+    @abstractmethod
+    def breadcrumb_texts(self, doc) -> List[str]:
+        """Texts of the breadcrumb links"""
+
+    @abstractmethod
+    def seller_link(self, doc) -> Optional[Tuple[str, str]]:
+        """(name, href) of the seller profile link in the contact box"""
+
+    @abstractmethod
+    def gallery_images(self, doc) -> List[Dict[str, str]]:
+        """Attributes of all <img> elements in the image gallery"""
+
+    @abstractmethod
+    def profile_details(self, doc) -> List[str]:
+        """Texts of the detail boxes on a seller profile page"""
+
+    def extract_price(self, html) -> float:
+        """Fast path for price checks, only looks at #viewad-price"""
+        return parse_price(self.text_by_id(self.load(html), 'h2', 'viewad-price'))
+
+    def extract_listing(self, html, url: str) -> Dict[str, Any]:
+        """Extract all listing fields from a /s-anzeige page"""
+        doc = self.load(html)
+
+        title = self.text_by_id(doc, 'h1', 'viewad-title') or "Unknown"
+        title = re.sub(r'(Reserviert|Gelöscht)\s*•\s*', '', title)
+
+        ad_id = None
+        id_text = self.text_by_id(doc, 'div', 'viewad-ad-id-box')
+        if id_text:
+            id_match = re.search(r'(\d{10})', id_text)
+            if id_match:
+                ad_id = id_match.group(1)
+        if not ad_id:
+            id_match = re.search(r'/(\d{10})-', url)
+            if id_match:
+                ad_id = id_match.group(1)
+
+        category = "Unknown"
+        links = self.breadcrumb_texts(doc)
+        if links and len(links) > 1:
+            category = links[-1]
+
+        seller_name, seller_href = self.seller_link(doc) or (None, None)
+
+        images = []
+        for attrs in self.gallery_images(doc)[:8]:  # Max 8 images
+            img_url = None
+            if 'data-imgsrc' in attrs:
+                img_url = attrs['data-imgsrc']
+            elif 'src' in attrs and 'kleinanzeigen.de' in attrs['src']:
+                img_url = attrs['src']
+
+            if img_url:
+                images.append(re.sub(r'\$_\d+\.', '$_59.', img_url))
+
+        return {
+            'ad_id': ad_id,
+            'title': title,
+            'price': parse_price(self.text_by_id(doc, 'h2', 'viewad-price')),
+            'description': self.text_by_id(doc, 'p', 'viewad-description-text') or "",
+            'category': category,
+            'location': self.text_by_id(doc, 'span', 'viewad-locality') or "Unknown",
+            'seller_name': seller_name,
+            'seller_href': seller_href,
+            'image_urls': images
+        }
+
+    def extract_seller_since(self, html) -> str:
+        """Registration date ('Aktiv seit') from a seller profile page"""
+        for text in self.profile_details(self.load(html)):
+            if 'Aktiv seit' in text:
+                date_match = re.search(r'(\d+\.\d+\.\d+)', text)
+                if date_match:
+                    return date_match.group(1)
+        return ""
+
+
+class BeautifulSoupListingParser(ListingParser):
+    """Reference implementation, used when no faster backend is installed"""
+    name = "bs4"
+
+    def load(self, html):
+        return make_soup(html)
+
+    def text_by_id(self, doc, tag, element_id):
+        elem = doc.find(tag, {'id': element_id})
+        return elem.text.strip() if elem else None
+
+    def breadcrumb_texts(self, doc):
+        breadcrumb = doc.find('div', {'id': 'vap-brdcrmb'})
+        if not breadcrumb:
+            return []
+        return [link.text.strip() for link in breadcrumb.find_all('a', class_='breadcrump-link')]
+
+    def seller_link(self, doc):
+        seller_section = doc.find('div', {'id': 'viewad-contact'})
+        if seller_section:
+            name_elem = seller_section.find('a', href=re.compile(r'/s-bestandsliste'))
+            if name_elem:
+                return name_elem.text.strip(), name_elem['href']
+        return None
+
+    def gallery_images(self, doc):
+        gallery = doc.find('div', class_='vip-image-gallery')
+        if not gallery:
+            return []
+        return [dict(img.attrs) for img in gallery.find_all('img')]
+
+    def profile_details(self, doc):
+        return [detail.get_text(strip=True) for detail in doc.find_all('div', class_='userprofile-details')]
+
+
+class LxmlListingParser(ListingParser):
+    """libxml2 based parser using XPath lookups"""
+    name = "lxml"
+
+    @staticmethod
+    def _has_class(tag: str, css_class: str) -> str:
+        return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+    def load(self, html):
+        return lxml.html.fromstring(html)
+
+    def text_by_id(self, doc, tag, element_id):
+        elems = doc.xpath(f'//{tag}[@id="{element_id}"]')
+        return elems[0].text_content().strip() if elems else None
+
+    def breadcrumb_texts(self, doc):
+        links = doc.xpath('//div[@id="vap-brdcrmb"]' + self._has_class('a', 'breadcrump-link'))
+        return [link.text_content().strip() for link in links]
+
+    def seller_link(self, doc):
+        links = doc.xpath('//div[@id="viewad-contact"]//a[contains(@href, "/s-bestandsliste")]')
+        if links:
+            return links[0].text_content().strip(), links[0].get('href')
+        return None
+
+    def gallery_images(self, doc):
+        galleries = doc.xpath(self._has_class('div', 'vip-image-gallery'))
+        if not galleries:
+            return []
+        return [dict(img.attrib) for img in galleries[0].iter('img')]
+
+    def profile_details(self, doc):
+        return [detail.text_content().strip() for detail in doc.xpath(self._has_class('div', 'userprofile-details'))]
+
+
+class SelectolaxListingParser(ListingParser):
+    """Modest engine parser using CSS selectors, the fastest backend"""
+    name = "selectolax"
+
+    def load(self, html):
+        return HTMLParser(html)
+
+    def text_by_id(self, doc, tag, element_id):
+        elem = doc.css_first(f'{tag}#{element_id}')
+        return elem.text().strip() if elem else None
+
+    def breadcrumb_texts(self, doc):
+        return [link.text().strip() for link in doc.css('div#vap-brdcrmb a.breadcrump-link')]
+
+    def seller_link(self, doc):
+        link = doc.css_first('div#viewad-contact a[href*="/s-bestandsliste"]')
+        if link:
+            return link.text().strip(), link.attributes.get('href')
+        return None
+
+    def gallery_images(self, doc):
+        gallery = doc.css_first('div.vip-image-gallery')
+        if not gallery:
+            return []
+        return [{k: v or '' for k, v in img.attributes.items()} for img in gallery.css('img')]
+
+    def profile_details(self, doc):
+        return [detail.text().strip() for detail in doc.css('div.userprofile-details')]
+
+
+PARSER_BACKENDS = {
+    'selectolax': (SelectolaxListingParser, HAS_SELECTOLAX),
+    'lxml': (LxmlListingParser, HAS_LXML),
+    'bs4': (BeautifulSoupListingParser, True),
+}
+
+
+def available_backends() -> List[str]:
+    """Names of all parser backends that can be used in this environment"""
+    return [name for name, (_, available) in PARSER_BACKENDS.items() if available]
+
+
+def get_listing_parser(backend: Optional[str] = None) -> ListingParser:
+    """
+    Return a parser for the requested backend ('auto' picks the fastest installed one)
+    Falls back to BeautifulSoup if the requested backend is not installed
+    """
+    backend = backend or settings.HTML_PARSER
+    if backend == 'auto':
+        backend = available_backends()[0]
+
+    parser_class, available = PARSER_BACKENDS.get(backend, (BeautifulSoupListingParser, True))
+    if not available:
+        logger.warning("HTML parser backend '%s' is not installed, falling back to BeautifulSoup", backend)
+        parser_class = BeautifulSoupListingParser
+    return parser_class()
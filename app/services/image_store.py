@@ -0,0 +1,183 @@
+# app/services/image_store.py
+# Content-addressed image storage with WebP/AVIF thumbnails
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from io import BytesIO
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image, features
+except ImportError:  # Without Pillow only the originals are stored and served
+    Image = None
+    features = None
+
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.order import Order
+
+# <2 hex>/<sha256>.jpg for stored originals, <ad_id>_<index>.jpg for files of older versions
+STORED_NAME_RE = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{64})\.jpg$')
+LEGACY_NAME_RE = re.compile(r'^[\w-]+\.jpg$')
+
+MEDIA_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+
+class ImageStore:
+    """
+    Stores every image once under the SHA-256 of its bytes, so a gallery shared by
+    several orders (reposted ads, re-added orders) takes the space of one
+    Next to each original sit thumbnails in every configured width and format,
+    which the /images route picks from by ?w= and the Accept header
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.IMAGE_STORAGE_PATH
+
+    @property
+    def thumbnail_formats(self) -> List[str]:
+        if Image is None:
+            return []
+        return [fmt for fmt in settings.IMAGE_THUMBNAIL_FORMATS if features.check(fmt)]
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def add_file(self, temp_path: str, digest: str) -> str:
+        """Move a downloaded file into the store, dropping it if the same image is already there"""
+        name = f"{digest[:2]}/{digest}.jpg"
+        path = self.path(name)
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        return name
+
+    def thumbnail_name(self, name: str, width: int, fmt: str) -> str:
+        return f"{name[:-len('.jpg')]}_{width}.{fmt}"
+
+    def missing_thumbnails(self, name: str) -> List[Tuple[int, str]]:
+        """(width, format) of the thumbnails a stored image should have but does not"""
+        if not STORED_NAME_RE.match(name):
+            return []
+        return [
+            (width, fmt) for width in settings.IMAGE_THUMBNAIL_WIDTHS for fmt in self.thumbnail_formats
+            if not os.path.exists(self.path(self.thumbnail_name(name, width, fmt)))
+        ]
+
+    def create_thumbnails(self, name: str) -> int:
+        """Write the missing thumbnails of a stored image, returns how many were created (CPU bound)"""
+        missing = self.missing_thumbnails(name)
+        if not missing:
+            return 0
+
+        try:
+            with Image.open(self.path(name)) as original:
+                original = original.convert('RGB')
+                created = 0
+                for width, fmt in missing:
+                    thumbnail = original.copy()
+                    thumbnail.thumbnail((width, width * 4))
+                    buffer = BytesIO()
+                    thumbnail.save(buffer, format=fmt.upper(), quality=settings.IMAGE_THUMBNAIL_QUALITY)
+                    # Unique temp name, the same gallery image may be processed by two downloads at once
+                    target = self.path(self.thumbnail_name(name, width, fmt))
+                    temp_path = f"{target}.{uuid.uuid4().hex}.part"
+                    with open(temp_path, 'wb') as f:
+                        f.write(buffer.getvalue())
+                    os.replace(temp_path, target)
+                    created += 1
+                return created
+        except (OSError, ValueError) as e:
+            print(f"Error creating thumbnails for {name}: {e}")
+            return 0
+
+    def resolve(self, name: str, width: Optional[int] = None, accept: str = '') -> Optional[Tuple[str, str]]:
+        """
+        (path, media type) of the best file for a request: the smallest thumbnail at least
+        as wide as requested in the best format the client accepts, else the original
+        """
+        if not (STORED_NAME_RE.match(name) or LEGACY_NAME_RE.match(name)):
+            return None
+
+        if width and STORED_NAME_RE.match(name):
+            widths = sorted(settings.IMAGE_THUMBNAIL_WIDTHS)
+            fitting = next((w for w in widths if w >= width), None)
+            if fitting is not None:
+                for fmt in self.thumbnail_formats:
+                    if MEDIA_TYPES[fmt] not in accept:
+                        continue
+                    path = self.path(self.thumbnail_name(name, fitting, fmt))
+                    if os.path.exists(path):
+                        return path, MEDIA_TYPES[fmt]
+
+        path = self.path(name)
+        return (path, MEDIA_TYPES['jpg']) if os.path.isfile(path) else None
+
+    def release(self, db: Session, names: Iterable[str], exclude_order_id: Optional[int] = None) -> int:
+        """Delete images (and their thumbnails) that no other order references anymore"""
+        removed = 0
+        for name in names:
+            query = db.query(Order.id).filter(Order.local_images.contains(f'"{name}"'))
+            if exclude_order_id is not None:
+                query = query.filter(Order.id != exclude_order_id)
+            if query.first() is not None:
+                continue
+
+            paths = [self.path(name)]
+            if STORED_NAME_RE.match(name):
+                paths += [
+                    self.path(self.thumbnail_name(name, width, fmt))
+                    for width in settings.IMAGE_THUMBNAIL_WIDTHS for fmt in settings.IMAGE_THUMBNAIL_FORMATS
+                ]
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+def import_legacy_images(db: Session, store: Optional[ImageStore] = None) -> Dict[str, Any]:
+    """
+    Copy <ad_id>_<index>.jpg files of older versions into the store and point the orders at them
+    The originals stay in place so a rolled back transaction leaves the orders with working images,
+    delete the returned legacy_names once the changes are committed
+    """
+    store = store or image_store
+    moved = deduplicated = 0
+    renamed: Dict[str, str] = {}
+
+    for order in db.query(Order).filter(Order.local_images.isnot(None)).all():
+        try:
+            names = json.loads(order.local_images)
+        except ValueError:
+            continue
+
+        new_names = []
+        for name in names:
+            if name not in renamed and LEGACY_NAME_RE.match(name) and os.path.isfile(store.path(name)):
+                digest = hashlib.sha256()
+                with open(store.path(name), 'rb') as f:
+                    for chunk in iter(lambda: f.read(settings.IMAGE_DOWNLOAD_CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                digest = digest.hexdigest()
+                deduplicated += os.path.exists(store.path(f"{digest[:2]}/{digest}.jpg"))
+                temp_path = f"{store.path(name)}.{uuid.uuid4().hex}.part"
+                shutil.copyfile(store.path(name), temp_path)
+                renamed[name] = store.add_file(temp_path, digest)
+                moved += 1
+            new_names.append(renamed.get(name, name))
+
+        if new_names != names:
+            order.local_images = json.dumps(new_names)
+
+    db.flush()
+    return {'moved': moved, 'deduplicated': deduplicated, 'legacy_names': list(renamed)}
+
+
+# Global instance
+image_store = ImageStore()
@@ -0,0 +1,249 @@
+# app/services/job_queue.py
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.executor import blocking_executor
+from app.models.order import Job
+from app.services.event_bus import event_bus
+
+ACTIVE_STATES = ('queued', 'running')
+
+
+class JobContext:
+    """Handle passed to a job handler to report progress"""
+
+    def __init__(self, queue: 'JobQueue', job_id: int, kind: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.kind = kind
+
+    def report(self, progress: int, total: Optional[int] = None):
+        _, current_total = self.queue._progress.get(self.job_id, (0, 0))
+        total = current_total if total is None else total
+        self.queue._progress[self.job_id] = (progress, total)
+        self.queue._publish(self.job_id, self.kind, 'running', progress, total)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """
+    Persistent queue for long-running bulk operations
+    Jobs are stored in the jobs table and executed by a few worker tasks, endpoints return the job right away
+    Only one job per kind can be queued or running, submitting it again returns the existing job
+    Jobs that were running when the app stopped are queued again on the next start
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or settings.JOB_WORKERS
+        self._handlers: Dict[str, JobHandler] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[int, asyncio.Task] = {}
+        self._cancel_requested: Set[int] = set()
+        self._progress: Dict[int, tuple] = {}  # Live progress of running jobs, written to the row when they finish
+        self._wakeup: Optional[asyncio.Event] = None
+        self._submit_lock: Optional[asyncio.Lock] = None
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    @staticmethod
+    def _publish(job_id: int, kind: str, status: str, progress: int = 0, total: int = 0):
+        """Push a job state or progress change to open dashboards"""
+        event_bus.publish('job', {'id': job_id, 'kind': kind, 'status': status, 'progress': progress, 'total': total})
+
+    def to_dict(self, job: Job, deduplicated: bool = False) -> Dict[str, Any]:
+        progress, total = self._progress.get(job.id, (job.progress or 0, job.total or 0))
+        return {
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'progress': progress,
+            'total': total,
+            'result': json.loads(job.result) if job.result else None,
+            'error': job.error,
+            'deduplicated': deduplicated,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at
+        }
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._submit_lock = asyncio.Lock()
+        await blocking_executor.run(self._recover)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def _recover(self):
+        """Requeue interrupted jobs and delete old finished ones"""
+        db = SessionLocal()
+        try:
+            interrupted = db.query(Job).filter(Job.status == 'running').update({'status': 'queued'})
+            cutoff = datetime.now() - timedelta(days=settings.JOB_RETENTION_DAYS)
+            db.query(Job).filter(Job.status.notin_(ACTIVE_STATES), Job.created_at < cutoff).delete()
+            db.commit()
+            if interrupted:
+                print(f"🔁 Requeued {interrupted} interrupted jobs")
+        finally:
+            db.close()
+
+    async def submit(self, kind: str) -> Dict[str, Any]:
+        """Queue a job, or return the queued/running job of the same kind"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        def create():
+            db = SessionLocal()
+            try:
+                existing = db.query(Job).filter(Job.kind == kind, Job.status.in_(ACTIVE_STATES)).first()
+                if existing:
+                    return self.to_dict(existing, deduplicated=True)
+
+                job = Job(kind=kind)
+                db.add(job)
+                db.commit()
+                db.refresh(job)
+                return self.to_dict(job)
+            finally:
+                db.close()
+
+        # Serialize submits so two clicks can't both create a job
+        async with self._submit_lock:
+            job = await blocking_executor.run(create)
+        self._wakeup.set()
+        return job
+
+    def _load(self, job_id: int) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            return self.to_dict(job) if job else None
+        finally:
+            db.close()
+
+    async def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        return await blocking_executor.run(self._load, job_id)
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        def load():
+            db = SessionLocal()
+            try:
+                return [self.to_dict(job) for job in db.query(Job).order_by(Job.id.desc()).limit(limit).all()]
+            finally:
+                db.close()
+
+        return await blocking_executor.run(load)
+
+    async def cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job, finished jobs are returned unchanged"""
+        task = self._running.get(job_id)
+        if task:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            # Wait until the worker has recorded the cancellation
+            while job_id in self._running:
+                await asyncio.sleep(0.05)
+            return await self.get(job_id)
+
+        def cancel_queued():
+            db = SessionLocal()
+            try:
+                job = db.query(Job).filter(Job.id == job_id).first()
+                if job and job.status == 'queued':
+                    job.status = 'cancelled'
+                    job.finished_at = datetime.now()
+                    db.commit()
+                    self._publish(job.id, job.kind, job.status)
+                return self.to_dict(job) if job else None
+            finally:
+                db.close()
+
+        return await blocking_executor.run(cancel_queued)
+
+    def _claim(self) -> Optional[tuple]:
+        """Mark the oldest queued job as running"""
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.status == 'queued').order_by(Job.id.asc()).first()
+            if not job:
+                return None
+            job.status = 'running'
+            job.started_at = datetime.now()
+            db.commit()
+            return job.id, job.kind
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return
+            job.status = status
+            job.progress, job.total = self._progress.pop(job_id, (job.progress, job.total))
+            job.result = json.dumps(result, default=str) if result is not None else None
+            job.error = error
+            job.finished_at = None if status == 'queued' else datetime.now()
+            db.commit()
+            self._publish(job.id, job.kind, job.status, job.progress or 0, job.total or 0)
+        finally:
+            db.close()
+
+    async def _worker(self):
+        while True:
+            # Claiming is serialized by the submit lock, so two workers never take the same job
+            async with self._submit_lock:
+                claimed = await blocking_executor.run(self._claim)
+            if not claimed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=60)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, kind = claimed
+            handler = self._handlers.get(kind)
+            if handler is None:
+                await blocking_executor.run(self._finish, job_id, 'failed', None, f"Unknown job kind: {kind}")
+                continue
+
+            self._progress[job_id] = (0, 0)
+            task = asyncio.create_task(handler(JobContext(self, job_id, kind)))
+            self._running[job_id] = task
+            self._publish(job_id, kind, 'running')
+            print(f"⚙️ Job {job_id} ({kind}) started")
+            try:
+                result = await task
+                await blocking_executor.run(self._finish, job_id, 'done', result)
+                print(f"✅ Job {job_id} ({kind}) done")
+            except asyncio.CancelledError:
+                if job_id not in self._cancel_requested:
+                    # The app is shutting down, run the job again on the next start
+                    task.cancel()
+                    await blocking_executor.run(self._finish, job_id, 'queued')
+                    raise
+                self._cancel_requested.discard(job_id)
+                await blocking_executor.run(self._finish, job_id, 'cancelled')
+                print(f"⏹️ Job {job_id} ({kind}) cancelled")
+            except Exception as e:
+                await blocking_executor.run(self._finish, job_id, 'failed', None, str(e))
+                print(f"❌ Job {job_id} ({kind}) failed: {e}")
+            finally:
+                self._running.pop(job_id, None)
+
+
+# Global instance
+job_queue = JobQueue()
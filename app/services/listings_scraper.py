@@ -2,8 +2,8 @@
 import requests
 import re
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
 from app.core.config import settings
+from app.services.extraction import make_soup, parse_price
 
 
 class MyListingsScraper:
@@ -29,7 +29,7 @@ class MyListingsScraper:
             if response.status_code != 200:
                 return self._get_mock_listings()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content)
 
             # Find listing cards
             listing_cards = soup.find_all('li', {'data-testid': 'ad-card'})
@@ -63,12 +63,8 @@ class MyListingsScraper:
             url = self.base_url + title_link['href']
 
         # Price
-        price = 0.0
         price_elem = card.find('li', class_='text-title3')
-        if price_elem:
-            price_match = re.search(r'(\d+(?:[.,]\d+)?)', price_elem.text)
-            if price_match:
-                price = float(price_match.group(1).replace(',', '.'))
+        price = parse_price(price_elem.text if price_elem else None)
 
         # Category
         category_elem = card.find('div', class_='text-bodySmall text-onSurfaceNonessential')
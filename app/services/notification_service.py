@@ -3,13 +3,17 @@ import json
 from datetime import datetime
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index
 from app.core.database import Base
+from app.services.event_bus import event_bus
 
 
 class Notification(Base):
     """Notification model"""
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index('ix_notifications_read_created', 'read', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String, nullable=False)  # 'price_change', 'tracking_update', etc.
@@ -21,7 +25,18 @@ class Notification(Base):
 
 
 class NotificationService:
-    """Service for managing notifications"""
+    """Service for managing notifications, every change is pushed to open dashboards"""
+
+    def _publish(self, notification: Notification):
+        event_bus.publish('notification', {
+            'id': notification.id,
+            'type': notification.type,
+            'title': notification.title,
+            'message': notification.message,
+            'data': json.loads(notification.data) if notification.data else None,
+            'read': notification.read,
+            'created_at': notification.created_at
+        })
 
     def create_price_change_notification(self, item_title: str, old_price: float, new_price: float,
                                          data: Dict[str, Any], db: Session):
@@ -38,6 +53,7 @@ class NotificationService:
 
         db.add(notification)
         db.commit()
+        self._publish(notification)
         return notification
 
     def create_tracking_notification(self, order_title: str, status: str, data: Dict[str, Any], db: Session):
@@ -51,6 +67,7 @@ class NotificationService:
 
         db.add(notification)
         db.commit()
+        self._publish(notification)
         return notification
 
     def get_unread_notifications(self, db: Session, limit: int = 50) -> List[Notification]:
@@ -65,10 +82,13 @@ class NotificationService:
         if notification:
             notification.read = True
             db.commit()
+            db.refresh(notification)
+            event_bus.publish('notification_read', {'id': notification_id})
         return notification
 
     def clear_all_notifications(self, db: Session):
         """Clear all notifications"""
         db.query(Notification).delete()
         db.commit()
+        event_bus.publish('notifications_cleared', {})
         return {"message": "All notifications cleared"}
\ No newline at end of file
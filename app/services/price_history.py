@@ -0,0 +1,136 @@
+# app/services/price_history.py
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.order import WatchedItem, PriceHistory
+
+
+class PriceHistoryService:
+    """Append-only price history of watched items"""
+
+    def record(self, db: Session, item_id: int, price: float, observed_at: Optional[datetime] = None):
+        """Append a price observation (committed together with the caller's session)"""
+        db.add(PriceHistory(item_id=item_id, price=price, observed_at=observed_at or datetime.now()))
+
+    def _range_query(self, db: Session, item_id: int, since: Optional[datetime], until: Optional[datetime]):
+        query = db.query(PriceHistory).filter(PriceHistory.item_id == item_id)
+        if since:
+            query = query.filter(PriceHistory.observed_at >= since)
+        if until:
+            query = query.filter(PriceHistory.observed_at <= until)
+        return query
+
+    def get_history(self, db: Session, item_id: int, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, limit: int = 500, offset: int = 0) -> List[PriceHistory]:
+        """Price observations in chronological order"""
+        return self._range_query(db, item_id, since, until).order_by(
+            PriceHistory.observed_at.asc()
+        ).offset(offset).limit(limit).all()
+
+    def get_downsampled(self, db: Session, item_id: int, since: Optional[datetime] = None,
+                        until: Optional[datetime] = None, buckets: int = 100) -> List[Dict[str, Any]]:
+        """Split the range into equal time buckets with min/max/last price per bucket"""
+        query = self._range_query(db, item_id, since, until).with_entities(
+            PriceHistory.observed_at, PriceHistory.price
+        ).order_by(PriceHistory.observed_at.asc())
+
+        bounds = self._range_query(db, item_id, since, until).with_entities(
+            func.min(PriceHistory.observed_at), func.max(PriceHistory.observed_at)
+        ).one()
+        start = since or bounds[0]
+        end = until or bounds[1]
+        if start is None or end is None:
+            return []
+
+        span = max((end - start).total_seconds(), 1)
+        result: Dict[int, Dict[str, Any]] = {}
+        for observed_at, price in query.yield_per(1000):
+            index = min(int((observed_at - start).total_seconds() / span * buckets), buckets - 1)
+            bucket = result.get(index)
+            if bucket is None:
+                result[index] = {
+                    'date': observed_at,
+                    'min_price': price,
+                    'max_price': price,
+                    'price': price,
+                    'count': 1
+                }
+            else:
+                bucket['min_price'] = min(bucket['min_price'], price)
+                bucket['max_price'] = max(bucket['max_price'], price)
+                bucket['price'] = price  # Last observation in the bucket
+                bucket['count'] += 1
+
+        return [result[index] for index in sorted(result)]
+
+    def get_summaries(self, db: Session, item_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Lowest/highest price and number of observations for several items in one query"""
+        if not item_ids:
+            return {}
+
+        rows = db.query(
+            PriceHistory.item_id,
+            func.min(PriceHistory.price),
+            func.max(PriceHistory.price),
+            func.count(PriceHistory.id)
+        ).filter(PriceHistory.item_id.in_(item_ids)).group_by(PriceHistory.item_id).all()
+
+        return {
+            item_id: {'lowest_price': lowest, 'highest_price': highest, 'price_changes': count}
+            for item_id, lowest, highest, count in rows
+        }
+
+    def get_recent_prices(self, db: Session, item_ids: List[int], per_item: int = 20) -> Dict[int, List[float]]:
+        """Last `per_item` prices of several items (oldest first) in one windowed query"""
+        if not item_ids:
+            return {}
+
+        row_number = func.row_number().over(
+            partition_by=PriceHistory.item_id,
+            order_by=PriceHistory.observed_at.desc()
+        ).label('row_number')
+        ranked = db.query(
+            PriceHistory.item_id, PriceHistory.price, PriceHistory.observed_at, row_number
+        ).filter(PriceHistory.item_id.in_(item_ids)).subquery()
+
+        rows = db.query(ranked.c.item_id, ranked.c.price).filter(
+            ranked.c.row_number <= per_item
+        ).order_by(ranked.c.item_id, ranked.c.observed_at.asc()).all()
+
+        recent: Dict[int, List[float]] = {}
+        for item_id, price in rows:
+            recent.setdefault(item_id, []).append(price)
+        return recent
+
+    def delete_history(self, db: Session, item_id: int):
+        db.query(PriceHistory).filter(PriceHistory.item_id == item_id).delete()
+
+
+def migrate_price_history_blobs(bind=None):
+    """Move the legacy JSON price_history column of watched items into the price_history table"""
+    db = Session(bind=bind) if bind is not None else SessionLocal()
+    try:
+        items = db.query(WatchedItem).filter(WatchedItem.price_history.isnot(None)).all()
+        for item in items:
+            try:
+                history = json.loads(item.price_history) or []
+            except ValueError:
+                history = []
+
+            for entry in history:
+                try:
+                    observed_at = datetime.fromisoformat(entry['date'])
+                except (KeyError, TypeError, ValueError):
+                    observed_at = item.created_at or datetime.now()
+                db.add(PriceHistory(item_id=item.id, price=entry.get('price', 0.0), observed_at=observed_at))
+
+            item.price_history = None
+
+        if items:
+            db.commit()
+            print(f"📦 Migrated price history of {len(items)} watched items")
+    finally:
+        db.close()
@@ -0,0 +1,158 @@
+# app/services/price_scheduler.py
+import asyncio
+import heapq
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.executor import blocking_executor
+from app.models.order import WatchedItem
+from app.services.watcher import PriceWatcher
+
+
+class RateLimiter:
+    """Spaces out request starts so that at most `rate` requests begin per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class PriceCheckScheduler:
+    """
+    Runs price checks for many watched items with a pool of workers
+    Checks are rate limited globally, jittered per item and executed in worker threads,
+    so a sweep takes roughly N / rate seconds without blocking the event loop
+
+    Items are picked from a priority queue keyed by next_check_at. After every check the
+    item's interval shrinks if the price changed and grows if it did not, within the
+    configured bounds, unless the item has a fixed interval override
+    Checks run in the shared blocking thread pool, and the rate limit is shared by all
+    sweeps of a scheduler so overlapping sweeps can't exceed it together
+    """
+
+    def __init__(self, price_watcher: PriceWatcher, rate: Optional[float] = None,
+                 concurrency: Optional[int] = None, jitter: Optional[float] = None):
+        self.price_watcher = price_watcher
+        self.rate = rate if rate is not None else settings.PRICE_CHECK_RATE
+        self.concurrency = concurrency if concurrency is not None else settings.PRICE_CHECK_CONCURRENCY
+        self.jitter = jitter if jitter is not None else settings.PRICE_CHECK_JITTER
+        self.default_interval = 60  # Minutes, starting interval for new items
+        self.limiter = RateLimiter(self.rate)
+        self._queue: List[Tuple[datetime, int]] = []
+
+    def load_queue(self):
+        """Rebuild the due-time queue from the database"""
+        db = SessionLocal()
+        try:
+            rows = db.query(WatchedItem.id, WatchedItem.next_check_at).filter(
+                WatchedItem.notifications_enabled == True
+            ).all()
+        finally:
+            db.close()
+
+        # Items that were never scheduled are due right away
+        self._queue = [(next_check_at or datetime.min, item_id) for item_id, next_check_at in rows]
+        heapq.heapify(self._queue)
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """Remove and return all items that are due at `now`"""
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[1])
+        return due
+
+    def next_due_at(self) -> Optional[datetime]:
+        return self._queue[0][0] if self._queue else None
+
+    def current_interval(self, item: WatchedItem) -> int:
+        """Interval in minutes the item is checked at right now"""
+        return item.check_interval_override or item.check_interval or self.default_interval
+
+    def next_interval(self, item: WatchedItem, changed: bool) -> int:
+        """Interval in minutes until the next check of an item"""
+        if item.check_interval_override:
+            return item.check_interval_override
+
+        interval = self.current_interval(item)
+        if changed:
+            interval = interval / settings.PRICE_CHECK_INTERVAL_FACTOR
+        else:
+            interval = interval * settings.PRICE_CHECK_INTERVAL_FACTOR
+        return int(min(max(interval, settings.PRICE_CHECK_MIN_INTERVAL), settings.PRICE_CHECK_MAX_INTERVAL))
+
+    def _check_item(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Check a single item in its own session (runs in a worker thread)"""
+        db = SessionLocal()
+        try:
+            item = db.query(WatchedItem).filter(WatchedItem.id == item_id).first()
+            if not item:
+                return None
+            try:
+                result = self.price_watcher.check_price_change(item, db)
+            except Exception:
+                # A failed check says nothing about the price, retry at the unchanged interval
+                db.rollback()
+                item.next_check_at = datetime.now() + timedelta(minutes=self.current_interval(item))
+                db.commit()
+                return None
+
+            interval = self.next_interval(item, changed=result is not None)
+            if not item.check_interval_override:
+                item.check_interval = interval
+            item.next_check_at = datetime.now() + timedelta(minutes=interval)
+            db.commit()
+            return result
+        finally:
+            db.close()
+
+    async def run_sweep(self, item_ids: List[int],
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Check all given items and return the detected price changes
+        on_progress(checked, total) is called after every item
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for item_id in item_ids:
+            queue.put_nowait(item_id)
+
+        updates = []
+        checked = 0
+
+        async def worker():
+            nonlocal checked
+            while True:
+                try:
+                    item_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                await self.limiter.acquire()
+                if self.jitter > 0:
+                    await asyncio.sleep(random.uniform(0, self.jitter))
+
+                try:
+                    result = await blocking_executor.run(self._check_item, item_id)
+                    if result:
+                        updates.append(result)
+                except Exception as e:
+                    print(f"❌ Error checking price for item {item_id}: {e}")
+
+                checked += 1
+                if on_progress:
+                    on_progress(checked, len(item_ids))
+
+        worker_count = max(1, min(self.concurrency, len(item_ids)))
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+        return updates
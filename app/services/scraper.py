@@ -1,112 +1,85 @@
 ﻿# Web scraper for Kleinanzeigen.de
-import re
 import json
-import requests
 import os
-from typing import Dict, Any, Optional
+import asyncio
+import hashlib
+import uuid
+import aiofiles
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from bs4 import BeautifulSoup
 from app.core.config import settings
+from app.core.http_client import http_client
+from app.core.executor import blocking_executor
+from app.services.image_store import image_store
+from app.services.extraction import get_listing_parser
+from app.services.seller_cache import seller_cache
 
 class KleinanzeigenScraper:
     """Scraper for extracting data from Kleinanzeigen listings"""
     
     def __init__(self):
         self.headers = {'User-Agent': settings.USER_AGENT}
+        self.parser = get_listing_parser()
     
-    def download_image(self, url: str, ad_id: str, index: int) -> Optional[str]:
-        """Download and save an image locally"""
+    async def download_image(self, url: str, ad_id: str, index: int) -> Optional[str]:
+        """
+        Download an image into the content-addressed store, streaming it to disk in chunks
+        Returns the stored name, identical images of other ads resolve to the same file
+        """
+        temp_path = os.path.join(settings.IMAGE_STORAGE_PATH, f"{ad_id}_{index}_{uuid.uuid4().hex}.part")
         try:
-            response = requests.get(url, timeout=10, headers=self.headers)
-            if response.status_code == 200:
-                filename = f"{ad_id}_{index}.jpg"
-                filepath = os.path.join(settings.IMAGE_STORAGE_PATH, filename)
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                return filename
+            digest = hashlib.sha256()
+            async with http_client.stream('GET', url, timeout=10, headers=self.headers) as response:
+                if response.status_code != 200:
+                    return None
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(settings.IMAGE_DOWNLOAD_CHUNK_SIZE):
+                        digest.update(chunk)
+                        await f.write(chunk)
+            filename = image_store.add_file(temp_path, digest.hexdigest())
+            await blocking_executor.run(image_store.create_thumbnails, filename)
+            return filename
         except Exception as e:
             print(f"Error downloading image: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
         return None
     
-    def scrape_listing(self, url: str) -> Dict[str, Any]:
-        """Scrape a Kleinanzeigen listing and return structured data"""
-        response = requests.get(url, headers=self.headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title_elem = soup.find('h1', {'id': 'viewad-title'})
-        title = title_elem.text.strip() if title_elem else "Unknown"
-        title = re.sub(r'(Reserviert|Gelöscht)\s*•\s*', '', title)
-        
-        # Extract price
-        price_elem = soup.find('h2', {'id': 'viewad-price'})
-        price = 0.0
-        if price_elem:
-            price_match = re.search(r'(\d+(?:[.,]\d+)?)', price_elem.text)
-            if price_match:
-                price = float(price_match.group(1).replace(',', '.'))
+    async def download_images(self, image_urls: List[str], ad_id: str) -> List[str]:
+        """Download all gallery images concurrently, keeping gallery order"""
+        semaphore = asyncio.Semaphore(settings.IMAGE_DOWNLOAD_CONCURRENCY)
         
-        # Extract description
-        desc_elem = soup.find('p', {'id': 'viewad-description-text'})
-        description = desc_elem.text.strip() if desc_elem else ""
+        async def fetch(idx: int, img_url: str) -> Optional[str]:
+            async with semaphore:
+                return await self.download_image(img_url, ad_id, idx)
         
-        # Extract ad ID
-        ad_id = None
-        id_section = soup.find('div', {'id': 'viewad-ad-id-box'})
-        if id_section:
-            id_match = re.search(r'(\d{10})', id_section.text)
-            if id_match:
-                ad_id = id_match.group(1)
-        if not ad_id:
-            id_match = re.search(r'/(\d{10})-', url)
-            if id_match:
-                ad_id = id_match.group(1)
-        
-        # Extract location
-        location_elem = soup.find('span', {'id': 'viewad-locality'})
-        location = location_elem.text.strip() if location_elem else "Unknown"
-        
-        # Extract category
-        category = "Unknown"
-        breadcrumb = soup.find('div', {'id': 'vap-brdcrmb'})
-        if breadcrumb:
-            links = breadcrumb.find_all('a', class_='breadcrump-link')
-            if links and len(links) > 1:
-                category = links[-1].text.strip()
+        results = await asyncio.gather(*(fetch(idx, img_url) for idx, img_url in enumerate(image_urls)))
+        return [filename for filename in results if filename]
+    
+    async def scrape_listing(self, url: str, download_images: bool = True) -> Dict[str, Any]:
+        """
+        Scrape a Kleinanzeigen listing and return structured data
+        With download_images=False the gallery is only collected, not downloaded
+        """
+        response = await http_client.get(url, headers=self.headers, timeout=15)
+        response.raise_for_status()
+        listing = self.parser.extract_listing(response.content, url)
+        ad_id = listing['ad_id']
+        images = listing['image_urls']
         
         # Extract seller information
-        seller_data = self._extract_seller_info(soup, url)
+        seller_data = await self._extract_seller_info(listing['seller_name'], listing['seller_href'])
         
-        # Extract and download images
-        images = []
-        local_images = []
-        gallery = soup.find('div', class_='vip-image-gallery')
-        if gallery:
-            img_elements = gallery.find_all('img')
-            for idx, img in enumerate(img_elements[:8]):  # Max 8 images
-                img_url = None
-                if 'data-imgsrc' in img.attrs:
-                    img_url = img['data-imgsrc']
-                elif 'src' in img.attrs and 'kleinanzeigen.de' in img['src']:
-                    img_url = img['src']
-                
-                if img_url:
-                    img_url = re.sub(r'\$_\d+\.', '$_59.', img_url)
-                    images.append(img_url)
-                    
-                    # Download image
-                    local_filename = self.download_image(img_url, ad_id, idx)
-                    if local_filename:
-                        local_images.append(local_filename)
+        # Download images
+        local_images = await self.download_images(images, ad_id) if download_images else []
         
         return {
             'ad_id': ad_id,
-            'title': title,
-            'price': price,
-            'description': description,
-            'category': category,
-            'location': location,
+            'title': listing['title'],
+            'price': listing['price'],
+            'description': listing['description'],
+            'category': listing['category'],
+            'location': listing['location'],
             'seller_name': seller_data['name'],
             'seller_profile_url': seller_data['profile_url'],
             'seller_since': seller_data['since'],
@@ -116,8 +89,8 @@ class KleinanzeigenScraper:
             'local_images': json.dumps(local_images)
         }
     
-    def _extract_seller_info(self, soup: BeautifulSoup, listing_url: str) -> Dict[str, Any]:
-        """Extract seller information from the listing page"""
+    async def _extract_seller_info(self, seller_name: Optional[str], seller_href: Optional[str]) -> Dict[str, Any]:
+        """Resolve seller information from the profile link of the listing page"""
         seller_data = {
             'name': 'Unknown',
             'profile_url': '',
@@ -125,37 +98,44 @@ class KleinanzeigenScraper:
             'is_new': False
         }
         
-        seller_section = soup.find('div', {'id': 'viewad-contact'})
-        if seller_section:
-            name_elem = seller_section.find('a', href=re.compile(r'/s-bestandsliste'))
-            if name_elem:
-                seller_data['name'] = name_elem.text.strip()
-                seller_data['profile_url'] = f"https://www.kleinanzeigen.de{name_elem['href']}"
+        if seller_href:
+            seller_data['name'] = seller_name
+            seller_data['profile_url'] = f"https://www.kleinanzeigen.de{seller_href}"
+            
+            # Registration dates never change, so reuse a cached profile lookup
+            cached = await seller_cache.get(seller_data['profile_url'])
+            if cached:
+                seller_data['since'] = cached['since']
+                seller_data['is_new'] = self._is_new_seller(cached['since'])
+                return seller_data
+            
+            # Check seller registration date
+            try:
+                profile_response = await http_client.get(
+                    seller_data['profile_url'], 
+                    headers=self.headers, 
+                    timeout=10
+                )
+                profile_response.raise_for_status()
+                
+                seller_data['since'] = self.parser.extract_seller_since(profile_response.content)
+                seller_data['is_new'] = self._is_new_seller(seller_data['since'])
                 
-                # Check seller registration date
-                try:
-                    profile_response = requests.get(
-                        seller_data['profile_url'], 
-                        headers=self.headers, 
-                        timeout=10
-                    )
-                    profile_soup = BeautifulSoup(profile_response.content, 'html.parser')
-                    
-                    details = profile_soup.find_all('div', class_='userprofile-details')
-                    for detail in details:
-                        text = detail.get_text(strip=True)
-                        if 'Aktiv seit' in text:
-                            date_match = re.search(r'(\d+\.\d+\.\d+)', text)
-                            if date_match:
-                                seller_data['since'] = date_match.group(1)
-                                try:
-                                    reg_date = datetime.strptime(date_match.group(1), '%d.%m.%Y')
-                                    days_old = (datetime.now() - reg_date).days
-                                    if days_old < 60:
-                                        seller_data['is_new'] = True
-                                except:
-                                    pass
-                except:
-                    pass
+                await seller_cache.set(
+                    seller_data['profile_url'],
+                    seller_data['name'],
+                    seller_data['since'],
+                    seller_data['is_new']
+                )
+            except:
+                pass
         
         return seller_data
+    
+    def _is_new_seller(self, since: str) -> bool:
+        """Sellers registered less than 60 days ago count as new"""
+        try:
+            reg_date = datetime.strptime(since, '%d.%m.%Y')
+            return (datetime.now() - reg_date).days < 60
+        except:
+            return False
@@ -0,0 +1,137 @@
+# app/services/search.py
+# Full-text search over orders, watched items and my listings (SQLite FTS5)
+import html
+import re
+from typing import Dict, Any, List, Optional
+from sqlalchemy import Integer, column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# kind -> (rowid code, table, title, body, seller, searchable columns), {row} stands for "new." or nothing
+# Rows are stored as rowid = id * 4 + code so triggers can update them without a scan
+SEARCH_SOURCES = {
+    'order': (
+        1, 'orders', "{row}title",
+        "coalesce({row}description, '') || ' ' || coalesce({row}category, '') || ' ' || "
+        "coalesce({row}location, '') || ' ' || coalesce({row}notes, '')",
+        "coalesce({row}seller_name, '')",
+        ('title', 'description', 'category', 'location', 'notes', 'seller_name')
+    ),
+    'watched_item': (
+        2, 'watched_items', "{row}title", "coalesce({row}url, '')", "''",
+        ('title', 'url')
+    ),
+    'listing': (
+        3, 'my_listings', "{row}title", "coalesce({row}category, '') || ' ' || coalesce({row}status, '')", "''",
+        ('title', 'category', 'status')
+    ),
+}
+KINDS_BY_CODE = {source[0]: kind for kind, source in SEARCH_SOURCES.items()}
+
+# Light German stemming: strip common inflection suffixes, the rest is covered by prefix matching
+GERMAN_SUFFIXES = ('ern', 'em', 'en', 'er', 'es', 'e', 'n', 's')
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def create_search_index(conn: Connection):
+    """Create the FTS5 table with its sync triggers and index all existing rows"""
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "title, body, seller, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+
+    for code, table, title, body, seller, columns in SEARCH_SOURCES.values():
+        values = f"new.id * 4 + {code}, {title}, {body}, {seller}".format(row='new.')
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO search_index(rowid, title, body, seller) VALUES ({values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 4 + {code}; END"
+        ))
+        # Only reindex when searchable columns change, not on every tracking or price update
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 4 + {code}; "
+            f"INSERT INTO search_index(rowid, title, body, seller) VALUES ({values}); END"
+        ))
+
+        select = f"id * 4 + {code}, {title}, {body}, {seller}".format(row='')
+        conn.execute(text(f"INSERT OR REPLACE INTO search_index(rowid, title, body, seller) SELECT {select} FROM {table}"))
+
+
+def stem(term: str) -> str:
+    for suffix in GERMAN_SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)]
+    return term
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn user input into an FTS5 expression: every word has to match, as stemmed prefix
+    'Kameras Canon' -> "kamera"* AND "canon"*
+    """
+    terms = [stem(term.lower()) for term in TERM_RE.findall(query)]
+    terms = [term.replace('"', '') for term in terms if term]
+    if not terms:
+        return None
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def _render_snippet(snippet: str) -> str:
+    """HTML-escape a snippet and turn the match markers into <mark> tags"""
+    return html.escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+class SearchService:
+    """Ranked full-text search on the FTS5 index, only available on SQLite"""
+
+    def is_available(self, db: Session) -> bool:
+        if db.bind.dialect.name != 'sqlite':
+            return False
+        return db.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        )).first() is not None
+
+    def search(self, db: Session, query: str, kinds: Optional[List[str]] = None,
+               limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Best matches first, with highlighted title and text snippets"""
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        codes = [SEARCH_SOURCES[kind][0] for kind in (kinds or SEARCH_SOURCES) if kind in SEARCH_SOURCES]
+        if not codes:
+            return []
+
+        # bm25 weights: title matches count most, then seller, then the remaining text
+        rows = db.execute(text(
+            "SELECT rowid, "
+            f"highlight(search_index, 0, '{MARK_START}', '{MARK_END}') AS title, "
+            f"snippet(search_index, -1, '{MARK_START}', '{MARK_END}', '…', 12) AS snippet, "
+            "bm25(search_index, 10.0, 1.0, 3.0) AS score "
+            "FROM search_index WHERE search_index MATCH :match "
+            f"AND rowid % 4 IN ({', '.join(str(code) for code in codes)}) "
+            "ORDER BY score LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'limit': limit, 'offset': offset}).all()
+
+        return [{
+            'kind': KINDS_BY_CODE[rowid % 4],
+            'id': rowid // 4,
+            'title': _render_snippet(title),
+            'snippet': _render_snippet(snippet),
+            'score': -score  # bm25 is lower for better matches
+        } for rowid, title, snippet, score in rows]
+
+    def matching_ids(self, query: str, kind: str):
+        """Subquery with the ids of one kind that match, for filtering regular queries"""
+        match = build_match_query(query)
+        if not match:
+            return None
+        code = SEARCH_SOURCES[kind][0]
+        return text(
+            f"SELECT rowid / 4 AS id FROM search_index WHERE search_index MATCH :match AND rowid % 4 = {code}"
+        ).bindparams(match=match).columns(column('id', Integer))
@@ -0,0 +1,117 @@
+# app/services/seller_cache.py
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.executor import blocking_executor
+from app.models.order import SellerProfile
+
+
+class SellerCache:
+    """
+    Two-level cache (in-memory LRU + SQLite table) for seller profile data
+    The in-memory level is only touched on the event loop, database access runs in the blocking pool
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 incomplete_ttl: Optional[int] = None):
+        self.ttl = timedelta(seconds=ttl if ttl is not None else settings.SELLER_CACHE_TTL)
+        self.incomplete_ttl = timedelta(
+            seconds=incomplete_ttl if incomplete_ttl is not None else settings.SELLER_CACHE_INCOMPLETE_TTL
+        )
+        self.max_entries = max_entries if max_entries is not None else settings.SELLER_CACHE_MAX_ENTRIES
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        # A profile without registration date is retried soon, the page may just have failed to render it
+        ttl = self.ttl if entry['since'] else self.incomplete_ttl
+        return datetime.now() - entry['fetched_at'] < ttl
+
+    def _remember(self, profile_url: str, entry: Dict[str, Any]):
+        self._memory[profile_url] = entry
+        self._memory.move_to_end(profile_url)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, profile_url: str) -> Optional[Dict[str, Any]]:
+        """Return cached seller data or None if missing or expired"""
+        entry = self._memory.get(profile_url)
+        if entry:
+            if self._is_fresh(entry):
+                self._memory.move_to_end(profile_url)
+                return entry
+            del self._memory[profile_url]
+
+        entry = await blocking_executor.run(self._load, profile_url)
+        if not entry or not self._is_fresh(entry):
+            return None
+        self._remember(profile_url, entry)
+        return entry
+
+    async def set(self, profile_url: str, name: str, since: str, is_new: bool):
+        """Store seller data in memory, complete profiles (with registration date) also in the database"""
+        entry = {
+            'name': name,
+            'since': since,
+            'is_new': is_new,
+            'fetched_at': datetime.now()
+        }
+        self._remember(profile_url, entry)
+        if since:
+            await blocking_executor.run(self._store, profile_url, entry)
+
+    async def invalidate(self, profile_url: Optional[str] = None) -> int:
+        """Drop one seller (or all sellers) from the cache, returns number of removed rows"""
+        if profile_url:
+            self._memory.pop(profile_url, None)
+        else:
+            self._memory.clear()
+        return await blocking_executor.run(self._delete, profile_url)
+
+    def _load(self, profile_url: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            profile = db.query(SellerProfile).filter(SellerProfile.profile_url == profile_url).first()
+            if not profile:
+                return None
+            return {
+                'name': profile.name,
+                'since': profile.since or '',
+                'is_new': profile.is_new,
+                'fetched_at': profile.fetched_at
+            }
+        finally:
+            db.close()
+
+    def _store(self, profile_url: str, entry: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            profile = db.query(SellerProfile).filter(SellerProfile.profile_url == profile_url).first()
+            if not profile:
+                profile = SellerProfile(profile_url=profile_url)
+                db.add(profile)
+
+            profile.name = entry['name']
+            profile.since = entry['since']
+            profile.is_new = entry['is_new']
+            profile.fetched_at = entry['fetched_at']
+            db.commit()
+        finally:
+            db.close()
+
+    def _delete(self, profile_url: Optional[str] = None) -> int:
+        db = SessionLocal()
+        try:
+            query = db.query(SellerProfile)
+            if profile_url:
+                query = query.filter(SellerProfile.profile_url == profile_url)
+            removed = query.delete()
+            db.commit()
+            return removed
+        finally:
+            db.close()
+
+
+# Global instance
+seller_cache = SellerCache()
@@ -0,0 +1,129 @@
+# app/services/stats_service.py
+# Dashboard statistics from one aggregate query or from counters maintained by triggers
+import time
+from typing import Dict, Any, Optional
+from sqlalchemy import case, func, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.order import Order
+
+STATUSES = ('Ordered', 'Shipped', 'Delivered')
+
+
+def _counter_values(row: str, sign: str) -> str:
+    """VALUES rows that add (sign '+') or remove (sign '-') one order from the counters"""
+    return (
+        f"('total', {sign}1), "
+        f"('value', {sign}coalesce({row}.price, 0)), "
+        f"('new_sellers', {sign}coalesce({row}.seller_is_new, 0)), "
+        f"('status:' || coalesce({row}.status, ''), {sign}1), "
+        f"('category:' || coalesce({row}.category, ''), {sign}1)"
+    )
+
+
+UPSERT = "INSERT INTO order_stats(key, value) VALUES {values} ON CONFLICT(key) DO UPDATE SET value = value + excluded.value;"
+
+
+def create_stats_table(conn: Connection):
+    """Create the order_stats counters with the triggers that keep them up to date, and fill them"""
+    conn.execute(text("CREATE TABLE IF NOT EXISTS order_stats (key TEXT PRIMARY KEY, value REAL NOT NULL DEFAULT 0)"))
+
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS orders_stats_insert AFTER INSERT ON orders BEGIN "
+        + UPSERT.format(values=_counter_values('new', '+')) + " END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS orders_stats_delete AFTER DELETE ON orders BEGIN "
+        + UPSERT.format(values=_counter_values('old', '-')) + " END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS orders_stats_update AFTER UPDATE OF price, status, seller_is_new, category ON orders BEGIN "
+        + UPSERT.format(values=_counter_values('old', '-')) + " "
+        + UPSERT.format(values=_counter_values('new', '+')) + " END"
+    ))
+
+    conn.execute(text("DELETE FROM order_stats"))
+    conn.execute(text(
+        "INSERT INTO order_stats(key, value) "
+        "SELECT 'total', count(*) FROM orders "
+        "UNION ALL SELECT 'value', coalesce(sum(price), 0) FROM orders "
+        "UNION ALL SELECT 'new_sellers', coalesce(sum(seller_is_new), 0) FROM orders "
+        "UNION ALL SELECT 'status:' || coalesce(status, ''), count(*) FROM orders GROUP BY coalesce(status, '') "
+        "UNION ALL SELECT 'category:' || coalesce(category, ''), count(*) FROM orders GROUP BY coalesce(category, '')"
+    ))
+
+
+class StatsService:
+    """
+    Snapshot of the order statistics for the dashboard
+    Reads the trigger-maintained counters when they exist, otherwise runs one aggregate query,
+    and keeps the result for a few seconds so /stats and /stats/detail share it
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else settings.STATS_CACHE_TTL
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def get_snapshot(self, db: Session) -> Dict[str, Any]:
+        if self._snapshot is None or time.monotonic() >= self._expires_at:
+            self._snapshot = self._from_counters(db) if self._has_counters(db) else self._aggregate(db)
+            self._expires_at = time.monotonic() + self.ttl
+        return self._snapshot
+
+    def _has_counters(self, db: Session) -> bool:
+        if not settings.STATS_MATERIALIZED or db.bind.dialect.name != 'sqlite':
+            return False
+        return db.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'order_stats'"
+        )).first() is not None
+
+    def _from_counters(self, db: Session) -> Dict[str, Any]:
+        counters = dict(db.execute(text("SELECT key, value FROM order_stats")).all())
+        categories = [
+            (key[len('category:'):] or None, int(count)) for key, count in counters.items()
+            if key.startswith('category:') and count > 0
+        ]
+        return self._build(
+            total=int(counters.get('total', 0)),
+            value=counters.get('value', 0.0),
+            new_sellers=int(counters.get('new_sellers', 0)),
+            by_status={status: int(counters.get(f'status:{status}', 0)) for status in STATUSES},
+            categories=categories
+        )
+
+    def _aggregate(self, db: Session) -> Dict[str, Any]:
+        row = db.query(
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.price), 0),
+            func.coalesce(func.sum(case((Order.seller_is_new == True, 1), else_=0)), 0),
+            *[func.coalesce(func.sum(case((Order.status == status, 1), else_=0)), 0) for status in STATUSES]
+        ).one()
+        categories = db.query(Order.category, func.count(Order.id)).group_by(Order.category).all()
+        return self._build(
+            total=row[0],
+            value=row[1],
+            new_sellers=row[2],
+            by_status=dict(zip(STATUSES, row[3:])),
+            categories=categories
+        )
+
+    @staticmethod
+    def _build(total, value, new_sellers, by_status, categories) -> Dict[str, Any]:
+        top_categories = sorted(categories, key=lambda category: (-category[1], category[0] or ''))[:5]
+        return {
+            "total": total,
+            "transit": by_status.get('Shipped', 0),
+            "value": f"{value:.2f}",
+            "new_sellers": new_sellers,
+            "by_status": {status: count for status, count in by_status.items() if count > 0},
+            "top_categories": [{"category": category, "count": count} for category, count in top_categories]
+        }
+
+
+# Global instance
+stats_service = StatsService()
@@ -0,0 +1,62 @@
+# app/services/tracking_cache.py
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+from app.core.config import settings
+
+
+class TrackingCache:
+    """
+    Remembers the last tracking result per (carrier, tracking number) and decides when to poll again
+    Delivered shipments are terminal and never polled again, repeated errors back off exponentially
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def ttl_for(self, data: Dict[str, Any], errors: int) -> Optional[timedelta]:
+        """Time until the next poll, None for terminal states"""
+        if 'error' in data:
+            backoff = settings.TRACKING_ERROR_BACKOFF * 2 ** max(errors - 1, 0)
+            return timedelta(seconds=min(backoff, settings.TRACKING_ERROR_BACKOFF_MAX))
+
+        progress = data.get('progress', 0)
+        if progress == 100:
+            return None
+        if progress >= 80:
+            return timedelta(seconds=settings.TRACKING_TTL_OUT_FOR_DELIVERY)
+        if progress >= 40:
+            return timedelta(seconds=settings.TRACKING_TTL_IN_TRANSIT)
+        if progress > 0:
+            return timedelta(seconds=settings.TRACKING_TTL_ANNOUNCED)
+        return timedelta(seconds=settings.TRACKING_TTL_DEFAULT)
+
+    def is_fresh(self, carrier: str, tracking_number: str) -> bool:
+        """True if the shipment does not need to be polled yet"""
+        entry = self._entries.get((carrier, tracking_number))
+        if not entry:
+            return False
+        return entry['expires_at'] is None or datetime.now() < entry['expires_at']
+
+    def put(self, carrier: str, tracking_number: str, data: Dict[str, Any]):
+        key = (carrier, tracking_number)
+        previous = self._entries.get(key)
+        errors = (previous['errors'] + 1 if previous else 1) if 'error' in data else 0
+
+        ttl = self.ttl_for(data, errors)
+        self._entries[key] = {
+            'data': data,
+            'errors': errors,
+            'expires_at': datetime.now() + ttl if ttl is not None else None
+        }
+
+    def invalidate(self, tracking_number: Optional[str] = None):
+        """Forget one shipment (all carriers) or everything"""
+        if tracking_number is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[1] == tracking_number]:
+            del self._entries[key]
+
+
+# Global instance
+tracking_cache = TrackingCache()
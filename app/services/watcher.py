@@ -1,12 +1,36 @@
 # app/services/watcher.py
 import requests
-import json
+import hashlib
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
-from bs4 import BeautifulSoup
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.services.extraction import get_listing_parser, find_price_region
 from app.services.notification_service import NotificationService
+from app.services.price_history import PriceHistoryService
+from app.services.event_bus import event_bus
+
+# Short-circuit counters, shared by all PriceWatcher instances
+check_stats = {
+    'requests': 0,
+    'not_modified': 0,  # 304 response to a conditional request
+    'unchanged': 0,  # Price region hash matched the previous check
+    'parsed': 0
+}
+# Checks run on the blocking executor's worker threads
+check_stats_lock = threading.Lock()
+
+
+def _count(key: str):
+    with check_stats_lock:
+        check_stats[key] += 1
+
+
+def get_check_stats() -> Dict[str, int]:
+    """Consistent snapshot of the short-circuit counters"""
+    with check_stats_lock:
+        return dict(check_stats)
 
 
 class PriceWatcher:
@@ -15,41 +39,54 @@ class PriceWatcher:
     def __init__(self):
         self.headers = {'User-Agent': settings.USER_AGENT}
         self.notification_service = NotificationService()
+        self.price_history = PriceHistoryService()
+        self.parser = get_listing_parser()
 
     def check_price_change(self, watched_item, db: Session) -> Optional[Dict[str, Any]]:
-        """Check if price has changed for a watched item"""
+        """Check if price has changed for a watched item, re-raises if the check failed"""
         try:
-            response = requests.get(watched_item.url, headers=self.headers, timeout=15)
+            headers = dict(self.headers)
+            if watched_item.etag:
+                headers['If-None-Match'] = watched_item.etag
+            if watched_item.last_modified:
+                headers['If-Modified-Since'] = watched_item.last_modified
+
+            response = requests.get(watched_item.url, headers=headers, timeout=15)
+            _count('requests')
+
+            # Nothing changed since the last check
+            if response.status_code == 304:
+                _count('not_modified')
+                watched_item.last_checked = datetime.now()
+                db.commit()
+                return None
+
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            watched_item.etag = response.headers.get('ETag')
+            watched_item.last_modified = response.headers.get('Last-Modified')
+
+            # Skip parsing if the price region is byte-identical to the last check
+            price_region = find_price_region(response.content)
+            content_hash = hashlib.sha256(price_region).hexdigest() if price_region else None
+            if content_hash and content_hash == watched_item.content_hash:
+                _count('unchanged')
+                watched_item.last_checked = datetime.now()
+                db.commit()
+                return None
 
             # Extract current price
-            price_elem = soup.find('h2', {'id': 'viewad-price'})
-            current_price = 0.0
-
-            if price_elem:
-                import re
-                price_match = re.search(r'(\d+(?:[.,]\d+)?)', price_elem.text)
-                if price_match:
-                    current_price = float(price_match.group(1).replace(',', '.'))
+            current_price = self.parser.extract_price(response.content)
+            _count('parsed')
+            watched_item.content_hash = content_hash
 
             # Check if price changed
             if current_price != watched_item.current_price and current_price > 0:
                 # Update price history
-                history = json.loads(watched_item.price_history) if watched_item.price_history else []
-                history.append({
-                    'price': current_price,
-                    'date': datetime.now().isoformat()
-                })
-
-                # Keep only last 30 entries
-                if len(history) > 30:
-                    history = history[-30:]
+                self.price_history.record(db, watched_item.id, current_price)
 
                 # Update watched item
                 watched_item.last_price = watched_item.current_price
                 watched_item.current_price = current_price
-                watched_item.price_history = json.dumps(history)
                 watched_item.last_checked = datetime.now()
                 watched_item.updated_at = datetime.now()
 
@@ -78,13 +115,15 @@ class PriceWatcher:
                         db
                     )
 
-                return {
+                result = {
                     'item_id': watched_item.id,
                     'title': watched_item.title,
                     'old_price': watched_item.last_price,
                     'new_price': current_price,
                     'change': current_price - watched_item.last_price
                 }
+                event_bus.publish('price_change', result)
+                return result
 
             # Update last checked
             watched_item.last_checked = datetime.now()
@@ -92,5 +131,6 @@ class PriceWatcher:
 
         except Exception as e:
             print(f"Error checking price for {watched_item.title}: {e}")
+            raise
 
         return None
\ No newline at end of file
@@ -0,0 +1,64 @@
+# Benchmark for the HTML parser backends in app.services.extraction
+#
+# Usage (from the project root):
+#   python -m benchmarks.parser_benchmark [--rounds 200]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.extraction import available_backends, get_listing_parser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LISTING_URL = "https://www.kleinanzeigen.de/s-anzeige/canon-ex-auto-kamera-film/3178119655-245-7579"
+
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def measure(func, rounds: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare HTML parser backends on saved pages")
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    listing_html = load_fixture("listing.html")
+    profile_html = load_fixture("profile.html")
+
+    backends = available_backends()
+    reference = get_listing_parser('bs4').extract_listing(listing_html, LISTING_URL)
+
+    print(f"{'backend':<12}{'listing':>12}{'price':>12}{'profile':>12}   (ms per page, {args.rounds} rounds)")
+    for backend in backends:
+        parser = get_listing_parser(backend)
+
+        # Every backend has to produce the same result as the BeautifulSoup reference
+        result = parser.extract_listing(listing_html, LISTING_URL)
+        if result != reference:
+            mismatches = [key for key in reference if reference[key] != result.get(key)]
+            print(f"{backend:<12}result differs from bs4 in: {', '.join(mismatches)}")
+            continue
+
+        listing_ms = measure(lambda: parser.extract_listing(listing_html, LISTING_URL), args.rounds)
+        price_ms = measure(lambda: parser.extract_price(listing_html), args.rounds)
+        profile_ms = measure(lambda: parser.extract_seller_since(profile_html), args.rounds)
+        print(f"{backend:<12}{listing_ms:>12.3f}{price_ms:>12.3f}{profile_ms:>12.3f}")
+
+    missing = [name for name in ('selectolax', 'lxml') if name not in backends]
+    if missing:
+        print(f"Not installed: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Query plan regression check for the hot queries of the API and background loops
+# Builds a fresh SQLite database through the migrations and fails if any hot query
+# scans a whole table instead of using an index
+#
+# Usage (from the project root):
+#   python -m benchmarks.query_plan_check
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_, text
+from sqlalchemy.orm import Session
+
+from app.core.database import create_db_engine
+from app.core.migrations import run_migrations
+from app.models.order import Order, WatchedItem, PriceHistory, Job
+from app.services.notification_service import Notification
+from app.services.search import SearchService
+
+
+def hot_queries(db: Session):
+    """(name, query) of every query that runs per request or per background sweep"""
+    return [
+        ("orders: newest first", db.query(Order).order_by(Order.created_at.desc()).limit(100)),
+        ("orders: next page", db.query(Order).filter(or_(
+            Order.created_at < datetime(2024, 1, 1),
+            (Order.created_at == datetime(2024, 1, 1)) & (Order.id < 100)
+        )).order_by(Order.created_at.desc(), Order.id.desc()).limit(101)),
+        ("orders: by status", db.query(Order).filter(Order.status == 'Shipped').order_by(Order.created_at.desc()).limit(100)),
+        ("orders: by color", db.query(Order).filter(Order.color == '#ef4444').order_by(Order.created_at.desc()).limit(100)),
+        ("orders: active tracking", db.query(Order).filter(Order.tracking_number.isnot(None), Order.status != 'Delivered')),
+        ("orders: by ad id", db.query(Order).filter(Order.ad_id == '3178119655')),
+        ("orders: full-text search", db.query(Order).filter(
+            Order.id.in_(SearchService().matching_ids('Kameras', 'order'))
+        ).order_by(Order.created_at.desc()).limit(100)),
+        ("watched items: newest first", db.query(WatchedItem).order_by(WatchedItem.created_at.desc())),
+        ("watched items: due queue", db.query(WatchedItem.id, WatchedItem.next_check_at).filter(WatchedItem.notifications_enabled == True)),
+        ("price history: range", db.query(PriceHistory).filter(PriceHistory.item_id == 1).order_by(PriceHistory.observed_at.asc())),
+        ("notifications: unread", db.query(Notification).filter(Notification.read == False).order_by(Notification.created_at.desc()).limit(50)),
+        ("jobs: active of kind", db.query(Job).filter(Job.kind == 'check_all_prices', Job.status.in_(('queued', 'running')))),
+    ]
+
+
+def full_scans(plan_rows):
+    """Plan lines that read a whole table without an index"""
+    return [detail for detail in plan_rows if detail.startswith("SCAN") and "INDEX" not in detail]
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'plan_check.db')}")
+        run_migrations(engine)
+
+        failures = 0
+        with Session(engine) as db, engine.connect() as conn:
+            for name, query in hot_queries(db):
+                sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+                plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+                scans = full_scans(plan)
+                print(f"{'FAIL' if scans else 'ok':<6}{name:<32}{' | '.join(plan)}")
+                failures += bool(scans)
+
+        engine.dispose()
+
+    if failures:
+        print(f"{failures} hot queries fall back to a full table scan")
+        return 1
+    print("All hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
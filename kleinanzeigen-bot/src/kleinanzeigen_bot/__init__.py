@@ -1,11 +1,12 @@
 # SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
-import atexit, enum, json, os, re, signal, sys, textwrap  # isort: skip
+import asyncio, atexit, enum, json, os, re, signal, sys, textwrap  # isort: skip
 import getopt  # pylint: disable=deprecated-module
 import urllib.parse as urllib_parse
 from gettext import gettext as _
-from typing import Any, Final
+from pathlib import Path
+from typing import Any, Final, Literal, NamedTuple
 
 import certifi, colorama, nodriver  # isort: skip
 from ruamel.yaml import YAML
@@ -13,8 +14,10 @@ from wcmatch import glob
 
 from . import extract, resources
 from ._version import __version__
+from .inventory import OwnAdsInventory
 from .model.ad_model import MAX_DESCRIPTION_LENGTH, Ad, AdPartial
 from .model.config_model import Config
+from .model.download_manifest import DownloadManifest
 from .update_checker import UpdateChecker
 from .utils import dicts, error_handlers, loggers, misc
 from .utils.exceptions import CaptchaEncountered
@@ -28,6 +31,15 @@ from .utils.web_scraping_mixin import By, Element, Is, WebScrapingMixin
 LOG:Final[loggers.Logger] = loggers.get_logger(__name__)
 LOG.setLevel(loggers.INFO)
 
+# number of ad IDs sent per m-anzeigen-loeschen.json request
+DELETE_BATCH_SIZE:Final[int] = 25
+
+# remote metadata of the ads as of their last download, used by "download --ads=changed"
+DOWNLOAD_MANIFEST_FILE:Final[str] = ".temp/download_manifest.json"
+
+# top-level `id: 12345` line of a YAML ad config file
+AD_ID_PATTERN:Final[re.Pattern[str]] = re.compile(r"""^id:[ \t]*["']?(\d+)["']?[ \t]*(?:#.*)?$""", re.MULTILINE)
+
 colorama.just_fix_windows_console()
 
 
@@ -36,6 +48,14 @@ class AdUpdateStrategy(enum.Enum):
     MODIFY = enum.auto()
 
 
+class PublishResult(NamedTuple):
+    ad_file:str
+    title:str
+    status:Literal["published", "skipped", "failed"]
+    ad_id:int | None = None
+    error:str | None = None
+
+
 class KleinanzeigenBot(WebScrapingMixin):
 
     def __init__(self) -> None:
@@ -61,6 +81,9 @@ class KleinanzeigenBot(WebScrapingMixin):
         self.ads_selector = "due"
         self.keep_old_ads = False
 
+        # parallel publish workers share stdin, only one of them may wait for a solved captcha at a time
+        self._captcha_prompt_lock = asyncio.Lock()
+
     def __del__(self) -> None:
         if self.file_log:
             self.file_log.close()
@@ -172,7 +195,7 @@ class KleinanzeigenBot(WebScrapingMixin):
                 case "download":
                     self.configure_file_logging()
                     # ad IDs depends on selector
-                    if not (self.ads_selector in {"all", "new"} or re.compile(r"\d+[,\d+]*").search(self.ads_selector)):
+                    if not (self.ads_selector in {"all", "new", "changed"} or re.compile(r"\d+[,\d+]*").search(self.ads_selector)):
                         LOG.warning('You provided no ads selector. Defaulting to "new".')
                         self.ads_selector = "new"
                     self.load_config()
@@ -227,10 +250,11 @@ class KleinanzeigenBot(WebScrapingMixin):
                     * <id(s)>: Gibt eine oder mehrere Anzeigen-IDs an, die veröffentlicht werden sollen, z. B. "--ads=1,2,3", ignoriert republication_interval
                     * Kombinationen: Sie können mehrere Selektoren mit Kommas kombinieren, z. B. "--ads=changed,due" um sowohl geänderte als auch
                       fällige Anzeigen zu veröffentlichen
-              --ads=all|new|<id(s)> (download) - Gibt an, welche Anzeigen heruntergeladen werden sollen (STANDARD: new)
+              --ads=all|new|changed|<id(s)> (download) - Gibt an, welche Anzeigen heruntergeladen werden sollen (STANDARD: new)
                     Mögliche Werte:
                     * all: Lädt alle Anzeigen aus Ihrem Profil herunter
                     * new: Lädt Anzeigen aus Ihrem Profil herunter, die lokal noch nicht gespeichert sind
+                    * changed: Wie new, lädt zusätzlich Anzeigen erneut herunter, die seit dem letzten Download online geändert wurden
                     * <id(s)>: Gibt eine oder mehrere Anzeigen-IDs zum Herunterladen an, z. B. "--ads=1,2,3"
               --ads=changed|<id(s)> (update) - Gibt an, welche Anzeigen aktualisiert werden sollen (STANDARD: changed)
                     Mögliche Werte:
@@ -271,10 +295,11 @@ class KleinanzeigenBot(WebScrapingMixin):
                     * changed: only publish ads that have been modified since last publication
                     * <id(s)>: provide one or several ads by ID to (re-)publish, like e.g. "--ads=1,2,3" ignoring republication_interval
                     * Combinations: You can combine multiple selectors with commas, e.g. "--ads=changed,due" to publish both changed and due ads
-              --ads=all|new|<id(s)> (download) - specifies which ads to download (DEFAULT: new)
+              --ads=all|new|changed|<id(s)> (download) - specifies which ads to download (DEFAULT: new)
                     Possible values:
                     * all: downloads all ads from your profile
                     * new: downloads ads from your profile that are not locally saved yet
+                    * changed: like new, plus re-downloads ads that were changed online since their last download
                     * <id(s)>: provide one or several ads by ID to download, like e.g. "--ads=1,2,3"
               --ads=changed|<id(s)> (update) - specifies which ads to update (DEFAULT: changed)
                     Possible values:
@@ -450,6 +475,46 @@ class KleinanzeigenBot(WebScrapingMixin):
 
         return False
 
+    def __find_ad_files(self) -> dict[str, str]:
+        """
+        @return: the absolute paths of all ad config files mapped to the paths as matched by the `ad_files` patterns
+        """
+        LOG.info("Searching for ad config files...")
+
+        ad_files:dict[str, str] = {}
+        data_root_dir = os.path.dirname(self.config_file_path)
+        for file_pattern in self.config.ad_files:
+            for ad_file in glob.glob(file_pattern, root_dir = data_root_dir, flags = glob.GLOBSTAR | glob.BRACE | glob.EXTGLOB):
+                if not str(ad_file).endswith("ad_fields.yaml"):
+                    ad_files[abspath(ad_file, relative_to = data_root_dir)] = ad_file
+        LOG.info(" -> found %s", pluralize("ad config file", ad_files))
+        return ad_files
+
+    def load_ad_ids(self) -> set[int]:
+        """
+        Collects the IDs of all local ad config files without validating or resolving them like load_ads() does,
+        YAML files are only scanned for their top-level `id:` line.
+
+        Returns:
+            set[int]: the IDs of all ad config files that have one.
+        """
+        ad_ids:set[int] = set()
+        for ad_file in self.__find_ad_files():
+            try:
+                with open(ad_file, encoding = "utf-8") as file:
+                    content = file.read()
+                if ad_file.endswith(".json"):
+                    ad_id = json.loads(content).get("id")
+                else:
+                    match = AD_ID_PATTERN.search(content)
+                    ad_id = match.group(1) if match else None
+            except (OSError, ValueError, AttributeError) as ex:
+                LOG.warning("Could not read ad ID from [%s]: %s", ad_file, ex)
+                continue
+            if ad_id:
+                ad_ids.add(int(ad_id))
+        return ad_ids
+
     def load_ads(self, *, ignore_inactive:bool = True, exclude_ads_with_id:bool = True) -> list[tuple[str, Ad, dict[str, Any]]]:
         """
         Load and validate all ad config files, optionally filtering out inactive or already-published ads.
@@ -464,15 +529,7 @@ class KleinanzeigenBot(WebScrapingMixin):
             list[tuple[str, Ad, dict[str, Any]]]:
             Tuples of (file_path, validated Ad model, original raw data).
         """
-        LOG.info("Searching for ad config files...")
-
-        ad_files:dict[str, str] = {}
-        data_root_dir = os.path.dirname(self.config_file_path)
-        for file_pattern in self.config.ad_files:
-            for ad_file in glob.glob(file_pattern, root_dir = data_root_dir, flags = glob.GLOBSTAR | glob.BRACE | glob.EXTGLOB):
-                if not str(ad_file).endswith("ad_fields.yaml"):
-                    ad_files[abspath(ad_file, relative_to = data_root_dir)] = ad_file
-        LOG.info(" -> found %s", pluralize("ad config file", ad_files))
+        ad_files = self.__find_ad_files()
         if not ad_files:
             return []
 
@@ -571,7 +628,7 @@ class KleinanzeigenBot(WebScrapingMixin):
     def load_ad(self, ad_cfg_orig:dict[str, Any]) -> Ad:
         return AdPartial.model_validate(ad_cfg_orig).to_ad(self.config.ad_defaults)
 
-    async def check_and_wait_for_captcha(self, *, is_login_page:bool = True) -> None:
+    async def check_and_wait_for_captcha(self, *, is_login_page:bool = True, ad_title:str | None = None) -> None:
         try:
             await self.web_find(By.CSS_SELECTOR,
                                 "iframe[name^='a-'][src^='https://www.google.com/recaptcha/api2/anchor?']", timeout = 2)
@@ -580,14 +637,19 @@ class KleinanzeigenBot(WebScrapingMixin):
                 LOG.warning("Captcha recognized - auto-restart enabled, abort run...")
                 raise CaptchaEncountered(misc.parse_duration(self.config.captcha.restart_delay))
 
-            LOG.warning("############################################")
-            LOG.warning("# Captcha present! Please solve the captcha.")
-            LOG.warning("############################################")
+            async with self._captcha_prompt_lock:
+                LOG.warning("############################################")
+                if ad_title:
+                    LOG.warning("# Captcha present for ad '%s'! Please solve the captcha.", ad_title)
+                else:
+                    LOG.warning("# Captcha present! Please solve the captcha.")
+                LOG.warning("############################################")
 
-            if not is_login_page:
-                await self.web_scroll_page_down()
+                if not is_login_page:
+                    await self.page.bring_to_front()  # the tab of another worker may be in front
+                    await self.web_scroll_page_down()
 
-            await ainput(_("Press a key to continue..."))
+                await ainput(_("Press a key to continue..."))
         except TimeoutError:
             pass
 
@@ -657,80 +719,178 @@ class KleinanzeigenBot(WebScrapingMixin):
         return False
 
     async def delete_ads(self, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]) -> None:
-        count = 0
+        """
+        Deletes the published counterparts of the given ads. The CSRF token is fetched once
+        and the IDs are sent in batches of DELETE_BATCH_SIZE instead of one request per ad.
+        """
+        published_ads = await OwnAdsInventory(self, self.root_url).fetch_published_ads()
 
-        published_ads = json.loads(
-            (await self.web_request(f"{self.root_url}/m-meine-anzeigen-verwalten.json?sort=DEFAULT"))["content"])["ads"]
+        LOG.info("Collecting %s to delete...", pluralize("ad", len(ad_cfgs)))
+        ad_ids = self.__collect_ad_ids_to_delete([ad_cfg for (_ad_file, ad_cfg, _ad_cfg_orig) in ad_cfgs], published_ads,
+            delete_old_ads_by_title = self.config.publishing.delete_old_ads_by_title)
 
-        for (ad_file, ad_cfg, _ad_cfg_orig) in ad_cfgs:
-            count += 1
-            LOG.info("Processing %s/%s: '%s' from [%s]...", count, len(ad_cfgs), ad_cfg.title, ad_file)
-            await self.delete_ad(ad_cfg, published_ads, delete_old_ads_by_title = self.config.publishing.delete_old_ads_by_title)
-            await self.web_sleep()
+        if ad_ids:
+            await self.__delete_ad_ids(ad_ids, await self.__fetch_csrf_token())
+        for (_ad_file, ad_cfg, _ad_cfg_orig) in ad_cfgs:
+            ad_cfg.id = None
 
         LOG.info("############################################")
-        LOG.info("DONE: Deleted %s", pluralize("ad", count))
+        LOG.info("DONE: Deleted %s", pluralize("ad", len(ad_ids)))
         LOG.info("############################################")
 
     async def delete_ad(self, ad_cfg:Ad, published_ads:list[dict[str, Any]], *, delete_old_ads_by_title:bool) -> bool:
         LOG.info("Deleting ad '%s' if already present...", ad_cfg.title)
 
+        csrf_token = await self.__fetch_csrf_token()
+        ad_ids = self.__collect_ad_ids_to_delete([ad_cfg], published_ads, delete_old_ads_by_title = delete_old_ads_by_title)
+        if ad_ids:
+            await self.__delete_ad_ids(ad_ids, csrf_token)
+
+        await self.web_sleep()
+        ad_cfg.id = None
+        return True
+
+    async def __fetch_csrf_token(self) -> str:
         await self.web_open(f"{self.root_url}/m-meine-anzeigen.html")
         csrf_token_elem = await self.web_find(By.CSS_SELECTOR, "meta[name=_csrf]")
         csrf_token = csrf_token_elem.attrs["content"]
         ensure(csrf_token is not None, "Expected CSRF Token not found in HTML content!")
+        return str(csrf_token)
 
-        if delete_old_ads_by_title:
-
-            for published_ad in published_ads:
-                published_ad_id = int(published_ad.get("id", -1))
-                published_ad_title = published_ad.get("title", "")
-                if ad_cfg.id == published_ad_id or ad_cfg.title == published_ad_title:
-                    LOG.info(" -> deleting %s '%s'...", published_ad_id, published_ad_title)
-                    await self.web_request(
-                        url = f"{self.root_url}/m-anzeigen-loeschen.json?ids={published_ad_id}",
-                        method = "POST",
-                        headers = {"x-csrf-token": csrf_token}
-                    )
-        elif ad_cfg.id:
+    @staticmethod
+    def __collect_ad_ids_to_delete(ad_cfgs:list[Ad], published_ads:list[dict[str, Any]], *,
+            delete_old_ads_by_title:bool) -> dict[int, str]:
+        """
+        @return: the IDs of the ads to delete mapped to their titles, each ID once.
+                 By title, only ads that are actually published are matched (by ID or title),
+                 otherwise the configured IDs are taken as they are.
+        """
+        ad_ids:dict[int, str] = {}
+        if not delete_old_ads_by_title:
+            for ad_cfg in ad_cfgs:
+                if ad_cfg.id:
+                    ad_ids[ad_cfg.id] = ad_cfg.title
+            return ad_ids
+
+        titles_by_id:dict[int, str] = {}
+        ids_by_title:dict[str, list[int]] = {}
+        for published_ad in published_ads:
+            if "id" not in published_ad:
+                continue
+            published_ad_id = int(published_ad["id"])
+            published_ad_title = published_ad.get("title", "")
+            titles_by_id[published_ad_id] = published_ad_title
+            ids_by_title.setdefault(published_ad_title, []).append(published_ad_id)
+
+        for ad_cfg in ad_cfgs:
+            if ad_cfg.id in titles_by_id:
+                ad_ids[ad_cfg.id] = titles_by_id[ad_cfg.id]
+            for published_ad_id in ids_by_title.get(ad_cfg.title, []):
+                ad_ids[published_ad_id] = ad_cfg.title
+        return ad_ids
+
+    async def __delete_ad_ids(self, ad_ids:dict[int, str], csrf_token:str) -> None:
+        for ad_id, title in ad_ids.items():
+            LOG.info(" -> deleting %s '%s'...", ad_id, title)
+
+        ids = list(ad_ids)
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            if start:
+                await self.web_sleep()
+            batch = ",".join(str(ad_id) for ad_id in ids[start:start + DELETE_BATCH_SIZE])
             await self.web_request(
-                url = f"{self.root_url}/m-anzeigen-loeschen.json?ids={ad_cfg.id}",
+                url = f"{self.root_url}/m-anzeigen-loeschen.json?ids={batch}",
                 method = "POST",
                 headers = {"x-csrf-token": csrf_token},
                 valid_response_codes = [200, 404]
             )
 
-        await self.web_sleep()
-        ad_cfg.id = None
-        return True
-
     async def __check_publishing_result(self) -> bool:
         # Check for success messages
         return await self.web_check(By.ID, "checking-done", Is.DISPLAYED) or await self.web_check(By.ID, "not-completed", Is.DISPLAYED)
 
-    async def publish_ads(self, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]) -> None:
-        count = 0
-
-        published_ads = json.loads(
-            (await self.web_request(f"{self.root_url}/m-meine-anzeigen-verwalten.json?sort=DEFAULT"))["content"])["ads"]
+    async def publish_ads(self, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]) -> list[PublishResult]:
+        """
+        Publishes the given ads with `publishing.workers` form-filling workers, each in its own tab of the
+        logged-in browser session. Workers start ads no closer than `publishing.min_submit_interval` seconds apart,
+        a failing ad is reported and doesn't stop the others. A captcha with auto restart enabled stops all workers.
 
-        for (ad_file, ad_cfg, ad_cfg_orig) in ad_cfgs:
-            LOG.info("Processing %s/%s: '%s' from [%s]...", count + 1, len(ad_cfgs), ad_cfg.title, ad_file)
+        @return: one result per given ad, in the order of `ad_cfgs`
+        """
+        published_ads = await OwnAdsInventory(self, self.root_url).fetch_published_ads()
 
+        results:list[PublishResult | None] = [None] * len(ad_cfgs)
+        pending:asyncio.Queue[int] = asyncio.Queue()
+        for index, (ad_file, ad_cfg, _ad_cfg_orig) in enumerate(ad_cfgs):
             if [x for x in published_ads if x["id"] == ad_cfg.id and x["state"] == "paused"]:
-                LOG.info("Skipping because ad is reserved")
-                continue
+                LOG.info("Skipping '%s' because ad is reserved", ad_cfg.title)
+                results[index] = PublishResult(ad_file, ad_cfg.title, "skipped")
+            else:
+                pending.put_nowait(index)
 
-            count += 1
+        rate_limiter = misc.RateLimiter(self.config.publishing.min_submit_interval)
+        worker_count = max(1, min(self.config.publishing.workers, pending.qsize()))
 
-            await self.publish_ad(ad_file, ad_cfg, ad_cfg_orig, published_ads, AdUpdateStrategy.REPLACE)
-            await self.web_await(self.__check_publishing_result, timeout = 5 * 60)
+        async def publish_worker() -> None:
+            while not pending.empty():
+                index = pending.get_nowait()
+                ad_file, ad_cfg, ad_cfg_orig = ad_cfgs[index]
+                await rate_limiter.acquire()
+                LOG.info("Processing %s/%s: '%s' from [%s]...", index + 1, len(ad_cfgs), ad_cfg.title, ad_file)
+                try:
+                    await self.publish_ad(ad_file, ad_cfg, ad_cfg_orig, published_ads, AdUpdateStrategy.REPLACE)
+                    await self.web_await(self.__check_publishing_result, timeout = 5 * 60)
+
+                    if self.config.publishing.delete_old_ads == "AFTER_PUBLISH" and not self.keep_old_ads:
+                        await self.delete_ad(ad_cfg, published_ads, delete_old_ads_by_title = False)
+                    results[index] = PublishResult(ad_file, ad_cfg.title, "published", ad_cfg_orig.get("id"))
+                except CaptchaEncountered:
+                    raise
+                except Exception as ex:  # noqa: BLE001 one broken ad must not abort the others
+                    LOG.error("Publishing ad '%s' failed: %s", ad_cfg.title, ex)
+                    LOG.debug(ex, exc_info = True)
+                    results[index] = PublishResult(ad_file, ad_cfg.title, "failed", error = str(ex) or type(ex).__name__)
+                    # leave the half-filled form so the next ad starts on a freshly loaded page
+                    try:
+                        await self.web_open("about:blank", reload_if_already_open = True)
+                    except Exception as reset_ex:  # noqa: BLE001
+                        LOG.debug("Failed to reset tab: %s", reset_ex)
 
-            if self.config.publishing.delete_old_ads == "AFTER_PUBLISH" and not self.keep_old_ads:
-                await self.delete_ad(ad_cfg, published_ads, delete_old_ads_by_title = False)
+        async def run_worker() -> None:
+            if worker_count == 1:
+                await publish_worker()
+            else:
+                async with self.web_tab():
+                    await publish_worker()
 
+        if worker_count > 1:
+            LOG.info("Publishing with %s in parallel...", pluralize("worker", worker_count))
+        tasks = [asyncio.create_task(run_worker()) for _ in range(worker_count)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions = True)
+            raise
+
+        report = [result for result in results if result is not None]
+        self.__log_publish_report(report)
+        return report
+
+    def __log_publish_report(self, results:list[PublishResult]) -> None:
         LOG.info("############################################")
-        LOG.info("DONE: (Re-)published %s", pluralize("ad", count))
+        for index, result in enumerate(results, start = 1):
+            if result.status == "published":
+                LOG.info("%s/%s: '%s' published with ID %s", index, len(results), result.title, result.ad_id)
+            elif result.status == "skipped":
+                LOG.info("%s/%s: '%s' skipped (reserved)", index, len(results), result.title)
+            else:
+                LOG.warning("%s/%s: '%s' FAILED: %s", index, len(results), result.title, result.error)
+        LOG.info("DONE: (Re-)published %s", pluralize("ad", sum(result.status == "published" for result in results)))
+        failed = sum(result.status == "failed" for result in results)
+        if failed:
+            LOG.warning("FAILED: %s", pluralize("ad", failed))
         LOG.info("############################################")
 
     async def publish_ad(self, ad_file:str, ad_cfg:Ad, ad_cfg_orig:dict[str, Any], published_ads:list[dict[str, Any]],
@@ -897,7 +1057,7 @@ class KleinanzeigenBot(WebScrapingMixin):
         #############################
         # wait for captcha
         #############################
-        await self.check_and_wait_for_captcha(is_login_page = False)
+        await self.check_and_wait_for_captcha(is_login_page = False, ad_title = ad_cfg.title)
 
         #############################
         # submit
@@ -966,8 +1126,7 @@ class KleinanzeigenBot(WebScrapingMixin):
         """
         count = 0
 
-        published_ads = json.loads(
-            (await self.web_request(f"{self.root_url}/m-meine-anzeigen-verwalten.json?sort=DEFAULT"))["content"])["ads"]
+        published_ads = await OwnAdsInventory(self, self.root_url).fetch_published_ads()
 
         for (ad_file, ad_cfg, ad_cfg_orig) in ad_cfgs:
             ad = next((ad for ad in published_ads if ad["id"] == ad_cfg.id), None)
@@ -1213,52 +1372,65 @@ class KleinanzeigenBot(WebScrapingMixin):
     async def download_ads(self) -> None:
         """
         Determines which download mode was chosen with the arguments, and calls the specified download routine.
-        This downloads either all, only unsaved (new), or specific ads given by ID.
+        This downloads either all, only unsaved (new), unsaved or remotely changed (changed), or specific ads given by ID.
         """
 
         ad_extractor = extract.AdExtractor(self.browser, self.config)
+        try:
+            await self.__download_ads(ad_extractor)
+        finally:
+            ad_extractor.image_downloader.close()
 
+    async def __download_ads(self, ad_extractor:extract.AdExtractor) -> None:
         # use relevant download routine
-        if self.ads_selector in {"all", "new"}:  # explore ads overview for these two modes
+        if self.ads_selector in {"all", "new", "changed"}:  # explore ads overview for these modes
             LOG.info("Scanning your ad overview...")
-            own_ad_urls = await ad_extractor.extract_own_ads_urls()
-            LOG.info("%s found.", pluralize("ad", len(own_ad_urls)))
+            own_ads = await ad_extractor.extract_own_ads()
+            LOG.info("%s found.", pluralize("ad", len(own_ads)))
+            manifest_file = Path(DOWNLOAD_MANIFEST_FILE)
+            manifest = DownloadManifest.load(manifest_file)
 
             if self.ads_selector == "all":  # download all of your adds
                 LOG.info("Starting download of all ads...")
+                selected_ads = own_ads
+            else:
+                # check which ads already saved
+                saved_ad_ids = self.load_ad_ids()
+                selected_ads = []
+                for own_ad in own_ads:
+                    if own_ad.id not in saved_ad_ids:
+                        selected_ads.append(own_ad)
+                    elif self.ads_selector == "changed" and own_ad.id not in manifest.ads:
+                        LOG.info("The ad with id %d has no download record yet, downloading it again.", own_ad.id)
+                        selected_ads.append(own_ad)
+                    elif self.ads_selector == "changed" and manifest.is_changed(own_ad):
+                        LOG.info("The ad with id %d was changed since its last download.", own_ad.id)
+                        selected_ads.append(own_ad)
+                    else:
+                        LOG.info("The ad with id %d has already been saved.", own_ad.id)
+                if self.ads_selector == "new":
+                    LOG.info("Starting download of not yet downloaded ads...")
+                else:
+                    LOG.info("Starting download of new and changed ads...")
 
-                success_count = 0
+            success_count = 0
+            try:
                 # call download function for each ad page
-                for add_url in own_ad_urls:
-                    ad_id = ad_extractor.extract_ad_id_from_ad_url(add_url)
-                    if await ad_extractor.navigate_to_ad_page(add_url):
-                        await ad_extractor.download_ad(ad_id)
+                for own_ad in selected_ads:
+                    if await ad_extractor.navigate_to_ad_page(own_ad.url or own_ad.id):
+                        await ad_extractor.download_ad(own_ad.id)
+                        if own_ad.modification_date is not None:  # ads listed from the DOM carry no remote metadata
+                            manifest.record(own_ad)
                         success_count += 1
-                LOG.info("%d of %d ads were downloaded from your profile.", success_count, len(own_ad_urls))
+            finally:
+                manifest.save(manifest_file)
 
-            elif self.ads_selector == "new":  # download only unsaved ads
-                # check which ads already saved
-                saved_ad_ids = []
-                ads = self.load_ads(ignore_inactive = False, exclude_ads_with_id = False)  # do not skip because of existing IDs
-                for ad in ads:
-                    ad_id = int(ad[2]["id"])
-                    saved_ad_ids.append(ad_id)
-
-                # determine ad IDs from links
-                ad_id_by_url = {url:ad_extractor.extract_ad_id_from_ad_url(url) for url in own_ad_urls}
-
-                LOG.info("Starting download of not yet downloaded ads...")
-                new_count = 0
-                for ad_url, ad_id in ad_id_by_url.items():
-                    # check if ad with ID already saved
-                    if ad_id in saved_ad_ids:
-                        LOG.info("The ad with id %d has already been saved.", ad_id)
-                        continue
-
-                    if await ad_extractor.navigate_to_ad_page(ad_url):
-                        await ad_extractor.download_ad(ad_id)
-                        new_count += 1
-                LOG.info("%s were downloaded from your profile.", pluralize("new ad", new_count))
+            if self.ads_selector == "all":
+                LOG.info("%d of %d ads were downloaded from your profile.", success_count, len(own_ads))
+            elif self.ads_selector == "new":
+                LOG.info("%s were downloaded from your profile.", pluralize("new ad", success_count))
+            else:
+                LOG.info("%s were downloaded from your profile.", pluralize("new or changed ad", success_count))
 
         elif re.compile(r"\d+[,\d+]*").search(self.ads_selector):  # download ad(s) with specific id(s)
             ids = [int(n) for n in self.ads_selector.split(",")]
@@ -1,16 +1,16 @@
 # SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
-import json, mimetypes, os, shutil  # isort: skip
-import urllib.request as urllib_request
+import asyncio, json, mimetypes, os, shutil  # isort: skip
 from datetime import datetime
 from typing import Any, Final
 
 from kleinanzeigen_bot.model.ad_model import ContactPartial
 
+from .inventory import OwnAd, OwnAdsInventory
 from .model.ad_model import AdPartial
 from .model.config_model import Config
-from .utils import dicts, i18n, loggers, misc, reflect
+from .utils import dicts, i18n, loggers, misc, net, reflect
 from .utils.web_scraping_mixin import Browser, By, Element, WebScrapingMixin
 
 __all__ = [
@@ -29,6 +29,7 @@ class AdExtractor(WebScrapingMixin):
         super().__init__()
         self.browser = browser
         self.config = config
+        self.image_downloader = net.FileDownloader(max_concurrency = config.download.image_download_concurrency)
 
     async def download_ad(self, ad_id:int) -> None:
         """
@@ -67,7 +68,7 @@ class AdExtractor(WebScrapingMixin):
         """
 
         n_images:int
-        img_paths = []
+        img_paths:list[str] = []
         try:
             # download all images from box
             image_box = await self.web_find(By.CLASS_NAME, "galleryimage-large")
@@ -75,33 +76,75 @@ class AdExtractor(WebScrapingMixin):
             images = await self.web_find_all(By.CSS_SELECTOR, ".galleryimage-element[data-ix] > img", parent = image_box)
             n_images = len(images)
             LOG.info("Found %s.", i18n.pluralize("image", n_images))
+        except TimeoutError:  # some ads do not require images
+            LOG.warning("No image area found. Continuing without downloading images.")
+            images = []  # images of an earlier download are still cleaned up below
 
-            img_fn_prefix = "ad_" + str(ad_id) + "__img"
-            img_nr = 1
-            dl_counter = 0
-
-            for img_element in images:
-                current_img_url = img_element.attrs["src"]  # URL of the image
-                if current_img_url is None:
-                    continue
-
-                with urllib_request.urlopen(current_img_url) as response:  # noqa: S310 Audit URL open for permitted schemes.
-                    content_type = response.info().get_content_type()
-                    file_ending = mimetypes.guess_extension(content_type)
-                    img_path = f"{directory}/{img_fn_prefix}{img_nr}{file_ending}"
-                    with open(img_path, "wb") as f:
-                        shutil.copyfileobj(response, f)
-                    dl_counter += 1
-                    img_paths.append(img_path.rsplit("/", maxsplit = 1)[-1])
+        img_fn_prefix = "ad_" + str(ad_id) + "__img"
+        # images already present from an earlier download of this ad, by content hash
+        existing_files = await asyncio.to_thread(self.__hash_existing_images, directory, img_fn_prefix)
 
-                img_nr += 1
-            LOG.info("Downloaded %s.", i18n.pluralize("image", dl_counter))
+        # the image number counts all gallery images, also those without URL, like before
+        img_urls = {img_nr: img_element.attrs["src"] for img_nr, img_element in enumerate(images, start = 1) if img_element.attrs["src"]}
+        results = await asyncio.gather(
+            *(self.image_downloader.download(url, f"{directory}/{img_fn_prefix}{img_nr}.download") for img_nr, url in img_urls.items()),
+            return_exceptions = True
+        )
 
-        except TimeoutError:  # some ads do not require images
-            LOG.warning("No image area found. Continuing without downloading images.")
+        dl_counter = 0
+        skipped_counter = 0
+        failed = False
+        for img_nr, result in zip(img_urls, results, strict = True):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                LOG.warning("Failed to download image %s: %s", img_nr, result)
+                failed = True
+                continue
+
+            img_name = existing_files.get(result.sha256)
+            if img_name:  # same content is already on disk, keep that file
+                os.remove(result.path)
+                skipped_counter += 1
+            else:
+                img_name = f"{img_fn_prefix}{img_nr}{mimetypes.guess_extension(result.content_type)}"
+                if img_name in existing_files.values():
+                    # the file name is taken by an image already on disk that may still be used, don't overwrite it
+                    img_name = f"{img_fn_prefix}{img_nr}_{result.sha256[:8]}{mimetypes.guess_extension(result.content_type)}"
+                os.replace(result.path, f"{directory}/{img_name}")
+                existing_files[result.sha256] = img_name
+                dl_counter += 1
+            img_paths.append(img_name)
+
+        if not failed:
+            # images of an earlier version of the ad that it no longer shows
+            for img_name in set(existing_files.values()) - set(img_paths):
+                os.remove(f"{directory}/{img_name}")
+
+        LOG.info("Downloaded %s.", i18n.pluralize("image", dl_counter))
+        if skipped_counter:
+            LOG.info("Kept %s already present.", i18n.pluralize("image", skipped_counter))
 
         return img_paths
 
+    @staticmethod
+    def __delete_all_but_images(directory:str, img_fn_prefix:str) -> None:
+        for entry in os.scandir(directory):
+            if entry.is_dir(follow_symlinks = False):
+                shutil.rmtree(entry.path)
+            elif not entry.name.startswith(img_fn_prefix):
+                os.remove(entry.path)
+
+    @staticmethod
+    def __hash_existing_images(directory:str, img_fn_prefix:str) -> dict[str, str]:
+        if not os.path.isdir(directory):
+            return {}
+        return {
+            net.sha256_of_file(os.path.join(directory, file_name)): file_name
+            for file_name in sorted(os.listdir(directory))
+            if file_name.startswith(img_fn_prefix) and not file_name.endswith((".download", ".part"))
+        }
+
     def extract_ad_id_from_ad_url(self, url:str) -> int:
         """
         Extracts the ID of an ad, given by its reference link.
@@ -122,9 +165,31 @@ class AdExtractor(WebScrapingMixin):
             LOG.warning("Failed to extract ad ID from URL '%s': %s", url, ex)
             return -1
 
+    async def extract_own_ads(self) -> list[OwnAd]:
+        """
+        Lists all own ads with a single pass over the paginated JSON endpoint behind the "Meine Anzeigen" page.
+        Falls back to scraping the ad overview (see extract_own_ads_urls) if the endpoint can't be read.
+
+        :return: the own ads, in the order given by kleinanzeigen.de
+        """
+        # the JSON endpoint is fetched from within the page, so it needs a kleinanzeigen.de origin
+        await self.web_open("https://www.kleinanzeigen.de/m-meine-anzeigen.html")
+        try:
+            return await OwnAdsInventory(self).list_own_ads()
+        except (AssertionError, TimeoutError, KeyError, TypeError, ValueError) as ex:
+            LOG.warning("Reading own ads via JSON failed (%s), falling back to the ad overview page...", ex)
+
+        own_ads = []
+        for url in await self.extract_own_ads_urls():
+            ad_id = self.extract_ad_id_from_ad_url(url)
+            if ad_id != -1:
+                own_ads.append(OwnAd(id = ad_id, url = url, title = "", state = None))
+        return own_ads
+
     async def extract_own_ads_urls(self) -> list[str]:
         """
-        Extracts the references to all own ads.
+        Extracts the references to all own ads by scraping the ad overview pages.
+        Slow for large accounts, extract_own_ads() uses it only as a fallback.
 
         :return: the links to your ad pages
         """
@@ -370,10 +435,14 @@ class AdExtractor(WebScrapingMixin):
         temp_dir = os.path.join(relative_directory, f"ad_{ad_id}")
 
         # Handle existing directories
-        if os.path.exists(final_dir):
-            # If the folder with title already exists, delete it
+        if os.path.exists(final_dir) and os.path.exists(temp_dir):
+            # the folder without title is used or renamed below, delete the one with title
             LOG.info("Deleting current folder of ad %s...", ad_id)
             shutil.rmtree(final_dir)
+        elif os.path.exists(final_dir):
+            # keep the images, those with unchanged content are not written again
+            LOG.info("Deleting current folder of ad %s except for its images...", ad_id)
+            self.__delete_all_but_images(final_dir, f"ad_{ad_id}__img")
 
         if os.path.exists(temp_dir):
             if self.config.download.rename_existing_folders:
@@ -385,7 +454,7 @@ class AdExtractor(WebScrapingMixin):
                 # Use the existing folder without renaming
                 final_dir = temp_dir
                 LOG.info("Using existing folder for ad %s at %s.", ad_id, final_dir)
-        else:
+        elif not os.path.exists(final_dir):
             # Create new directory with title
             os.mkdir(final_dir)
             LOG.info("New directory for ad created at %s.", final_dir)
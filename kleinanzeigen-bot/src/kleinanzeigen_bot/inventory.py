@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
+import json
+from typing import Any, Final, NamedTuple
+
+from .utils import loggers
+from .utils.web_scraping_mixin import WebScrapingMixin
+
+__all__ = [
+    "OwnAd",
+    "OwnAdsInventory",
+]
+
+LOG:Final[loggers.Logger] = loggers.get_logger(__name__)
+
+# upper bound for the pages requested in one run, protects against a paging block that never ends
+MAX_PAGES:Final[int] = 100
+
+
+class OwnAd(NamedTuple):
+    id:int
+    url:str | None
+    title:str
+    state:str | None
+    start_date:str | None = None
+    end_date:str | None = None
+    modification_date:str | None = None
+    price:Any = None
+
+
+class OwnAdsInventory:
+    """
+    Lists the ads of the logged-in account via the JSON endpoint behind the "Meine Anzeigen" page,
+    following its paging until the last page.
+    NOTE: Requires that the session's current page is on the kleinanzeigen.de domain (same-origin fetch).
+    """
+
+    def __init__(self, scraper:WebScrapingMixin, root_url:str = "https://www.kleinanzeigen.de") -> None:
+        self.scraper = scraper
+        self.root_url = root_url
+
+    async def fetch_published_ads(self) -> list[dict[str, Any]]:
+        """
+        :return: the JSON entries of all own ads, each ad once
+        """
+        ads:dict[int, dict[str, Any]] = {}
+        page_num = 1
+        while True:
+            response = await self.scraper.web_request(f"{self.root_url}/m-meine-anzeigen-verwalten.json?sort=DEFAULT&pageNum={page_num}")
+            content = json.loads(response["content"])
+            page_ads = content.get("ads", [])
+            new_ads = 0
+            for ad in page_ads:
+                if int(ad["id"]) not in ads:
+                    ads[int(ad["id"])] = ad
+                    new_ads += 1
+
+            # without a paging block the endpoint returned all ads at once
+            last_page = int((content.get("paging") or {}).get("last") or page_num)
+            if page_num >= last_page or new_ads == 0:
+                break
+            if page_num >= MAX_PAGES:
+                LOG.warning("Stopping after %s pages of own ads, %s more reported.", page_num, last_page - page_num)
+                break
+            page_num += 1
+
+        LOG.debug("Fetched %s own ads from %s page(s).", len(ads), page_num)
+        return list(ads.values())
+
+    async def list_own_ads(self) -> list[OwnAd]:
+        return [self.to_own_ad(ad) for ad in await self.fetch_published_ads()]
+
+    def to_own_ad(self, ad:dict[str, Any]) -> OwnAd:
+        link = ad.get("link")
+        if link and link.startswith("/"):
+            link = self.root_url + link
+        return OwnAd(
+            id = int(ad["id"]),
+            url = link or None,
+            title = ad.get("title", ""),
+            state = ad.get("state"),
+            start_date = ad.get("startDate"),
+            end_date = ad.get("endDate"),
+            modification_date = ad.get("modificationDate"),
+            price = ad.get("price"),
+        )
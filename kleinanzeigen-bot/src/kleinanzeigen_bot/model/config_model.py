@@ -76,6 +76,12 @@ class DownloadConfig(ContextualModel):
         default = False,
         description = "if true, rename existing folders without titles to include titles (default: false)"
     )
+    image_download_concurrency:int = Field(
+        default = 4,
+        ge = 1,
+        le = 16,
+        description = "maximum number of images of an ad downloaded at the same time (default: 4)"
+    )
 
 
 class BrowserConfig(ContextualModel):
@@ -107,6 +113,8 @@ class LoginConfig(ContextualModel):
 class PublishingConfig(ContextualModel):
     delete_old_ads:Literal["BEFORE_PUBLISH", "AFTER_PUBLISH", "NEVER"] | None = "AFTER_PUBLISH"
     delete_old_ads_by_title:bool = Field(default = True, description = "only works if delete_old_ads is set to BEFORE_PUBLISH")
+    workers:int = Field(default = 1, ge = 1, le = 8, description = "number of ads published in parallel, each in its own tab of the logged-in browser")
+    min_submit_interval:float = Field(default = 5.0, ge = 0, description = "minimum seconds between starting two ads, shared by all workers")
 
 
 class CaptchaConfig(ContextualModel):
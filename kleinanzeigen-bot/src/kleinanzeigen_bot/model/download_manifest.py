@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
+
+from __future__ import annotations
+
+import datetime as dt  # noqa: TC003 Move import into a type-checking block
+import json
+from typing import TYPE_CHECKING, Any
+
+from pydantic import Field
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from kleinanzeigen_bot.inventory import OwnAd
+
+from kleinanzeigen_bot.utils import dicts, loggers, misc
+from kleinanzeigen_bot.utils.pydantics import ContextualModel
+
+LOG = loggers.get_logger(__name__)
+
+# Current version of the manifest file format
+CURRENT_MANIFEST_VERSION = 1
+
+
+class DownloadedAd(ContextualModel):
+    """Remote metadata of an ad at the time it was downloaded."""
+    title:str = ""
+    price:Any = None
+    modification_date:str | None = None
+    downloaded_on:dt.datetime | None = None
+
+
+class DownloadManifest(ContextualModel):
+    """Remembers which version of each own ad was downloaded last, so unchanged ads can be skipped."""
+    version:int = CURRENT_MANIFEST_VERSION
+    ads:dict[int, DownloadedAd] = Field(default_factory = dict)
+
+    @classmethod
+    def load(cls, manifest_file:Path) -> DownloadManifest:
+        """Load the download manifest from a file.
+
+        Args:
+            manifest_file: The path to the manifest file.
+
+        Returns:
+            The loaded manifest, an empty one if the file is missing or unreadable.
+        """
+        if not manifest_file.exists() or manifest_file.stat().st_size == 0:
+            return cls()
+
+        try:
+            return cls.model_validate(dicts.load_dict(str(manifest_file)) or {})
+        except (json.JSONDecodeError, ValueError) as e:
+            LOG.warning("Failed to load download manifest: %s", e)
+            return cls()
+
+    def save(self, manifest_file:Path) -> None:
+        """Save the download manifest to a file.
+
+        Args:
+            manifest_file: The path to the manifest file.
+        """
+        try:
+            manifest_file.parent.mkdir(parents = True, exist_ok = True)
+            dicts.save_dict(str(manifest_file), self.model_dump(mode = "json"))
+        except OSError as e:
+            LOG.warning("Failed to save download manifest: %s", e)
+
+    def is_changed(self, own_ad:OwnAd) -> bool:
+        """Whether the ad's remote metadata differs from the last download, True if it was never recorded or has no remote metadata."""
+        downloaded = self.ads.get(own_ad.id)
+        if downloaded is None or own_ad.modification_date is None:
+            return True
+        return (downloaded.modification_date, downloaded.price, downloaded.title) != \
+            (own_ad.modification_date, own_ad.price, own_ad.title)
+
+    def record(self, own_ad:OwnAd) -> None:
+        """Remember the ad's remote metadata after it was downloaded."""
+        self.ads[own_ad.id] = DownloadedAd(
+            title = own_ad.title,
+            price = own_ad.price,
+            modification_date = own_ad.modification_date,
+            downloaded_on = misc.now(),
+        )
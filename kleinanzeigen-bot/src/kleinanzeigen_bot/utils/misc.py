@@ -122,6 +122,25 @@ async def ainput(prompt:str) -> str:
     return await asyncio.to_thread(input, f"{prompt} ")
 
 
+class RateLimiter:
+    """
+    Spaces out actions of concurrent asyncio tasks so that two of them never start
+    less than `min_interval` seconds apart.
+    """
+
+    def __init__(self, min_interval:float) -> None:
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            delay = self._next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_slot = time.monotonic() + self.min_interval
+
+
 def parse_decimal(number:float | int | str) -> decimal.Decimal:
     """
     >>> parse_decimal(5)
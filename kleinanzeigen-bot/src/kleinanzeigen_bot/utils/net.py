@@ -1,7 +1,17 @@
 # SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
-import socket
+import asyncio, hashlib, http.client, os, socket, ssl, threading, urllib.parse  # isort: skip
+from typing import Final, NamedTuple
+
+from . import loggers
+
+LOG:Final[loggers.Logger] = loggers.get_logger(__name__)
+
+# status codes worth another attempt, everything else >= 400 fails right away
+RETRYABLE_STATUS_CODES:Final[frozenset[int]] = frozenset({408, 429, 500, 502, 503, 504})
+REDIRECT_STATUS_CODES:Final[frozenset[int]] = frozenset({301, 302, 303, 307, 308})
+MAX_REDIRECTS:Final[int] = 5
 
 
 def is_port_open(host:str, port:int) -> bool:
@@ -16,3 +26,159 @@ def is_port_open(host:str, port:int) -> bool:
     finally:
         if s:
             s.close()
+
+
+class DownloadError(OSError):
+    """Raised when a file could not be downloaded."""
+
+    def __init__(self, url:str, reason:str, *, retryable:bool = False) -> None:
+        super().__init__(f"{reason} [{url}]")
+        self.retryable = retryable
+
+
+class Download(NamedTuple):
+    path:str
+    content_type:str
+    sha256:str
+    size:int
+
+
+class FileDownloader:
+    """
+    Downloads files over a pool of keep-alive HTTP(S) connections.
+
+    The blocking http.client calls run in worker threads, so downloads neither stall the event loop
+    (and with it the browser's CDP traffic) nor each other. At most `max_concurrency` downloads run at once,
+    failed attempts are retried with exponential backoff and responses are streamed to disk while being hashed.
+    """
+
+    chunk_size:int = 64 * 1024
+
+    def __init__(self, max_concurrency:int = 4, retries:int = 3, backoff:float = 0.5, timeout:float = 30) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._ssl_context = ssl.create_default_context()
+        self._idle:dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._idle_lock = threading.Lock()
+
+    async def download(self, url:str, path:str) -> Download:
+        """
+        Downloads `url` to `path`, the file only appears once it is complete.
+
+        :raises DownloadError: if the last attempt failed
+        """
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                try:
+                    return await asyncio.to_thread(self._download, url, path)
+                except (OSError, http.client.HTTPException) as ex:
+                    retryable = ex.retryable if isinstance(ex, DownloadError) else True
+                    if not retryable or attempt >= self.retries:
+                        if isinstance(ex, DownloadError):
+                            raise
+                        raise DownloadError(url, str(ex) or type(ex).__name__) from ex
+                    delay = self.backoff * 2 ** attempt
+                    attempt += 1
+                    LOG.debug("Download of [%s] failed (%s), retrying in %.1f s...", url, ex, delay)
+                    await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        with self._idle_lock:
+            connections = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+    def _acquire(self, scheme:str, host:str) -> http.client.HTTPConnection:
+        with self._idle_lock:
+            idle = self._idle.get((scheme, host))
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, timeout = self.timeout, context = self._ssl_context)
+        return http.client.HTTPConnection(host, timeout = self.timeout)
+
+    def _release(self, scheme:str, host:str, conn:http.client.HTTPConnection, response:http.client.HTTPResponse) -> None:
+        """Keeps the connection for the next request to the same host, unless the server is closing it."""
+        if response.will_close:
+            conn.close()
+            return
+        with self._idle_lock:
+            self._idle.setdefault((scheme, host), []).append(conn)
+
+    def _download(self, url:str, path:str) -> Download:
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            if parsed.scheme not in {"http", "https"}:
+                raise DownloadError(url, f"Unsupported URL scheme '{parsed.scheme}'")
+
+            conn = self._acquire(parsed.scheme, parsed.netloc)
+            try:
+                response = self._request(conn, parsed)
+                download = self._receive(url, response, path)
+            except BaseException:
+                conn.close()
+                raise
+            self._release(parsed.scheme, parsed.netloc, conn, response)
+            if download is not None:
+                return download
+            url = urllib.parse.urljoin(url, response.getheader("Location", ""))
+        raise DownloadError(url, "Too many redirects")
+
+    @staticmethod
+    def _request(conn:http.client.HTTPConnection, parsed:urllib.parse.SplitResult) -> http.client.HTTPResponse:
+        target = parsed.path or "/"
+        if parsed.query:
+            target += "?" + parsed.query
+        conn.request("GET", target, headers = {"Accept": "image/*,*/*;q=0.8"})
+        return conn.getresponse()
+
+    def _receive(self, url:str, response:http.client.HTTPResponse, path:str) -> Download | None:
+        """
+        :return: the written file, None if the response redirects to another location
+        :raises DownloadError: if the server answered with an error status
+        """
+        if response.status in REDIRECT_STATUS_CODES and response.getheader("Location"):
+            response.read()
+            return None
+        if response.status >= 400:  # noqa: PLR2004 Magic value used in comparison
+            response.read()
+            raise DownloadError(url, f"HTTP {response.status} {response.reason}",
+                retryable = response.status in RETRYABLE_STATUS_CODES)
+        return self._write(response, path)
+
+    def _write(self, response:http.client.HTTPResponse, path:str) -> Download:
+        part_path = f"{path}.part"
+        try:
+            sha256, size = self._stream_to_file(response, part_path)
+            os.replace(part_path, path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        content_type = (response.getheader("Content-Type") or "application/octet-stream").split(";")[0].strip()
+        return Download(path, content_type, sha256, size)
+
+    def _stream_to_file(self, response:http.client.HTTPResponse, path:str) -> tuple[str, int]:
+        """
+        :return: the SHA-256 hex digest and the size of the response body written to `path`
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "wb") as f:
+            while chunk := response.read(self.chunk_size):
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        return digest.hexdigest(), size
+
+
+def sha256_of_file(path:str, chunk_size:int = 64 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -2,7 +2,9 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
 import asyncio, enum, inspect, json, os, platform, secrets, shutil, subprocess, urllib.request  # isort: skip # noqa: S404
-from collections.abc import Callable, Coroutine, Iterable
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from gettext import gettext as _
 from typing import Any, Final, cast
 
@@ -42,6 +44,9 @@ LOG:Final[loggers.Logger] = loggers.get_logger(__name__)
 # see https://api.jquery.com/category/selectors/
 METACHAR_ESCAPER:Final[dict[int, str]] = str.maketrans({ch: f"\\{ch}" for ch in '!"#$%&\'()*+,./:;<=>?@[\\]^`{|}~'})
 
+# tab of the current asyncio task while inside WebScrapingMixin.web_tab(), None outside
+_TASK_PAGE:ContextVar[Page | None] = ContextVar("task_page", default = None)
+
 
 def _is_admin() -> bool:
     """Check if the current process is running with admin/root privileges."""
@@ -87,7 +92,44 @@ class WebScrapingMixin:
     def __init__(self) -> None:
         self.browser_config:Final[BrowserConfig] = BrowserConfig()
         self.browser:Browser = None  # pyright: ignore[reportAttributeAccessIssue]
-        self.page:Page = None  # pyright: ignore[reportAttributeAccessIssue]
+        self._page:Page = None  # pyright: ignore[reportAttributeAccessIssue]
+
+    @property
+    def page(self) -> Page:
+        """
+        The tab all web_* methods act on.
+        Inside web_tab() this is the tab opened for the calling asyncio task, so concurrent tasks don't interfere.
+        """
+        task_page = _TASK_PAGE.get()
+        return task_page if task_page is not None else self._page
+
+    @page.setter
+    def page(self, page:Page) -> None:
+        if _TASK_PAGE.get() is not None:
+            _TASK_PAGE.set(page)
+        else:
+            self._page = page
+
+    @page.deleter
+    def page(self) -> None:
+        self.page = None  # pyright: ignore[reportAttributeAccessIssue]
+
+    @asynccontextmanager
+    async def web_tab(self) -> AsyncIterator[Page]:
+        """
+        Opens a new tab in the current browser session (sharing its cookies/login)
+        and makes it the page of the calling asyncio task until the block exits.
+        """
+        page = await self.browser.get("about:blank", new_tab = True)
+        token = _TASK_PAGE.set(page)
+        try:
+            yield page
+        finally:
+            _TASK_PAGE.reset(token)
+            try:
+                await page.close()
+            except Exception as ex:  # noqa: BLE001 the tab may already be gone with the browser
+                LOG.debug("Failed to close tab: %s", ex)
 
     async def create_browser_session(self) -> None:
         LOG.info("Creating Browser session...")
@@ -672,7 +714,11 @@ class WebScrapingMixin:
         if not reload_if_already_open and self.page and url == self.page.url:
             LOG.debug("  => skipping, [%s] is already open", url)
             return
-        self.page = await self.browser.get(url = url, new_tab = False, new_window = False)
+        task_page = _TASK_PAGE.get()
+        if task_page is not None:
+            self.page = await task_page.get(url = url)
+        else:
+            self.page = await self.browser.get(url = url, new_tab = False, new_window = False)
         await self.web_await(lambda: self.web_execute("document.readyState == 'complete'"), timeout = timeout,
                 timeout_error_message = f"Page did not finish loading within {timeout} seconds.")
 
@@ -7,7 +7,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from kleinanzeigen_bot import KleinanzeigenBot
+from kleinanzeigen_bot import KleinanzeigenBot, PublishResult
 from kleinanzeigen_bot.extract import AdExtractor
 from kleinanzeigen_bot.model.ad_model import Ad
 from kleinanzeigen_bot.model.config_model import Config
@@ -226,8 +226,8 @@ class SmokeKleinanzeigenBot(KleinanzeigenBot):
     async def login(self) -> None:
         return None
 
-    async def publish_ads(self, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]) -> None:
-        return None
+    async def publish_ads(self, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]) -> list[PublishResult]:
+        return []
 
     def load_ads(self, *, ignore_inactive:bool = True, exclude_ads_with_id:bool = True) -> list[tuple[str, Ad, dict[str, Any]]]:
         # Use cast to satisfy type checker for dummy Ad value
@@ -1,7 +1,7 @@
 # SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
-import json, os  # isort: skip
+import asyncio, hashlib, json, os  # isort: skip
 from typing import Any, TypedDict
 from unittest.mock import AsyncMock, MagicMock, call, patch
 
@@ -10,6 +10,7 @@ import pytest
 from kleinanzeigen_bot.extract import AdExtractor
 from kleinanzeigen_bot.model.ad_model import AdPartial, ContactPartial
 from kleinanzeigen_bot.model.config_model import Config, DownloadConfig
+from kleinanzeigen_bot.utils import net
 from kleinanzeigen_bot.utils.web_scraping_mixin import Browser, By, Element
 
 
@@ -400,6 +401,29 @@ class TestAdExtractorNavigation:
                 call(By.CLASS_NAME, "cardbox", parent = ad_list_container_mock),
             ], any_order = False)
 
+    @pytest.mark.asyncio
+    async def test_extract_own_ads_uses_json_endpoint(self, test_extractor:AdExtractor) -> None:
+        """Test that own ads are listed via the JSON endpoint without scraping the overview."""
+        response = {"statusCode": 200, "content": json.dumps({"ads": [{"id": 12345, "title": "Test Title", "state": "active"}]})}
+        with patch.object(test_extractor, "web_open", new_callable = AsyncMock), \
+                patch.object(test_extractor, "web_request", new_callable = AsyncMock, return_value = response), \
+                patch.object(test_extractor, "extract_own_ads_urls", new_callable = AsyncMock) as mock_scrape:
+            own_ads = await test_extractor.extract_own_ads()
+
+        assert [(ad.id, ad.title, ad.state) for ad in own_ads] == [(12345, "Test Title", "active")]
+        mock_scrape.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_extract_own_ads_falls_back_to_overview_page(self, test_extractor:AdExtractor) -> None:
+        """Test that the ad overview is scraped if the JSON endpoint can't be read."""
+        with patch.object(test_extractor, "web_open", new_callable = AsyncMock), \
+                patch.object(test_extractor, "web_request", new_callable = AsyncMock, side_effect = TimeoutError("timeout")), \
+                patch.object(test_extractor, "extract_own_ads_urls", new_callable = AsyncMock,
+                    return_value = ["/s-anzeige/test/12345", "/s-anzeige/invalid/abc"]):
+            own_ads = await test_extractor.extract_own_ads()
+
+        assert [(ad.id, ad.url) for ad in own_ads] == [(12345, "/s-anzeige/test/12345")]
+
 
 class TestAdExtractorContent:
     """Tests for content extraction functionality."""
@@ -961,3 +985,92 @@ class TestAdExtractorDownload:
         with patch.object(extractor, "web_find", new_callable = AsyncMock, side_effect = TimeoutError):
             image_paths = await extractor._download_images_from_ad_page("/some/dir", 12345)
             assert len(image_paths) == 0
+
+
+class TestAdExtractorImages:
+    """Tests for downloading the images of an ad."""
+    # pylint: disable=protected-access
+
+    @staticmethod
+    def _image(src:str | None) -> MagicMock:
+        element = MagicMock()
+        element.attrs = {"src": src}
+        return element
+
+    @pytest.mark.asyncio
+    async def test_download_images_keeps_unchanged_files(self, test_extractor:AdExtractor, tmp_path:Any) -> None:
+        """Test that images are fetched concurrently and files with the same content are not rewritten."""
+        contents = {"https://img/1": b"first", "https://img/2": b"second", "https://img/3": b"first"}
+        (tmp_path / "ad_12345__img1.jpg").write_bytes(b"first")
+        unchanged_mtime = (tmp_path / "ad_12345__img1.jpg").stat().st_mtime_ns
+
+        async def fake_download(url:str, path:str) -> net.Download:
+            with open(path, "wb") as f:
+                f.write(contents[url])
+            return net.Download(path, "image/jpeg", hashlib.sha256(contents[url]).hexdigest(), len(contents[url]))
+
+        images = [self._image("https://img/1"), self._image(None), self._image("https://img/2"), self._image("https://img/3")]
+        with patch.object(test_extractor, "web_find", new_callable = AsyncMock), \
+                patch.object(test_extractor, "web_find_all", new_callable = AsyncMock, return_value = images), \
+                patch.object(test_extractor.image_downloader, "download", side_effect = fake_download) as mock_download:
+            img_paths = await test_extractor._download_images_from_ad_page(str(tmp_path), 12345)
+
+        assert mock_download.call_count == 3
+        assert img_paths == ["ad_12345__img1.jpg", "ad_12345__img3.jpg", "ad_12345__img1.jpg"]
+        assert (tmp_path / "ad_12345__img1.jpg").stat().st_mtime_ns == unchanged_mtime
+        assert (tmp_path / "ad_12345__img3.jpg").read_bytes() == b"second"
+        assert sorted(await asyncio.to_thread(os.listdir, tmp_path)) == ["ad_12345__img1.jpg", "ad_12345__img3.jpg"]
+
+    @pytest.mark.asyncio
+    async def test_download_images_skips_failed_downloads(self, test_extractor:AdExtractor, tmp_path:Any) -> None:
+        """Test that a failed image doesn't fail the whole ad."""
+        async def fake_download(url:str, path:str) -> net.Download:
+            if url.endswith("2"):
+                raise net.DownloadError(url, "HTTP 404 Not Found")
+            with open(path, "wb") as f:
+                f.write(b"image")
+            return net.Download(path, "image/jpeg", hashlib.sha256(b"image").hexdigest(), 5)
+
+        with patch.object(test_extractor, "web_find", new_callable = AsyncMock), \
+                patch.object(test_extractor, "web_find_all", new_callable = AsyncMock,
+                    return_value = [self._image("https://img/1"), self._image("https://img/2")]), \
+                patch.object(test_extractor.image_downloader, "download", side_effect = fake_download):
+            img_paths = await test_extractor._download_images_from_ad_page(str(tmp_path), 12345)
+
+        assert img_paths == ["ad_12345__img1.jpg"]
+
+    @pytest.mark.asyncio
+    async def test_download_images_removes_images_no_longer_shown(self, test_extractor:AdExtractor, tmp_path:Any) -> None:
+        """Test that images of an earlier version of the ad are deleted once the gallery was downloaded."""
+        (tmp_path / "ad_12345__img1.jpg").write_bytes(b"old")
+        (tmp_path / "ad_12345__img2.jpg").write_bytes(b"first")
+
+        async def fake_download(url:str, path:str) -> net.Download:
+            with open(path, "wb") as f:
+                f.write(b"first")
+            return net.Download(path, "image/jpeg", hashlib.sha256(b"first").hexdigest(), 5)
+
+        with patch.object(test_extractor, "web_find", new_callable = AsyncMock), \
+                patch.object(test_extractor, "web_find_all", new_callable = AsyncMock, return_value = [self._image("https://img/1")]), \
+                patch.object(test_extractor.image_downloader, "download", side_effect = fake_download):
+            img_paths = await test_extractor._download_images_from_ad_page(str(tmp_path), 12345)
+
+        assert img_paths == ["ad_12345__img2.jpg"]
+        assert await asyncio.to_thread(os.listdir, tmp_path) == ["ad_12345__img2.jpg"]
+
+    @pytest.mark.asyncio
+    async def test_existing_ad_folder_keeps_images(self, test_extractor:AdExtractor, tmp_path:Any) -> None:
+        """Test that downloading an ad again keeps its images on disk, so unchanged ones can be reused."""
+        ad_dir = tmp_path / "ad_12345_Test Title"
+        (ad_dir / "old").mkdir(parents = True)
+        (ad_dir / "ad_12345.yaml").write_text("title: old")
+        (ad_dir / "ad_12345__img1.jpg").write_bytes(b"first")
+        test_extractor.page = MagicMock(url = "https://www.kleinanzeigen.de/s-anzeige/test/12345")
+
+        with patch.object(test_extractor, "_extract_title_from_ad_page", new_callable = AsyncMock, return_value = "Test Title"), \
+                patch.object(test_extractor, "_extract_ad_page_info", new_callable = AsyncMock) as mock_extract_info:
+            _, final_dir = await test_extractor._extract_ad_page_info_with_directory_handling(str(tmp_path), 12345)
+
+        assert final_dir == str(ad_dir)
+        mock_extract_info.assert_awaited_once_with(str(ad_dir), 12345)
+        assert await asyncio.to_thread(os.listdir, ad_dir) == ["ad_12345__img1.jpg"]
@@ -1,7 +1,7 @@
 # SPDX-FileCopyrightText: © Jens Bergmann and contributors
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
-import copy, io, logging, os, tempfile  # isort: skip
+import asyncio, copy, io, json, logging, os, tempfile  # isort: skip
 from collections.abc import Generator
 from contextlib import redirect_stdout
 from datetime import timedelta
@@ -12,10 +12,12 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from pydantic import ValidationError
 
-from kleinanzeigen_bot import LOG, KleinanzeigenBot, misc
+from kleinanzeigen_bot import DOWNLOAD_MANIFEST_FILE, LOG, KleinanzeigenBot, misc
 from kleinanzeigen_bot._version import __version__
+from kleinanzeigen_bot.inventory import OwnAd
 from kleinanzeigen_bot.model.ad_model import Ad
 from kleinanzeigen_bot.model.config_model import AdDefaults, Config, PublishingConfig
+from kleinanzeigen_bot.model.download_manifest import DownloadManifest
 from kleinanzeigen_bot.utils import dicts, loggers
 from kleinanzeigen_bot.utils.web_scraping_mixin import By, Element
 
@@ -419,6 +421,39 @@ class TestKleinanzeigenBotAuthentication:
             assert mock_find.call_count == 2
             assert mock_ainput.call_count == 0
 
+    @pytest.mark.asyncio
+    async def test_check_and_wait_for_captcha_prompts_one_worker_at_a_time(
+        self, test_bot:KleinanzeigenBot, caplog:pytest.LogCaptureFixture
+    ) -> None:
+        """Verify that parallel workers hitting a captcha are prompted one after another."""
+        test_bot.config.captcha.auto_restart = False
+        prompts:list[str] = []
+        active = 0
+
+        async def fake_ainput(prompt:str) -> str:
+            nonlocal active
+            active += 1
+            assert active == 1
+            prompts.append(prompt)
+            await asyncio.sleep(0)
+            active -= 1
+            return ""
+
+        with patch.object(test_bot, "web_find", new_callable = AsyncMock), \
+                patch.object(test_bot, "web_scroll_page_down", new_callable = AsyncMock), \
+                patch.object(test_bot, "page", AsyncMock()) as mock_page, \
+                patch("kleinanzeigen_bot.ainput", side_effect = fake_ainput), \
+                caplog.at_level(logging.WARNING):
+            await asyncio.gather(
+                test_bot.check_and_wait_for_captcha(is_login_page = False, ad_title = "First Ad"),
+                test_bot.check_and_wait_for_captcha(is_login_page = False, ad_title = "Second Ad"),
+            )
+
+        assert len(prompts) == 2
+        assert mock_page.bring_to_front.await_count == 2
+        assert "'First Ad'" in caplog.text
+        assert "'Second Ad'" in caplog.text
+
     @pytest.mark.asyncio
     async def test_fill_login_data_and_send(self, test_bot:KleinanzeigenBot) -> None:
         """Verify that login form filling works correctly."""
@@ -720,6 +755,38 @@ class TestKleinanzeigenBotAdManagement:
             await test_bot.run(["script.py", "download", "--ads=123,456"])
             assert test_bot.ads_selector == "123,456"
 
+    @pytest.mark.asyncio
+    async def test_download_ads_changed_only_downloads_new_and_changed_ads(
+        self, test_bot:KleinanzeigenBot, tmp_path:Path, monkeypatch:pytest.MonkeyPatch
+    ) -> None:
+        """Test that the changed selector skips saved ads whose remote metadata matches the manifest."""
+        monkeypatch.chdir(tmp_path)
+        unchanged = OwnAd(1, "/s-anzeige/a/1", "Unchanged Ad", "active", modification_date = "2025-01-01", price = 10)
+        changed = OwnAd(2, "/s-anzeige/b/2", "Changed Ad", "active", modification_date = "2025-02-02", price = 20)
+        unrecorded = OwnAd(3, "/s-anzeige/c/3", "Unrecorded Ad", "active", modification_date = "2025-03-03")
+        new = OwnAd(4, "/s-anzeige/d/4", "New Ad", "active")
+
+        manifest = DownloadManifest()
+        manifest.record(unchanged)
+        manifest.record(changed._replace(price = 25))
+        manifest.save(Path(DOWNLOAD_MANIFEST_FILE))
+
+        test_bot.ads_selector = "changed"
+        with patch.object(test_bot, "load_ad_ids", return_value = {1, 2, 3}), \
+                patch("kleinanzeigen_bot.extract.AdExtractor.extract_own_ads", new_callable = AsyncMock,
+                    return_value = [unchanged, changed, unrecorded, new]), \
+                patch("kleinanzeigen_bot.extract.AdExtractor.navigate_to_ad_page", new_callable = AsyncMock, return_value = True), \
+                patch("kleinanzeigen_bot.extract.AdExtractor.download_ad", new_callable = AsyncMock) as mock_download:
+            await test_bot.download_ads()
+
+        assert [call.args[0] for call in mock_download.await_args_list] == [2, 3, 4]
+        saved = DownloadManifest.load(Path(DOWNLOAD_MANIFEST_FILE))
+        # the new ad carries no remote metadata, as if listed from the DOM, and is not recorded
+        assert set(saved.ads) == {1, 2, 3}
+        assert not saved.is_changed(changed)
+        # a recorded ad listed from the DOM is not known to be unchanged
+        assert saved.is_changed(unchanged._replace(title = "", modification_date = None, price = None))
+
     @pytest.mark.asyncio
     async def test_run_publish_invalid_selector(self, test_bot:KleinanzeigenBot, mock_config_setup:None) -> None:  # pylint: disable=unused-argument
         """Test running publish with invalid selector."""
@@ -754,6 +821,19 @@ categories:
         assert "custom_cat" in test_bot.categories
         assert test_bot.categories["custom_cat"] == "custom_id"
 
+    def test_load_ad_ids_without_validation(self, test_bot:KleinanzeigenBot, tmp_path:Any, minimal_ad_config:dict[str, Any]) -> None:
+        """Test that the ID index reads IDs from YAML and JSON ad files without validating them."""
+        ad_dir = Path(tmp_path) / "ads"
+        ad_dir.mkdir()
+        dicts.save_dict(ad_dir / "ad_1.yaml", minimal_ad_config | {"id": 111, "title": ""})  # invalid, but has an ID
+        dicts.save_dict(ad_dir / "ad_2.json", minimal_ad_config | {"id": 222})
+        dicts.save_dict(ad_dir / "ad_3.yaml", minimal_ad_config | {"contact": {"name": "id: 333"}})
+        (ad_dir / "ad_4.yaml").write_text('title: Quoted ID\nid: "444"  # published\n', encoding = "utf-8")
+
+        test_bot.config_file_path = str(Path(tmp_path) / "config.yaml")
+        test_bot.config.ad_files = ["ads/*.{yaml,json}"]
+        assert test_bot.load_ad_ids() == {111, 222, 444}
+
     def test_load_ads_with_missing_title(self, test_bot:KleinanzeigenBot, tmp_path:Any, minimal_ad_config:dict[str, Any]) -> None:
         """Test loading ads with missing title."""
         temp_path = Path(tmp_path)
@@ -911,6 +991,39 @@ class TestKleinanzeigenBotAdDeletion:
             result = await test_bot.delete_ad(ad_cfg, published_ads, delete_old_ads_by_title = False)
             assert result is True
 
+    @pytest.mark.asyncio
+    async def test_delete_ads_batches_ids_with_single_csrf_fetch(self, test_bot:KleinanzeigenBot, minimal_ad_config:dict[str, Any]) -> None:
+        """Test that deleting many ads fetches the CSRF token once and sends the IDs in batches."""
+        test_bot.config.publishing.delete_old_ads_by_title = True
+        ad_cfgs:list[tuple[str, Ad, dict[str, Any]]] = [
+            ("ad_1.yaml", Ad.model_validate(minimal_ad_config | {"title": "Duplicate Title", "id": 1}), {}),
+            ("ad_2.yaml", Ad.model_validate(minimal_ad_config | {"title": "Unpublished Title"}), {}),
+        ] + [
+            (f"ad_{i}.yaml", Ad.model_validate(minimal_ad_config | {"title": f"Bulk Title {i}", "id": i}), {})
+            for i in range(100, 130)
+        ]
+        published_ads = [{"title": "Duplicate Title", "id": "1"}, {"title": "Duplicate Title", "id": "2"}] + \
+            [{"title": f"Bulk Title {i}", "id": str(i)} for i in range(100, 130)]
+
+        async def fake_web_request(url:str, **_:Any) -> dict[str, Any]:
+            if "m-meine-anzeigen-verwalten.json" in url:
+                return {"statusCode": 200, "content": json.dumps({"ads": published_ads})}
+            return {"statusCode": 200, "content": "{}"}
+
+        with patch.object(test_bot, "web_request", side_effect = fake_web_request) as mock_request, \
+                patch.object(test_bot, "web_open", new_callable = AsyncMock) as mock_open, \
+                patch.object(test_bot, "web_find", new_callable = AsyncMock) as mock_find, \
+                patch.object(test_bot, "web_sleep", new_callable = AsyncMock):
+            mock_find.return_value.attrs = {"content": "some-token"}
+            await test_bot.delete_ads(ad_cfgs)
+
+        mock_open.assert_awaited_once()
+        delete_urls = [call.kwargs["url"] for call in mock_request.call_args_list if "m-anzeigen-loeschen.json" in call.kwargs.get("url", "")]
+        deleted_ids = [ad_id for url in delete_urls for ad_id in url.split("ids=")[1].split(",")]
+        assert len(delete_urls) == 2
+        assert deleted_ids == ["1", "2"] + [str(i) for i in range(100, 130)]
+        assert all(ad_cfg.id is None for (_, ad_cfg, _) in ad_cfgs)
+
 
 class TestKleinanzeigenBotAdRepublication:
     """Tests for ad republication functionality."""
@@ -984,6 +1097,7 @@ class TestKleinanzeigenBotShippingOptions:
         test_bot.page = MagicMock()
         test_bot.page.url = "https://www.kleinanzeigen.de/p-anzeige-aufgeben-bestaetigung.html?adId=12345"
         test_bot.page.evaluate = AsyncMock()
+        test_bot.page.bring_to_front = AsyncMock()
 
         # Create ad config with specific shipping options
         ad_cfg = Ad.model_validate(base_ad_config | {
@@ -1068,6 +1182,71 @@ class TestKleinanzeigenBotShippingOptions:
             assert ad_file.exists()
 
 
+class TestKleinanzeigenBotParallelPublishing:
+    """Tests for publishing several ads in parallel tabs."""
+
+    @pytest.fixture
+    def ad_cfgs(self, minimal_ad_config:dict[str, Any]) -> list[tuple[str, Ad, dict[str, Any]]]:
+        return [
+            (f"ad_{i}.yaml", Ad.model_validate(minimal_ad_config | {"title": f"Test Ad Nr. {i}", "id": i}), {"id": i})
+            for i in range(1, 5)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_publish_ads_isolates_failures_and_keeps_order(
+        self, test_bot:KleinanzeigenBot, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]
+    ) -> None:
+        test_bot.config.publishing = PublishingConfig(workers = 3, min_submit_interval = 0, delete_old_ads = "NEVER")
+        published_ads = {"ads": [{"id": 4, "state": "paused"}]}
+        open_tabs:list[int] = []
+
+        async def fake_publish_ad(ad_file:str, ad_cfg:Ad, *_:Any, **__:Any) -> None:
+            if ad_cfg.title == "Test Ad Nr. 2":
+                raise TimeoutError("form element not found")
+
+        class FakeTab:
+            async def __aenter__(self) -> None:
+                open_tabs.append(1)
+
+            async def __aexit__(self, *_:object) -> None:
+                open_tabs.pop()
+
+        with patch.object(test_bot, "web_request", new_callable = AsyncMock,
+                    return_value = {"content": json.dumps(published_ads)}), \
+                patch.object(test_bot, "publish_ad", side_effect = fake_publish_ad), \
+                patch.object(test_bot, "web_await", new_callable = AsyncMock), \
+                patch.object(test_bot, "web_open", new_callable = AsyncMock), \
+                patch.object(test_bot, "web_tab", side_effect = FakeTab) as mock_tab:
+            results = await test_bot.publish_ads(ad_cfgs)
+
+        assert mock_tab.call_count == 3
+        assert not open_tabs
+        assert [(r.title, r.status) for r in results] == [
+            ("Test Ad Nr. 1", "published"),
+            ("Test Ad Nr. 2", "failed"),
+            ("Test Ad Nr. 3", "published"),
+            ("Test Ad Nr. 4", "skipped"),
+        ]
+        assert results[0].ad_id == 1
+        assert results[1].error == "form element not found"
+
+    @pytest.mark.asyncio
+    async def test_publish_ads_single_worker_uses_current_tab(
+        self, test_bot:KleinanzeigenBot, ad_cfgs:list[tuple[str, Ad, dict[str, Any]]]
+    ) -> None:
+        test_bot.config.publishing = PublishingConfig(workers = 1, min_submit_interval = 0, delete_old_ads = "NEVER")
+
+        with patch.object(test_bot, "web_request", new_callable = AsyncMock, return_value = {"content": '{"ads": []}'}), \
+                patch.object(test_bot, "publish_ad", new_callable = AsyncMock) as mock_publish, \
+                patch.object(test_bot, "web_await", new_callable = AsyncMock), \
+                patch.object(test_bot, "web_tab") as mock_tab:
+            results = await test_bot.publish_ads(ad_cfgs)
+
+        mock_tab.assert_not_called()
+        assert [call.args[0] for call in mock_publish.await_args_list] == [ad_file for ad_file, *_ in ad_cfgs]
+        assert all(r.status == "published" for r in results)
+
+
 class TestKleinanzeigenBotUrlConstruction:
     """Tests for URL construction functionality."""
 
@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: © Sebastian Thomschke and contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from kleinanzeigen_bot.inventory import OwnAd, OwnAdsInventory
+
+
+def _page(ads:list[dict[str, Any]], page_num:int | None = None, last:int | None = None) -> dict[str, Any]:
+    content:dict[str, Any] = {"ads": ads}
+    if page_num is not None:
+        content["paging"] = {"pageNum": page_num, "last": last}
+    return {"statusCode": 200, "content": json.dumps(content)}
+
+
+class TestOwnAdsInventory:
+    """Tests for listing own ads via the JSON endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_published_ads_follows_paging(self) -> None:
+        scraper = MagicMock()
+        scraper.web_request = AsyncMock(side_effect = [
+            _page([{"id": 1}, {"id": 2}], 1, 2),
+            _page([{"id": 2}, {"id": "3"}], 2, 2),
+        ])
+
+        ads = await OwnAdsInventory(scraper).fetch_published_ads()
+
+        assert [int(ad["id"]) for ad in ads] == [1, 2, 3]
+        urls = [call.args[0] for call in scraper.web_request.await_args_list]
+        assert urls[0].endswith("m-meine-anzeigen-verwalten.json?sort=DEFAULT&pageNum=1")
+        assert urls[1].endswith("pageNum=2")
+
+    @pytest.mark.asyncio
+    async def test_fetch_published_ads_without_paging_is_single_request(self) -> None:
+        scraper = MagicMock()
+        scraper.web_request = AsyncMock(return_value = _page([{"id": 1}]))
+
+        ads = await OwnAdsInventory(scraper).fetch_published_ads()
+
+        assert len(ads) == 1
+        scraper.web_request.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fetch_published_ads_stops_on_page_without_new_ads(self) -> None:
+        scraper = MagicMock()
+        scraper.web_request = AsyncMock(return_value = _page([{"id": 1}], 1, 50))
+
+        ads = await OwnAdsInventory(scraper).fetch_published_ads()
+
+        assert len(ads) == 1
+        assert scraper.web_request.await_count == 2
+
+    def test_to_own_ad(self) -> None:
+        inventory = OwnAdsInventory(MagicMock())
+        own_ad = inventory.to_own_ad({
+            "id": "12345", "title": "Test Title", "state": "active", "link": "/s-anzeige/test-title/12345-1-2",
+            "startDate": "01.01.2025", "endDate": "01.03.2025"
+        })
+        assert own_ad == OwnAd(12345, "https://www.kleinanzeigen.de/s-anzeige/test-title/12345-1-2", "Test Title", "active",
+            "01.01.2025", "01.03.2025")
+        assert inventory.to_own_ad({"id": 1}).url is None
@@ -3,16 +3,19 @@
 # SPDX-ArtifactOfProjectHomePage: https://github.com/Second-Hand-Friends/kleinanzeigen-bot/
 """Tests for the network utilities module.
 
-Covers port availability checking functionality.
+Covers port availability checking and file downloads.
 """
 
-import socket
-from typing import Generator
+import asyncio, hashlib, socket, threading  # isort: skip
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Generator
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from kleinanzeigen_bot.utils.net import is_port_open
+from kleinanzeigen_bot.utils.net import DownloadError, FileDownloader, is_port_open
 
 # --------------------------------------------------------------------------- #
 # Test fixtures
@@ -26,6 +29,54 @@ def mock_socket() -> Generator[MagicMock, None, None]:
         yield mock
 
 
+IMAGE_BYTES = b"\xff\xd8\xff" + b"x" * 200_000
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+    requests:list[str] = []  # noqa: RUF012 Mutable class attributes should be annotated with `typing.ClassVar`
+
+    def do_GET(self) -> None:  # noqa: N802 Function name should be lowercase
+        type(self).requests.append(self.path)
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/image.jpg")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/flaky.jpg" and type(self).failures_left > 0:
+            type(self).failures_left -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path in {"/image.jpg", "/flaky.jpg"}:
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(IMAGE_BYTES)))
+            self.end_headers()
+            self.wfile.write(IMAGE_BYTES)
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, *_:Any) -> None:
+        pass
+
+
+@pytest.fixture
+def image_server() -> Iterator[str]:
+    """Serve test images from a local HTTP server."""
+    _ImageHandler.requests = []
+    _ImageHandler.failures_left = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ImageHandler)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
 # --------------------------------------------------------------------------- #
 # Test cases
 # --------------------------------------------------------------------------- #
@@ -62,3 +113,41 @@ class TestIsPortOpen:
         mock_socket.assert_called_once()
         # Ensure no close is called since socket creation failed
         mock_socket.return_value.close.assert_not_called()
+
+
+class TestFileDownloader:
+    """Test downloading files over pooled connections."""
+
+    @pytest.mark.asyncio
+    async def test_download_streams_and_hashes(self, image_server:str, tmp_path:Path) -> None:
+        downloader = FileDownloader(max_concurrency = 2)
+        try:
+            download = await downloader.download(f"{image_server}/redirect", str(tmp_path / "img.download"))
+        finally:
+            downloader.close()
+
+        assert download.content_type == "image/jpeg"
+        assert download.size == len(IMAGE_BYTES)
+        assert download.sha256 == hashlib.sha256(IMAGE_BYTES).hexdigest()
+        assert (tmp_path / "img.download").read_bytes() == IMAGE_BYTES
+        assert _ImageHandler.requests == ["/redirect", "/image.jpg"]
+
+    @pytest.mark.asyncio
+    async def test_download_retries_with_backoff(self, image_server:str, tmp_path:Path) -> None:
+        _ImageHandler.failures_left = 2
+        downloader = FileDownloader(retries = 2, backoff = 0.01)
+        download = await downloader.download(f"{image_server}/flaky.jpg", str(tmp_path / "img.download"))
+        downloader.close()
+
+        assert download.size == len(IMAGE_BYTES)
+        assert _ImageHandler.requests == ["/flaky.jpg"] * 3
+
+    @pytest.mark.asyncio
+    async def test_download_does_not_retry_client_errors(self, image_server:str, tmp_path:Path) -> None:
+        downloader = FileDownloader(retries = 3, backoff = 0.01)
+        with pytest.raises(DownloadError, match = "HTTP 404"):
+            await downloader.download(f"{image_server}/missing.jpg", str(tmp_path / "img.download"))
+        downloader.close()
+
+        assert _ImageHandler.requests == ["/missing.jpg"]
+        assert not await asyncio.to_thread(lambda: list(tmp_path.iterdir()))
@@ -32,6 +32,26 @@ def test_ainput_is_coroutine() -> None:
     assert asyncio.iscoroutinefunction(misc.ainput)
 
 
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_out_concurrent_tasks() -> None:
+    limiter = misc.RateLimiter(0.05)
+    started:list[float] = []
+
+    async def task() -> None:
+        await limiter.acquire()
+        started.append(asyncio.get_running_loop().time())
+
+    await asyncio.gather(*(task() for _ in range(3)))
+    assert len(started) == 3
+    assert all(b - a >= 0.04 for a, b in zip(started, started[1:]))
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_without_interval_does_not_wait() -> None:
+    limiter = misc.RateLimiter(0)
+    await asyncio.wait_for(asyncio.gather(*(limiter.acquire() for _ in range(10))), timeout = 1)
+
+
 def test_parse_decimal_valid_inputs() -> None:
     assert misc.parse_decimal(5) == decimal.Decimal("5")
     assert misc.parse_decimal(5.5) == decimal.Decimal("5.5")
@@ -1,35 +1,52 @@
 ﻿import os, sys
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from typing import Optional
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.migrations import run_migrations
+from app.core.http_client import http_client
+from app.core.executor import blocking_executor, loop_monitor
+from app.core.compression import CompressionMiddleware
+from app.core.http_cache import StaticAssets, CachedStaticFiles, IMMUTABLE, file_response
+from app.api.tracking_service import dhl_client, hermes_client
 from app.api.routes import router
 from app.services.notification_service import Notification
 from app.services.background_tasks import background_task_manager
+from app.services.job_queue import job_queue
+from app.services.event_bus import event_bus
+from app.services.image_store import image_store, STORED_NAME_RE
 
 # pl custom
 from routers import bot_router
 from routers import ui_router
 from app.api.load_ads import router as load_ads_router
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or upgrade the database schema
+run_migrations()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting KleinManager...")
+    event_bus.bind(asyncio.get_running_loop())
+    loop_monitor.start()
     print("📋 Starting background monitoring tasks...")
     await background_task_manager.start_all_tasks()
+    await job_queue.start()
     yield
     # Shutdown
     print("🛑 Stopping background monitoring tasks...")
     await background_task_manager.stop_all_tasks()
+    await job_queue.stop()
+    await http_client.close()
+    await dhl_client.close()
+    await hermes_client.close()
+    await loop_monitor.stop()
+    blocking_executor.shutdown()
     print("👋 KleinManager shutdown complete")
 
 if getattr(sys, 'frozen', False):
@@ -44,12 +61,17 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Static files
+# Compress JSON, pages and assets (event streams are passed through)
+app.add_middleware(CompressionMiddleware)
+
+# Static files, referenced with content-hashed URLs so they can be cached forever
 static_dir = os.path.join(base_path, "static")
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+static_assets = StaticAssets(static_dir)
+app.mount("/static", CachedStaticFiles(directory=static_dir, assets=static_assets), name="static")
 
 # Templates
 templates = Jinja2Templates(directory=os.path.join(base_path, "templates"))
+templates.env.globals["static_url"] = static_assets.url
 
 # Router einbinden (nur 1x!)
 app.include_router(bot_router.router)
@@ -61,12 +83,32 @@ app.include_router(load_ads_router, prefix="/api/v1", tags=["ads"])
 async def root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
-@app.get("/images/{filename}")
-async def get_image(filename: str):
-    file_path = os.path.join(settings.IMAGE_STORAGE_PATH, filename)
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "Image not found"}
+@app.get("/images/{name:path}")
+async def get_image(name: str, request: Request, w: Optional[int] = None):
+    """
+    Serve a stored image, ?w= picks the smallest thumbnail at least that wide
+    in the best format the browser accepts (AVIF, WebP, else the JPEG original)
+    """
+    accept = request.headers.get("accept", "")
+    resolved = image_store.resolve(name, w, accept)
+    if resolved and w and resolved[1] == "image/jpeg" and image_store.missing_thumbnails(name):
+        # Images stored before thumbnails existed get them on first request, clients that accept
+        # neither AVIF nor WebP get the original without regenerating existing thumbnails
+        if await blocking_executor.run(image_store.create_thumbnails, name):
+            resolved = image_store.resolve(name, w, accept)
+    if not resolved:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    path, media_type = resolved
+    if STORED_NAME_RE.match(name):
+        # Content-addressed: a name always refers to the same bytes
+        etag = f'"{os.path.basename(path)}"'
+        cache_control = IMMUTABLE
+    else:
+        stat = os.stat(path)
+        etag = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+        cache_control = "public, max-age=86400"
+    return file_response(request, path, media_type, etag, cache_control, {"Vary": "Accept"} if w else None)
 
 import logging
 
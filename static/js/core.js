@@ -252,6 +252,68 @@ class KleinManagerCore {
         }
     }
 
+    // Loads every page of a cursor-paged list endpoint
+    async apiRequestAll(endpoint) {
+        const items = [];
+        let cursor = null;
+        do {
+            const separator = endpoint.includes('?') ? '&' : '?';
+            const url = cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint;
+            const response = await fetch(`${this.apiBase}${url}`);
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.detail || 'Request failed');
+            }
+            items.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
+        return items;
+    }
+
+    // Resolves with the next pushed update of a job, or null after the timeout
+    waitForJobEvent(jobId, timeout) {
+        this.jobWaiters = this.jobWaiters || {};
+        return new Promise(resolve => {
+            const timer = setTimeout(() => {
+                delete this.jobWaiters[jobId];
+                resolve(null);
+            }, timeout);
+            this.jobWaiters[jobId] = (job) => {
+                clearTimeout(timer);
+                delete this.jobWaiters[jobId];
+                resolve(job);
+            };
+        });
+    }
+
+    // Queue a bulk job and wait until it has finished, returns the job result
+    async runJob(endpoint, loadingText) {
+        let job = await this.apiRequest(endpoint, { method: 'POST' });
+
+        while (job.status === 'queued' || job.status === 'running') {
+            if (loadingText && job.total) {
+                this.showLoading(`${loadingText} (${job.progress}/${job.total})`);
+            }
+
+            // Progress is pushed over the event stream, polling is the fallback
+            if (this.eventSource) {
+                const update = await this.waitForJobEvent(job.id, 5000);
+                if (update && update.status === 'running') {
+                    job = { ...job, ...update };
+                    continue;
+                }
+            } else {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+            job = await this.apiRequest(`/jobs/${job.id}`);
+        }
+
+        if (job.status !== 'done') {
+            throw new Error(job.error || `Job ${job.status}`);
+        }
+        return job.result;
+    }
+
     // Settings Management
     async loadSettings() {
         try {
@@ -3,7 +3,6 @@ class DashboardManager extends KleinManagerCore {
     constructor() {
         super();
         this.charts = {};
-        this.refreshInterval = null;
     }
 
     async loadDashboard() {
@@ -539,7 +538,7 @@ class DashboardManager extends KleinManagerCore {
                         <div class="relative">
                             <div class="w-12 h-12 rounded-xl overflow-hidden bg-gray-700 flex items-center justify-center">
                                 ${images.length > 0 ?
-                                    `<img src="/images/${images[0]}" class="w-full h-full object-cover">` :
+                                    `<img src="/images/${images[0]}?w=160" loading="lazy" class="w-full h-full object-cover">` :
                                     `<i class="fas fa-box text-gray-400"></i>`
                                 }
                             </div>
@@ -712,26 +711,6 @@ class DashboardManager extends KleinManagerCore {
         return icons[status] || '📦';
     }
 
-    // Auto-refresh dashboard
-    startAutoRefresh(interval = 300000) { // 5 minutes
-        if (this.refreshInterval) {
-            clearInterval(this.refreshInterval);
-        }
-
-        this.refreshInterval = setInterval(() => {
-            if (this.currentSection === 'dashboard') {
-                this.loadDashboard();
-            }
-        }, interval);
-    }
-
-    stopAutoRefresh() {
-        if (this.refreshInterval) {
-            clearInterval(this.refreshInterval);
-            this.refreshInterval = null;
-        }
-    }
-
     // Cleanup charts on section change
     destroyCharts() {
         Object.values(this.charts).forEach(chart => {
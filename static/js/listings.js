@@ -2,7 +2,7 @@
 class ListingsManager extends KleinManagerCore {
     async loadMyListings() {
         try {
-            const listings = await this.apiRequest('/my-listings');
+            const listings = await this.apiRequestAll('/my-listings');
             const container = document.getElementById('my-listings-list');
 
             if (listings.length === 0) {
@@ -75,7 +75,7 @@ class ListingsManager extends KleinManagerCore {
         this.showLoading('Syncing listings from Kleinanzeigen...');
 
         try {
-            const result = await this.apiRequest('/my-listings/sync', { method: 'POST' });
+            const result = await this.runJob('/my-listings/sync', 'Syncing listings from Kleinanzeigen...');
             this.hideLoading();
             this.showToast(`Synced ${result.synced} listings`, 'success');
             this.loadMyListings();
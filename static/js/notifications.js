@@ -14,12 +14,76 @@ class NotificationsManager extends KleinManagerCore {
     }
 
     startNotificationPolling() {
+        // Live updates are pushed via server-sent events, polling is only the fallback
+        if (window.EventSource) {
+            this.startEventStream();
+            return;
+        }
+
         this.checkNotifications();
         setInterval(() => {
             this.checkNotifications();
         }, 30000); // Check every 30 seconds
     }
 
+    startEventStream() {
+        this.eventSource = new EventSource(`${this.apiBase}/events`);
+
+        // Resync on every (re)connect, events missed in between are not replayed if too old
+        this.eventSource.addEventListener('open', () => this.checkNotifications());
+
+        this.eventSource.addEventListener('notification', (event) => {
+            const notification = JSON.parse(event.data);
+            if (this.notifications.some(n => n.id === notification.id)) return;
+
+            this.notifications.unshift(notification);
+            if (this.settings.notifications_enabled && this.notificationSound) {
+                this.notificationSound.play().catch(() => {});
+            }
+            this.updateNotificationBadge();
+            if (this.notificationsOpen) this.renderNotifications();
+        });
+
+        this.eventSource.addEventListener('notification_read', (event) => {
+            const { id } = JSON.parse(event.data);
+            this.notifications = this.notifications.filter(n => n.id !== id);
+            this.updateNotificationBadge();
+            if (this.notificationsOpen) this.renderNotifications();
+        });
+
+        this.eventSource.addEventListener('notifications_cleared', () => {
+            this.notifications = [];
+            this.updateNotificationBadge();
+            if (this.notificationsOpen) this.renderNotifications();
+        });
+
+        this.eventSource.addEventListener('price_change', () => this.scheduleLiveRefresh('watcher'));
+        this.eventSource.addEventListener('tracking_update', () => this.scheduleLiveRefresh('tracking'));
+
+        // Sent after every background sweep, replaces polling the dashboard and the task status
+        this.eventSource.addEventListener('background_status', (event) => {
+            this.renderBackgroundTaskStatus(JSON.parse(event.data));
+            this.scheduleLiveRefresh('background');
+        });
+
+        this.eventSource.addEventListener('job', (event) => {
+            const job = JSON.parse(event.data);
+            const waiter = this.jobWaiters && this.jobWaiters[job.id];
+            if (waiter) waiter(job);
+        });
+    }
+
+    scheduleLiveRefresh(source) {
+        // Events usually arrive in bursts, reload the visible section once
+        clearTimeout(this.liveRefreshTimer);
+        this.liveRefreshTimer = setTimeout(() => {
+            if (this.currentSection === 'dashboard') this.loadDashboard();
+            else if (this.currentSection === 'watcher' && source === 'watcher') this.loadWatchedItems();
+            else if (this.currentSection === 'tracking' && source === 'tracking') this.loadTracking();
+            else if (this.currentSection === 'orders' && source === 'tracking') this.loadOrders();
+        }, 1000);
+    }
+
     async checkNotifications() {
         try {
             const notifications = await this.apiRequest('/notifications');
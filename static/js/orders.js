@@ -37,7 +37,8 @@ class OrdersManager extends KleinManagerCore {
                 priceMax: document.getElementById('priceMaxFilter')?.value || ''
             };
 
-            let url = '/orders?';
+            // Grid and table only need the compact rows, the list view shows the tracking history
+            let url = `/orders?view=${this.viewMode === 'list' ? 'full' : 'compact'}&`;
             Object.entries(this.activeFilters).forEach(([key, value]) => {
                 if (value) url += `${key}=${encodeURIComponent(value)}&`;
             });
@@ -130,9 +131,15 @@ class OrdersManager extends KleinManagerCore {
         `;
     }
 
+    // Compact rows carry a tracking summary, full rows the complete tracking result
+    getTrackingData(order) {
+        if (order.tracking) return order.tracking;
+        return order.tracking_details ? JSON.parse(order.tracking_details) : null;
+    }
+
     renderCompactOrderCard(order) {
         const images = order.local_images ? JSON.parse(order.local_images) : [];
-        const trackingData = order.tracking_details ? JSON.parse(order.tracking_details) : null;
+        const trackingData = this.getTrackingData(order);
 
         return `
             <div class="bg-gray-800 rounded-2xl shadow-lg border border-gray-700 hover:border-gray-600 hover:shadow-xl transition-all duration-300 group overflow-hidden" data-order-id="${order.id}">
@@ -140,7 +147,7 @@ class OrdersManager extends KleinManagerCore {
                 <div class="relative">
                     ${images.length > 0
                         ? `<div class="relative overflow-hidden">
-                             <img src="/images/${images[0]}" class="w-full h-32 object-cover group-hover:scale-105 transition-transform duration-300 cursor-pointer" onclick="window.open('/images/${images[0]}', '_blank')">
+                             <img src="/images/${images[0]}?w=320" srcset="/images/${images[0]}?w=640 2x" loading="lazy" class="w-full h-32 object-cover group-hover:scale-105 transition-transform duration-300 cursor-pointer" onclick="window.open('/images/${images[0]}', '_blank')">
                              <div class="absolute inset-0 bg-gradient-to-t from-black/60 to-transparent"></div>
                            </div>`
                         : `<div class="w-full h-32 bg-gradient-to-br from-gray-700 to-gray-800 flex items-center justify-center">
@@ -236,7 +243,7 @@ class OrdersManager extends KleinManagerCore {
 
     renderDetailedListItem(order) {
         const images = order.local_images ? JSON.parse(order.local_images) : [];
-        const trackingData = order.tracking_details ? JSON.parse(order.tracking_details) : null;
+        const trackingData = this.getTrackingData(order);
 
         return `
             <div class="bg-gray-800 rounded-2xl p-4 shadow-lg border border-gray-700 hover:border-gray-600 hover:shadow-xl transition-all duration-300" data-order-id="${order.id}">
@@ -247,7 +254,7 @@ class OrdersManager extends KleinManagerCore {
                             <div class="absolute -top-1 -left-1 w-3 h-3 rounded-full border-2 border-white shadow-lg z-10" style="background-color: ${order.color}"></div>
                         ` : ''}
                         ${images.length > 0
-                            ? `<img src="/images/${images[0]}" class="w-full h-full object-cover rounded-xl cursor-pointer hover:scale-105 transition-transform" onclick="window.open('/images/${images[0]}', '_blank')">`
+                            ? `<img src="/images/${images[0]}?w=160" loading="lazy" class="w-full h-full object-cover rounded-xl cursor-pointer hover:scale-105 transition-transform" onclick="window.open('/images/${images[0]}', '_blank')">`
                             : `<div class="w-full h-full bg-gradient-to-br from-gray-700 to-gray-800 rounded-xl flex items-center justify-center">
                                  <i class="fas fa-image text-gray-500"></i>
                                </div>`
@@ -376,7 +383,7 @@ class OrdersManager extends KleinManagerCore {
 
     renderTableRow(order) {
         const images = order.local_images ? JSON.parse(order.local_images) : [];
-        const trackingData = order.tracking_details ? JSON.parse(order.tracking_details) : null;
+        const trackingData = this.getTrackingData(order);
 
         return `
             <tr class="hover:bg-gray-700 transition-colors" data-order-id="${order.id}">
@@ -387,7 +394,7 @@ class OrdersManager extends KleinManagerCore {
                                 <div class="absolute -top-1 -left-1 w-3 h-3 rounded-full border-2 border-white shadow-lg z-10" style="background-color: ${order.color}"></div>
                             ` : ''}
                             ${images.length > 0
-                                ? `<img src="/images/${images[0]}" class="h-12 w-12 rounded-lg object-cover cursor-pointer" onclick="window.open('/images/${images[0]}', '_blank')">`
+                                ? `<img src="/images/${images[0]}?w=160" loading="lazy" class="h-12 w-12 rounded-lg object-cover cursor-pointer" onclick="window.open('/images/${images[0]}', '_blank')">`
                                 : `<div class="h-12 w-12 bg-gray-700 rounded-lg flex items-center justify-center">
                                      <i class="fas fa-image text-gray-500"></i>
                                    </div>`
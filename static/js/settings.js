@@ -39,34 +39,36 @@ class SettingsManager extends KleinManagerCore {
     async updateBackgroundTaskStatus() {
         try {
             const status = await this.apiRequest('/background-tasks/status');
+            this.renderBackgroundTaskStatus(status);
+        } catch (error) {
+            console.error('Failed to update background task status:', error);
+        }
+    }
 
-            const priceStatus = document.getElementById('price-monitoring-status');
-            const trackingStatus = document.getElementById('tracking-monitoring-status');
-            const lastPriceCheck = document.getElementById('last-price-check');
-            const lastTrackingCheck = document.getElementById('last-tracking-check');
-
-            if (priceStatus) {
-                priceStatus.textContent = status.price_monitoring_active ? '✅ Active' : '❌ Inactive';
-                priceStatus.className = status.price_monitoring_active ? 'text-green-400' : 'text-red-400';
-            }
+    renderBackgroundTaskStatus(status) {
+        const priceStatus = document.getElementById('price-monitoring-status');
+        const trackingStatus = document.getElementById('tracking-monitoring-status');
+        const lastPriceCheck = document.getElementById('last-price-check');
+        const lastTrackingCheck = document.getElementById('last-tracking-check');
 
-            if (trackingStatus) {
-                trackingStatus.textContent = status.tracking_monitoring_active ? '✅ Active' : '❌ Inactive';
-                trackingStatus.className = status.tracking_monitoring_active ? 'text-green-400' : 'text-red-400';
-            }
+        if (priceStatus) {
+            priceStatus.textContent = status.price_monitoring_active ? '✅ Active' : '❌ Inactive';
+            priceStatus.className = status.price_monitoring_active ? 'text-green-400' : 'text-red-400';
+        }
 
-            if (lastPriceCheck) {
-                lastPriceCheck.textContent = status.last_price_check ?
-                    new Date(status.last_price_check).toLocaleString() : 'Never';
-            }
+        if (trackingStatus) {
+            trackingStatus.textContent = status.tracking_monitoring_active ? '✅ Active' : '❌ Inactive';
+            trackingStatus.className = status.tracking_monitoring_active ? 'text-green-400' : 'text-red-400';
+        }
 
-            if (lastTrackingCheck) {
-                lastTrackingCheck.textContent = status.last_tracking_check ?
-                    new Date(status.last_tracking_check).toLocaleString() : 'Never';
-            }
+        if (lastPriceCheck) {
+            lastPriceCheck.textContent = status.last_price_check ?
+                new Date(status.last_price_check).toLocaleString() : 'Never';
+        }
 
-        } catch (error) {
-            console.error('Failed to update background task status:', error);
+        if (lastTrackingCheck) {
+            lastTrackingCheck.textContent = status.last_tracking_check ?
+                new Date(status.last_tracking_check).toLocaleString() : 'Never';
         }
     }
 
@@ -78,7 +78,7 @@ class TrackingManager extends KleinManagerCore {
         this.showLoading('Updating all tracking information...');
 
         try {
-            const result = await this.apiRequest('/tracking/update-all', { method: 'POST' });
+            const result = await this.runJob('/tracking/update-all', 'Updating all tracking information...');
             this.hideLoading();
             this.showToast(`Updated ${result.updated} shipments`, 'success');
 
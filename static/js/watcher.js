@@ -42,7 +42,7 @@ class WatcherManager extends KleinManagerCore {
 
     async loadWatchedItems() {
         try {
-            const items = await this.apiRequest('/watched-items');
+            const items = await this.apiRequestAll('/watched-items');
             const container = document.getElementById('watched-items-list');
 
             if (items.length === 0) {
@@ -61,14 +61,11 @@ class WatcherManager extends KleinManagerCore {
     }
 
     renderWatchedItem(item) {
-        const priceHistory = item.price_history ? JSON.parse(item.price_history) : [];
         const priceChange = item.current_price - item.initial_price;
         const changeClass = priceChange > 0 ? 'text-red-400' : priceChange < 0 ? 'text-green-400' : 'text-gray-400';
         const changeIcon = priceChange > 0 ? 'fa-arrow-up' : priceChange < 0 ? 'fa-arrow-down' : 'fa-minus';
 
-        const prices = priceHistory.map(p => p.price);
-        const lowestPrice = prices.length > 0 ? Math.min(...prices) : item.initial_price;
-        const highestPrice = prices.length > 0 ? Math.max(...prices) : item.initial_price;
+        const lowestPrice = item.lowest_price ?? item.initial_price;
 
         return `
             <div class="bg-gradient-to-br from-slate-800 to-slate-900 rounded-lg p-5 shadow-lg border border-slate-700 hover:border-slate-600 transition-all duration-200">
@@ -108,7 +105,7 @@ class WatcherManager extends KleinManagerCore {
                     </div>
                     <div class="bg-slate-700/50 rounded-lg p-2 text-center">
                         <p class="text-xs text-slate-400">Changes</p>
-                        <p class="text-sm font-bold text-orange-400">${priceHistory.length}</p>
+                        <p class="text-sm font-bold text-orange-400">${item.price_changes}</p>
                     </div>
                 </div>
 
@@ -121,7 +118,7 @@ class WatcherManager extends KleinManagerCore {
                             <i class="fas fa-expand-alt mr-1"></i>Details
                         </button>
                     </div>
-                    ${this.renderCompactChart(item, priceHistory)}
+                    ${this.renderCompactChart(item, item.recent_prices || [])}
                 </div>
 
                 <!-- Actions -->
@@ -151,8 +148,8 @@ class WatcherManager extends KleinManagerCore {
         `;
     }
 
-    renderCompactChart(item, priceHistory) {
-        if (priceHistory.length === 0) {
+    renderCompactChart(item, recentPrices) {
+        if (recentPrices.length === 0) {
             return `
                 <div class="h-20 bg-slate-700/30 rounded-lg flex items-center justify-center">
                     <p class="text-xs text-slate-500">No price history</p>
@@ -160,17 +157,16 @@ class WatcherManager extends KleinManagerCore {
             `;
         }
 
-        const recentHistory = priceHistory.slice(-20);
-        const prices = recentHistory.map(p => p.price);
+        const prices = recentPrices;
         const maxPrice = Math.max(...prices);
         const minPrice = Math.min(...prices);
         const priceRange = maxPrice - minPrice || 1;
 
         const width = 100;
         const height = 60;
-        const points = recentHistory.map((entry, index) => {
-            const x = (index / Math.max(recentHistory.length - 1, 1)) * width;
-            const y = height - ((entry.price - minPrice) / priceRange) * height;
+        const points = prices.map((price, index) => {
+            const x = (index / Math.max(prices.length - 1, 1)) * width;
+            const y = height - ((price - minPrice) / priceRange) * height;
             return `${x},${y}`;
         }).join(' ');
 
@@ -204,7 +200,7 @@ class WatcherManager extends KleinManagerCore {
 
     async showPriceHistory(itemId) {
         try {
-            const items = await this.apiRequest('/watched-items');
+            const items = await this.apiRequestAll('/watched-items?fields=id,title,current_price,initial_price,lowest_price,price_changes,created_at');
             const item = items.find(i => i.id === itemId);
 
             if (!item) {
@@ -212,16 +208,15 @@ class WatcherManager extends KleinManagerCore {
                 return;
             }
 
-            const priceHistory = item.price_history ? JSON.parse(item.price_history) : [];
+            const priceHistory = await this.apiRequest(`/watched-items/${itemId}/price-history`);
 
             document.getElementById('priceHistoryItemTitle').textContent = item.title;
             document.getElementById('initialPrice').textContent = `€${item.initial_price.toFixed(2)}`;
             document.getElementById('currentPrice').textContent = `€${item.current_price.toFixed(2)}`;
 
-            const prices = priceHistory.map(p => p.price);
-            const lowestPrice = prices.length > 0 ? Math.min(...prices) : item.initial_price;
+            const lowestPrice = item.lowest_price ?? item.initial_price;
             document.getElementById('lowestPrice').textContent = `€${lowestPrice.toFixed(2)}`;
-            document.getElementById('totalChanges').textContent = priceHistory.length;
+            document.getElementById('totalChanges').textContent = item.price_changes;
 
             this.createPriceHistoryChart(item, priceHistory);
             this.createPriceHistoryTable(priceHistory);
@@ -379,7 +374,7 @@ class WatcherManager extends KleinManagerCore {
         this.showLoading('Checking price...');
 
         try {
-            const result = await this.apiRequest('/watched-items/check-all', { method: 'POST' });
+            const result = await this.runJob('/watched-items/check-all', 'Checking price...');
             this.hideLoading();
 
             const updateForThisItem = result.updates.find(update => update.item_id === itemId);
@@ -404,7 +399,7 @@ class WatcherManager extends KleinManagerCore {
         this.showLoading('Checking all prices...');
 
         try {
-            const result = await this.apiRequest('/watched-items/check-all', { method: 'POST' });
+            const result = await this.runJob('/watched-items/check-all', 'Checking all prices...');
             this.hideLoading();
             this.showToast(`Checked ${result.checked} items, ${result.updates.length} price changes found`, 'success');
             this.loadWatchedItems();